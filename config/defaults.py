@@ -1,2 +1,46 @@
 DEFAULT_SEMG_FREQUENCY = 1500
-BEST_OF = 3 
\ No newline at end of file
+BEST_OF = 3
+
+# Compute MVC from a whole-signal envelope built once per channel at load
+# time (O(1) per span) instead of re-filtering every span on its own.
+WHOLE_SIGNAL_MVC = False
+
+# Fallback rate (Hz) for the live MVC readout while dragging a span, used
+# when the screen does not report its refresh rate.
+LIVE_MVC_FPS = 60
+
+# Default window length (ms) for the automatic best-window MVC search.
+AUTO_MVC_WINDOW_MS = 500
+
+# Plot tabs whose canvas stays rendered; older tabs are released and
+# re-rendered (with their selections) when activated again.
+LIVE_CANVASES = 4
+
+# Rasterize the waveforms on a worker ("thread" or "process") into QImage
+# frames composited under the selections; None draws them on the GUI thread.
+OFFTHREAD_RENDER = None
+
+# Plotting backend for the EMG tabs: "matplotlib" (Qt/Agg) or "pyqtgraph"
+# (software-rendered, built-in downsampling and clip-to-view).
+PLOT_BACKEND = "matplotlib"
+
+# MAT import pool: "thread" (zlib decompression runs in parallel; workers
+# stop mid-file on cancel) or "process" (parsing in parallel too; workers
+# are terminated on cancel). IMPORT_WORKERS = None uses one per CPU.
+IMPORT_POOL = "thread"
+IMPORT_WORKERS = None
+
+# Size limit (MB) of the on-disk cache of decoded MAT data under the user
+# data directory; least recently used files are evicted first. 0 disables it.
+MAT_CACHE_MB = 2048
+
+# End-to-end float32: recordings are stored and band-passed, rectified,
+# RMS-smoothed and Hampel-filtered in float32, for half the memory and
+# memory bandwidth. MVC values then agree with the float64 pipeline to a
+# relative error of FLOAT32_RTOL (tests/test_processors.py checks this).
+FLOAT32 = False
+FLOAT32_RTOL = 1e-4
+
+# Sample dtype of the channel store every tab reads from (plots, MVC,
+# export). Recordings are converted to it once, at import.
+CHANNEL_DTYPE = "float32" if FLOAT32 else "float64"
@@ -9,14 +9,18 @@ from PyQt5.QtWidgets import (
     QProgressBar,
     QListWidget,
 )
-from PyQt5.QtGui import QIcon, QFont
+from PyQt5.QtGui import QIcon, QFont, QColor
 from PyQt5 import uic
-import scipy.io
 import os
+import threading
 
 # -- CUSTOM --------------------- #
 from utilities.path_utils import resource_path
 from utilities.path_utils import base_path
+from importers.cache import default_cache
+from importers.channel_filter import ChannelFilter, ProtocolFilters
+from importers.mat import iter_mats
+from importers.prescan import describe, is_quick, scan_mat
 
 
 # ---------------- Worker that runs in a background thread ----------------
@@ -27,42 +31,71 @@ class ImportWorker(QObject):
     error = pyqtSignal(str)
     cancelled = pyqtSignal()
 
-    def __init__(self, paths):
+    def __init__(self, paths, channel_filter=None, priority=None):
         super().__init__()
         self._paths = list(paths)
-        self._cancel = False
+        self._filter = channel_filter
+        self._priority = priority
+        self._cancel = threading.Event()
 
     @pyqtSlot()
     def run(self):
+        """
+        Decode all files on a pool (``importers.mat.iter_mats``), through the
+        decoded-data cache unless it is disabled, keeping only the channels
+        of the channel filter and starting the largest files (``priority``)
+        first. Each file is emitted through ``fileImported`` in list order as
+        soon as it and the files before it are done; ``finished`` gets them
+        all (so far, if cancelled).
+        """
         results = []
         total = len(self._paths)
-        for i, path in enumerate(self._paths):
-            if self._cancel:
-                self.finished.emit(results)
-                return
-            try:
-                self.progress.emit(i, total, os.path.basename(path))
-                mat = scipy.io.loadmat(path, struct_as_record=False, squeeze_me=True)
-                key = next((k for k in mat.keys() if not k.startswith("__")), None)
-                if key:
-                    tl = mat[key]
-                    results.append({
-                        "path": path,
-                        "data": tl.Analog.Data,
-                        "labels": tl.Analog.Labels,
-                    })
-            except Exception as e:
-                self.error.emit(f"{os.path.basename(path)}: {e}")
+        for i, path, res, err in iter_mats(self._paths, cancel=self._cancel,
+                                           cache=default_cache(), channel_filter=self._filter,
+                                           priority=self._priority):
+            if err:
+                self.error.emit(err)
+            elif res is not None:
+                results.append(res)
+                self.fileImported.emit(res)
+            self.progress.emit(i, total, os.path.basename(path))
+        if self._cancel.is_set():
+            self.cancelled.emit()
         self.finished.emit(results)
 
     @pyqtSlot()
     def cancel(self):
-        self._cancel = True
+        # Thread-safe: connect with Qt.DirectConnection, run() keeps this thread busy
+        self._cancel.set()
+
+
+class ScanWorker(QObject):
+    """Header pre-scan (``importers.prescan.scan_mat``) of compressed files."""
+    scanned = pyqtSignal(dict)
+    finished = pyqtSignal()
+
+    def __init__(self, paths):
+        super().__init__()
+        self._paths = list(paths)
+        self._cancel = threading.Event()
+
+    @pyqtSlot()
+    def run(self):
+        for path in self._paths:
+            if self._cancel.is_set():
+                break
+            self.scanned.emit(scan_mat(path))
+        self.finished.emit()
+
+    def cancel(self):
+        self._cancel.set()
 
 
 # ---------------- Your dialog class ----------------
 class LoadMat(QDialog):
-    matsImported = pyqtSignal(list)
+    importStarted = pyqtSignal()
+    matImported = pyqtSignal(dict)      # one file, as soon as it is decoded
+    matsImported = pyqtSignal(list)     # all files, once the import is over
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -92,6 +125,17 @@ class LoadMat(QDialog):
         self.listFiles.dragEnterEvent = self.dragEnterEvent
         self.listFiles.dropEvent = self.dropEvent
 
+        # Header pre-scan results, path -> prescan.scan_mat dict
+        self._scans = {}
+        self._scanners = []
+
+        # Channel filter, remembered per protocol
+        self._protocols = ProtocolFilters()
+        self.cmbProtocol.addItems(sorted(self._protocols.protocols))
+        self.cmbProtocol.setCurrentText(self._protocols.last)
+        self.ledtChannels.setText(self._protocols.spec(self._protocols.last))
+        self.cmbProtocol.currentTextChanged.connect(self._on_protocol_changed)
+
         # Worker/thread holders
         self._thread = None
         self._worker = None
@@ -108,6 +152,10 @@ class LoadMat(QDialog):
                 font = button.font()
                 font.setPointSize(button_font_size)
                 button.setFont(font)
+        for widget in [self.lblProtocol, self.cmbProtocol, self.lblChannels, self.ledtChannels]:
+            font = widget.font()
+            font.setPointSize(button_font_size)
+            widget.setFont(font)
         
         # Increase list widget font size to 12pt for better readability
         if self.listFiles:
@@ -118,10 +166,16 @@ class LoadMat(QDialog):
         # Increase progress dialog label font size (will be applied when dialog is created)
         # This is handled in _ensure_progress_dialog
 
+    # ---------------------- CHANNEL FILTER ----------------------
+    def _on_protocol_changed(self, name):
+        if name in self._protocols.protocols:
+            self.ledtChannels.setText(self._protocols.spec(name))
+
     # ---------------------- CLEAR BUTTON ----------------------
     def clear_list(self):
         self.paths = []
         self.listFiles.clear()
+        self._scans = {}
         QMessageBox.information(self, "Cleared", "File list has been cleared.")
 
     # ---------------------- REMOVE SELECTED -------------------
@@ -132,9 +186,10 @@ class LoadMat(QDialog):
             return
 
         for item in selected:
-            path = item.text()
+            path = item.data(Qt.UserRole)
             if path in self.paths:
                 self.paths.remove(path)
+            self._scans.pop(path, None)
             self.listFiles.takeItem(self.listFiles.row(item))
 
     # ---------------------- DRAG & DROP SUPPORT -------------------
@@ -158,15 +213,7 @@ class LoadMat(QDialog):
             return
 
         self.paths.extend(new_files)
-
-        for path in new_files:
-            item = QListWidgetItem(path)
-            item.setToolTip(path)
-            # Set larger font for file names
-            font = item.font()
-            font.setPointSize(13)
-            item.setFont(font)
-            self.listFiles.addItem(item)
+        self._add_items(new_files, 13)
 
     # ------------------- FILE SELECTION ------------------------
     def select_files(self, file_extension):
@@ -174,19 +221,88 @@ class LoadMat(QDialog):
         if files:
             self.paths = files
             self.listFiles.clear()
-            for path in files:
-                item = QListWidgetItem(path)
-                item.setToolTip(path)
-                # Set larger font for file names
-                font = item.font()
-                font.setPointSize(12)
-                item.setFont(font)
-                self.listFiles.addItem(item)
+            self._scans = {}
+            self._add_items(files, 12)
 
             self.listFiles.setWordWrap(False)
             self.listFiles.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
             self.listFiles.setUniformItemSizes(True)
 
+    def _add_items(self, paths, point_size):
+        for path in paths:
+            item = QListWidgetItem(path)
+            item.setData(Qt.UserRole, path)
+            item.setToolTip(path)
+            # Set larger font for file names
+            font = item.font()
+            font.setPointSize(point_size)
+            item.setFont(font)
+            self.listFiles.addItem(item)
+        self._start_scan(paths)
+
+    # ------------------- HEADER PRE-SCAN ------------------------
+    def _start_scan(self, paths):
+        """
+        Read the headers of ``paths`` (no data is decoded). v7.3 and
+        uncompressed files are scanned right away; compressed ones have to
+        be inflated up to ``Analog`` and go to a background thread, showing
+        "scanning..." until they are done.
+        """
+        slow = []
+        for path in paths:
+            if is_quick(path):
+                self._on_file_scanned(scan_mat(path))
+            else:
+                slow.append(path)
+                self._set_item_text(path, "scanning... (compressed, inflating headers)")
+        if not slow:
+            return
+        thread = QThread(self)
+        worker = ScanWorker(slow)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.scanned.connect(self._on_file_scanned)
+        worker.finished.connect(thread.quit)
+        entry = (thread, worker)
+        thread.finished.connect(lambda: entry in self._scanners and self._scanners.remove(entry))
+        self._scanners.append(entry)
+        thread.start()
+
+    @pyqtSlot(dict)
+    def _on_file_scanned(self, info):
+        path = info["path"]
+        if path not in self.paths:
+            return          # removed while it was being scanned
+        self._scans[path] = info
+        for item in self._set_item_text(path, describe(info)):
+            if info["error"]:
+                item.setForeground(QColor("#c0392b"))
+                font = item.font()
+                font.setStrikeOut(True)
+                item.setFont(font)
+
+    def _set_item_text(self, path, line):
+        """Show ``line`` under ``path`` in its list items; returns those items."""
+        items = []
+        for i in range(self.listFiles.count()):
+            item = self.listFiles.item(i)
+            if item.data(Qt.UserRole) == path:
+                item.setText(f"{path}\n    {line}")
+                item.setToolTip(f"{path}\n{line}")
+                items.append(item)
+        return items
+
+    def _stop_scans(self):
+        for thread, worker in list(self._scanners):
+            worker.cancel()
+            thread.quit()
+            thread.wait()
+        self._scanners = []
+
+    def done(self, result):
+        self._stop_scans()      # accept, reject and the window's close button
+        super().done(result)
+
     # ------------------- PROGRESS DIALOG ------------------------
     def _ensure_progress_dialog(self, total):
         dlg = QProgressDialog("Importing MAT files...", "Cancel", 0, total, self)
@@ -227,31 +343,50 @@ class LoadMat(QDialog):
             QMessageBox.warning(self, "No files", "Please select MAT files first.")
             return
 
-        self._progress = self._ensure_progress_dialog(len(self.paths))
+        try:
+            channel_filter = ChannelFilter(self.ledtChannels.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Channel filter", str(e))
+            return
+        self._protocols.remember(self.cmbProtocol.currentText(), channel_filter.spec)
+
+        # Files the pre-scan found unreadable are left out up front
+        bad = [p for p in self.paths if (self._scans.get(p) or {}).get("error")]
+        paths = [p for p in self.paths if p not in bad]
+        for p in bad:
+            print(f"[warn] Skipping {os.path.basename(p)}: {self._scans[p]['error']}")
+        if not paths:
+            QMessageBox.warning(self, "No files", "None of the listed files can be imported.")
+            return
+        priority = [os.path.getsize(p) if os.path.exists(p) else 0 for p in paths]
+
+        self._progress = self._ensure_progress_dialog(len(paths))
 
         self._thread = QThread(self)
-        self._worker = ImportWorker(self.paths)
+        self._worker = ImportWorker(paths, channel_filter, priority)
         self._worker.moveToThread(self._thread)
 
         self._thread.started.connect(self._worker.run)
         self._worker.progress.connect(self._on_worker_progress)
+        self._worker.fileImported.connect(self.matImported)
         self._worker.error.connect(self._on_worker_error)
         self._worker.finished.connect(self._on_worker_finished)
 
-        self._progress.canceled.connect(self._worker.cancel)
+        self._progress.canceled.connect(self._worker.cancel, Qt.DirectConnection)
 
         self._worker.finished.connect(self._thread.quit)
         self._worker.finished.connect(self._worker.deleteLater)
         self._thread.finished.connect(self._thread.deleteLater)
 
+        self.importStarted.emit()
         self._thread.start()
 
     @pyqtSlot(int, int, str)
     def _on_worker_progress(self, i, total, name):
         if self._progress:
-            self._progress.setLabelText(f"Importing: {name} ({i+1}/{total})")
+            self._progress.setLabelText(f"Imported: {name} ({i+1}/{total})")
             self._progress.setMaximum(total)
-            self._progress.setValue(i)
+            self._progress.setValue(i + 1)
             QCoreApplication.processEvents()
 
     @pyqtSlot(str)
@@ -0,0 +1,195 @@
+# /importers/cache.py
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from config.defaults import CHANNEL_DTYPE, MAT_CACHE_MB
+
+
+# Bump when the decoders change what they return: old entries then miss.
+FORMAT = 1
+HASH_BLOCK = 1 << 20
+
+
+class DecodedCache:
+    """
+    Decoded ``Analog`` data of imported files, content-addressed on disk.
+
+    An entry is ``<key>.npy`` (the channels x samples matrix, C order, in
+    ``CHANNEL_DTYPE`` so a hit maps straight into a ChannelStore) plus a
+    ``<key>.json`` sidecar (labels, frequency, source, size). ``key`` is
+    the SHA-256 of the file and the dtype; a record under ``paths/``
+    remembers the key of a path for its size and mtime, so unchanged files
+    are not re-hashed.
+    Hits are memory-mapped. The sidecar's mtime is the last use, and the
+    least recently used entries are evicted once the total exceeds
+    ``max_bytes``.
+    """
+
+    def __init__(self, root=None, max_bytes=MAT_CACHE_MB << 20):
+        if root is None:
+            from utilities.license import get_user_data_dir
+            root = get_user_data_dir() / "mat_cache"
+        self.root = str(root)
+        self.max_bytes = int(max_bytes)
+
+    # ---------------- keys ----------------
+    def _path_record(self, path):
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return os.path.join(self.root, "paths", digest + ".json")
+
+    def key_for(self, path, opener=None):
+        """Content key of ``path``; ``opener(path)`` (a binary file) lets the caller cancel the hashing."""
+        st = os.stat(path)
+        record = self._path_record(path)
+        try:
+            with open(record) as f:
+                rec = json.load(f)
+            if (rec["size"], rec["mtime_ns"], rec["dtype"]) == (st.st_size, st.st_mtime_ns, CHANNEL_DTYPE):
+                return rec["key"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        h = hashlib.sha256(f"mat-cache-v{FORMAT}-{CHANNEL_DTYPE}".encode())
+        with (opener or (lambda p: open(p, "rb")))(path) as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                h.update(block)
+        key = h.hexdigest()
+        self._write_json(record, {"path": os.path.abspath(path), "size": st.st_size,
+                                  "mtime_ns": st.st_mtime_ns, "dtype": CHANNEL_DTYPE, "key": key})
+        return key
+
+    def _entry(self, key):
+        base = os.path.join(self.root, key)
+        return base + ".npy", base + ".json"
+
+    @staticmethod
+    def _tmp(path):
+        # Unique per writer: pool workers may store the same file at once
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def _write_json(self, path, obj):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = self._tmp(path)
+        with open(tmp, "w") as f:
+            json.dump(obj, f)
+        os.replace(tmp, path)
+
+    # ---------------- entries ----------------
+    def get(self, path, key):
+        """``load_mat``-style result for ``path`` from entry ``key``, or None."""
+        npy, meta = self._entry(key)
+        try:
+            with open(meta) as f:
+                info = json.load(f)
+            data = np.load(npy, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(meta)
+        except OSError:
+            pass
+        return {
+            "path": path,
+            "data": data,
+            "labels": np.array(info["labels"], dtype=object),
+            "frequency": info["frequency"],
+        }
+
+    def put(self, key, res):
+        """Store a decoded result (in-memory data only) and evict down to ``max_bytes``."""
+        data = res["data"]
+        if not isinstance(data, np.ndarray):
+            return          # lazy v7.3 data already reads from disk
+        npy, meta = self._entry(key)
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self._tmp(npy)
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(data, dtype=CHANNEL_DTYPE))
+        os.replace(tmp, npy)
+        labels = res.get("labels")
+        self._write_json(meta, {
+            "source": os.path.abspath(res["path"]),
+            "labels": [] if labels is None else [str(s) for s in np.ravel(labels)],
+            "frequency": res.get("frequency"),
+            "nbytes": os.path.getsize(npy),
+        })
+        self.evict()
+
+    def entries(self):
+        """``[(key, nbytes, last_used, source)]``, least recently used first."""
+        out = []
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return out
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            key = name[:-5]
+            npy, meta = self._entry(key)
+            try:
+                with open(meta) as f:
+                    info = json.load(f)
+                out.append((key, os.path.getsize(npy), os.path.getmtime(meta), info.get("source")))
+            except (OSError, ValueError):
+                continue
+        out.sort(key=lambda e: e[2])
+        return out
+
+    def size(self):
+        return sum(e[1] for e in self.entries())
+
+    def _remove(self, key):
+        """
+        Delete entry ``key``; False if its data file cannot be deleted yet
+        (on Windows, while a tab still memory-maps it). The sidecar is then
+        kept too, so the entry stays listed and counted.
+        """
+        for p in self._entry(key):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[warn] Cache entry in use, kept: {os.path.basename(p)} ({e})")
+                return False
+        return True
+
+    def evict(self, max_bytes=None):
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(e[1] for e in entries)
+        for key, nbytes, _, _ in entries:
+            if total <= limit:
+                break
+            if self._remove(key):
+                total -= nbytes
+
+    def clear(self):
+        """Remove every entry that is not in use; returns the number kept."""
+        kept = sum(not self._remove(key) for key, *_ in self.entries())
+        records = os.path.join(self.root, "paths")
+        for name in os.listdir(records) if os.path.isdir(records) else ():
+            try:
+                os.remove(os.path.join(records, name))
+            except OSError:
+                pass
+        return kept
+
+
+_default = None
+
+
+def default_cache():
+    """The shared cache under the user data directory, or None if disabled."""
+    global _default
+    if MAT_CACHE_MB <= 0:
+        return None
+    if _default is None:
+        _default = DecodedCache()
+    return _default
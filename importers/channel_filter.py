@@ -0,0 +1,93 @@
+# /importers/channel_filter.py
+
+import json
+import os
+import re
+
+
+class ChannelFilter:
+    """
+    Which channels of a recording to import, matched on their labels.
+
+    ``spec`` is either a comma-separated list of labels (case-insensitive,
+    e.g. ``"EMG 1, EMG 4"``) or a regular expression between slashes
+    searched in every label (e.g. ``"/^(TA|GM)_/"``). An empty spec keeps
+    every channel. Invalid expressions raise ``ValueError`` here, before
+    any file is read.
+    """
+
+    def __init__(self, spec=""):
+        self.spec = (spec or "").strip()
+        self._regex = None
+        self._names = None
+        if len(self.spec) >= 2 and self.spec.startswith("/") and self.spec.endswith("/"):
+            try:
+                self._regex = re.compile(self.spec[1:-1], re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"invalid channel expression {self.spec}: {e}") from None
+        elif self.spec:
+            self._names = {s.strip().casefold() for s in self.spec.split(",") if s.strip()}
+
+    def __bool__(self):
+        return bool(self.spec)
+
+    def __repr__(self):
+        return f"ChannelFilter({self.spec!r})"
+
+    def __getstate__(self):
+        return {"spec": self.spec}
+
+    def __setstate__(self, state):
+        self.__init__(state["spec"])
+
+    def matches(self, label):
+        label = str(label)
+        if self._regex is not None:
+            return self._regex.search(label) is not None
+        if self._names is not None:
+            return label.strip().casefold() in self._names
+        return True
+
+    def rows(self, labels, nch):
+        """Indices (in file order) of the channels to keep out of ``nch``."""
+        if not self or labels is None:
+            return list(range(nch))
+        return [i for i, label in enumerate(list(labels)[:nch]) if self.matches(label)]
+
+
+class ProtocolFilters:
+    """
+    Channel filter specs remembered per protocol name, plus the protocol
+    used last, in ``channel_filters.json`` under the user data directory.
+    """
+
+    FILE = "channel_filters.json"
+
+    def __init__(self, root=None):
+        if root is None:
+            from utilities.license import get_user_data_dir
+            root = get_user_data_dir()
+        self.path = os.path.join(str(root), self.FILE)
+        self.protocols = {}
+        self.last = ""
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+            self.protocols = dict(state.get("protocols", {}))
+            self.last = str(state.get("last", ""))
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def spec(self, protocol):
+        return self.protocols.get(protocol, "")
+
+    def remember(self, protocol, spec):
+        protocol = protocol.strip()
+        if protocol:
+            self.protocols[protocol] = spec.strip()
+        self.last = protocol
+        try:
+            with open(self.path, "w") as f:
+                json.dump({"last": self.last, "protocols": self.protocols}, f, indent=2)
+        except OSError as e:
+            print(f"[warn] Could not save channel filters: {e}")
@@ -0,0 +1,94 @@
+# /importers/channel_store.py
+
+import numpy as np
+
+from config.defaults import CHANNEL_DTYPE
+
+
+class ChannelStore:
+    """
+    The (channels x samples) matrix of one recording, as plotting and
+    processing read it.
+
+    In-memory data is normalized once to channel-major, C-contiguous
+    ``dtype`` storage, so ``store[row, :]`` and :meth:`channel` are
+    zero-copy contiguous views. Data that already has that layout, such
+    as a memory-mapped cache entry, is kept as it is and not copied. Lazy
+    sources (e.g. :class:`~importers.mat73.LazyChannels`) are read one
+    channel at a time, and each channel is kept once it has been read.
+
+    ``rows`` keeps only those channels of ``data`` (in that order): only
+    their samples are copied or, for lazy sources, ever read.
+    """
+
+    ndim = 2
+
+    def __init__(self, data, dtype=CHANNEL_DTYPE, rows=None):
+        self.dtype = np.dtype(dtype)
+        self._rows = {}         # lazy sources: channel -> normalized samples
+        nch = int(data.shape[0]) if np.ndim(data) > 1 else 1
+        if rows is not None and list(rows) == list(range(nch)):
+            rows = None
+        self._map = None if rows is None else [int(r) for r in rows]
+        if isinstance(data, np.ndarray):
+            arr = np.atleast_2d(data)
+            if self._map is not None:
+                arr = arr[self._map]
+            if not (arr.flags.c_contiguous and arr.dtype == self.dtype):
+                arr = np.ascontiguousarray(arr, dtype=self.dtype)
+            self._array = arr
+            self._source = None
+            self.shape = self._array.shape
+        else:
+            self._array = None
+            self._source = data
+            nsamp = int(data.shape[1])
+            self.shape = (nch if self._map is None else len(self._map), nsamp)
+
+    @classmethod
+    def wrap(cls, data, dtype=CHANNEL_DTYPE):
+        """``data`` as a store of ``dtype`` (returned as is if it already is one)."""
+        if isinstance(data, cls) and data.dtype == np.dtype(dtype):
+            return data
+        return cls(data, dtype)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def channel(self, row):
+        """Contiguous samples of channel ``row``: a view into the store, not a copy."""
+        if self._array is not None:
+            return self._array[row]
+        row = int(row)
+        if row < 0:
+            row += self.shape[0]
+        samples = self._rows.get(row)
+        if samples is None:
+            src = row if self._map is None else self._map[row]
+            samples = self._rows[row] = np.ascontiguousarray(self._source[src, :], dtype=self.dtype)
+        return samples
+
+    def __getitem__(self, key):
+        if self._array is not None:
+            return self._array[key]
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(rows, (int, np.integer)):
+            return self.channel(rows)[cols]
+        if isinstance(rows, slice):
+            rows = range(*rows.indices(self.shape[0]))
+        return np.stack([self.channel(r)[cols] for r in rows])
+
+    def __array__(self, dtype=None, copy=None):
+        out = self._array if self._array is not None else self[:, :]
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+    @property
+    def is_mapped(self):
+        """True if the samples live on disk (memory-mapped or lazily read)."""
+        return self._source is not None or isinstance(self._array, np.memmap)
+
+    def memory_usage(self):
+        """Bytes held in memory; memory-mapped pages are left to the OS and not counted."""
+        if self._array is not None:
+            return 0 if isinstance(self._array, np.memmap) else int(self._array.nbytes)
+        return sum(int(r.nbytes) for r in self._rows.values())
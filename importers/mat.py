@@ -0,0 +1,190 @@
+# /importers/mat.py
+
+import io
+import multiprocessing
+import os
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+import scipy.io
+
+from config.defaults import IMPORT_POOL, IMPORT_WORKERS
+from importers import mat5, mat73
+from importers.channel_store import ChannelStore
+
+
+# Seconds between cancellation checks while waiting for the next file.
+POLL_S = 0.1
+
+
+class ImportCancelled(Exception):
+    """Raised from inside a decode once the import has been cancelled."""
+
+
+class CancellableFile(io.FileIO):
+    """Read-only file whose reads raise :class:`ImportCancelled` once ``cancel`` is set."""
+
+    def __init__(self, path, cancel=None):
+        super().__init__(path, "rb")
+        self._cancel = cancel
+
+    def _check(self):
+        if self._cancel is not None and self._cancel.is_set():
+            raise ImportCancelled(self.name)
+
+    def read(self, size=-1):
+        self._check()
+        return super().read(size)
+
+    def readinto(self, b):
+        self._check()
+        return super().readinto(b)
+
+
+def load_mat(path, cancel=None):
+    """
+    Decode one QTM ``.mat`` export into ``{"path", "data", "labels",
+    "frequency"}`` (None if the file has no variable).
+
+    MAT v5 files go through ``mat5.read_analog``, which decodes only the
+    Analog fields; anything it does not handle falls back to
+    ``scipy.io.loadmat``. v7.3 (HDF5) files are opened with h5py and their
+    ``"data"`` is a lazy :class:`~importers.mat73.LazyChannels`. ``cancel`` is anything with ``is_set()``; it is
+    checked before every read, so a long decode stops within one read
+    block (128 KiB of compressed data).
+    """
+    with CancellableFile(path, cancel) as f:
+        if mat73.is_mat73(f):
+            return mat73.load_mat73(path)
+        try:
+            _, analog = mat5.read_analog(f)
+        except mat5.Mat5FormatError:
+            f.seek(0)
+            return _load_mat_scipy(path, f)
+    freq = analog.get("Frequency")
+    return {
+        "path": path,
+        "data": analog["Data"],
+        "labels": np.asarray(analog["Labels"], dtype=object).ravel(),
+        "frequency": None if freq is None else float(np.ravel(freq)[0]),
+    }
+
+
+def _load_mat_scipy(path, f):
+    mat = scipy.io.loadmat(f, struct_as_record=False, squeeze_me=True)
+    key = next((k for k in mat.keys() if not k.startswith("__")), None)
+    if not key:
+        return None
+    tl = mat[key]
+    return {
+        "path": path,
+        "data": tl.Analog.Data,
+        "labels": tl.Analog.Labels,
+        "frequency": getattr(tl.Analog, "Frequency", None),
+    }
+
+
+def load_cached(path, cancel=None, cache=None):
+    """
+    :func:`load_mat` through a :class:`~importers.cache.DecodedCache`: a
+    hit memory-maps the stored matrix instead of decoding the file, a miss
+    decodes it and stores the result.
+    """
+    if cache is None:
+        return load_mat(path, cancel)
+    key = cache.key_for(path, opener=lambda p: CancellableFile(p, cancel))
+    res = cache.get(path, key)
+    if res is None:
+        res = load_mat(path, cancel)
+        if res is not None:
+            try:
+                cache.put(key, res)
+            except OSError as e:
+                print(f"[warn] Could not cache {os.path.basename(path)}: {e}")
+    return res
+
+
+def select_channels(res, channel_filter=None):
+    """
+    Wrap ``res["data"]`` in a :class:`ChannelStore` holding only the rows
+    ``channel_filter`` keeps; labels follow and ``res["channels"]`` lists
+    the kept rows' indices in the file.
+    """
+    data, labels = res["data"], res.get("labels")
+    nch = int(data.shape[0])
+    rows = channel_filter.rows(labels, nch) if channel_filter else list(range(nch))
+    if not rows:
+        raise ValueError(f"no channel matches {channel_filter.spec!r}")
+    res["data"] = ChannelStore(data, rows=rows)     # normalized on the worker
+    if labels is not None and channel_filter:
+        res["labels"] = np.asarray(labels, dtype=object).ravel()[rows]
+    res["channels"] = rows
+    return res
+
+
+def _decode(job):
+    path, cancel, cache, channel_filter = job
+    try:
+        res = load_cached(path, cancel, cache)
+        if res is not None:
+            res = select_channels(res, channel_filter)
+        return res, None
+    except ImportCancelled:
+        return None, None
+    except Exception as e:
+        return None, f"{os.path.basename(path)}: {e}"
+
+
+def _make_pool(mode, workers):
+    if mode == "process":
+        return multiprocessing.get_context("spawn").Pool(workers)
+    if mode == "thread":
+        return ThreadPool(workers)
+    raise ValueError(f"unknown import pool {mode!r} (expected 'thread' or 'process')")
+
+
+def iter_mats(paths, cancel=None, mode=IMPORT_POOL, workers=IMPORT_WORKERS, cache=None,
+              channel_filter=None, priority=None):
+    """
+    Decode ``paths`` concurrently, yielding ``(index, path, result, error)``
+    in input order as soon as a file and all files before it are done.
+
+    ``result`` is :func:`load_mat`'s dict (or None) after
+    :func:`select_channels` (``"data"`` is a ChannelStore of the channels
+    ``channel_filter`` keeps), ``error`` a message or None. With a
+    ``cache`` files go through :func:`load_cached`. Once ``cancel`` is set
+    nothing more is yielded: queued files are skipped, thread workers stop
+    at their next read and process workers are terminated.
+
+    ``priority`` (one number per path, e.g. its size) starts the highest
+    first so the big files do not end up running alone at the end; the
+    output order is unchanged.
+    """
+    paths = list(paths)
+    if not paths:
+        return
+    workers = max(1, min(len(paths), workers or os.cpu_count() or 1))
+    # Events cannot be pickled to other processes: those are terminated instead.
+    token = cancel if mode == "thread" else None
+
+    pool = _make_pool(mode, workers)
+    try:
+        order = sorted(range(len(paths)), key=lambda i: -priority[i]) if priority else range(len(paths))
+        pending = {i: pool.apply_async(_decode, ((paths[i], token, cache, channel_filter),))
+                   for i in order}
+        for i, path in enumerate(paths):
+            while True:
+                if cancel is not None and cancel.is_set():
+                    return
+                try:
+                    res, err = pending[i].get(timeout=POLL_S)
+                    break
+                except multiprocessing.TimeoutError:
+                    continue
+            del pending[i]         # delivered: drop the reference to its data
+            if cancel is not None and cancel.is_set():
+                return
+            yield i, path, res, err
+    finally:
+        pool.terminate()
+        pool.join()
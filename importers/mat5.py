@@ -0,0 +1,375 @@
+# /importers/mat5.py
+
+import struct
+import zlib
+
+import numpy as np
+
+
+# MAT v5 data types (element tags)
+miINT8, miUINT8, miINT16, miUINT16, miINT32, miUINT32 = 1, 2, 3, 4, 5, 6
+miSINGLE, miDOUBLE, miINT64, miUINT64 = 7, 9, 12, 13
+miMATRIX, miCOMPRESSED, miUTF8, miUTF16, miUTF32 = 14, 15, 16, 17, 18
+MI_DTYPES = {
+    miINT8: "i1", miUINT8: "u1", miINT16: "i2", miUINT16: "u2", miINT32: "i4",
+    miUINT32: "u4", miSINGLE: "f4", miDOUBLE: "f8", miINT64: "i8", miUINT64: "u8",
+    miUTF8: "u1", miUTF16: "u2", miUTF32: "u4",
+}
+
+# MAT v5 array classes (array flags)
+mxCELL, mxSTRUCT, mxCHAR = 1, 2, 4
+MX_DTYPES = {
+    6: "f8", 7: "f4", 8: "i1", 9: "u1", 10: "i2", 11: "u2",
+    12: "i4", 13: "u4", 14: "i8", 15: "u8",
+}
+COMPLEX_FLAG, LOGICAL_FLAG = 0x08, 0x02
+
+# Compressed bytes read (and inflated bytes discarded) per step.
+CHUNK = 1 << 17
+
+DEFAULT_FIELDS = ("Data", "Labels", "Frequency")
+
+# ``want`` value that reads a field's dims only, never its data.
+SHAPE = "shape"
+
+
+class Mat5FormatError(ValueError):
+    """Not a MAT v5 file, or a layout this reader does not handle."""
+
+
+class NotQTMError(Mat5FormatError):
+    """A readable MAT v5 file whose first variable is not a struct with ``Analog``."""
+
+
+# ---------------------------------------------------------------------------
+# Byte streams
+# ---------------------------------------------------------------------------
+class _FileStream:
+    """Uncompressed element bytes: skipping is a seek."""
+
+    def __init__(self, f):
+        self._f = f
+
+    def read(self, n):
+        buf = bytearray(n)
+        if self._f.readinto(buf) != n:
+            raise Mat5FormatError("unexpected end of file")
+        return buf
+
+    def skip(self, n):
+        self._f.seek(n, 1)
+
+
+class _InflateStream:
+    """
+    A miCOMPRESSED element inflated on demand. Reads never return more
+    than asked for, and skipped bytes are inflated in CHUNK steps and
+    dropped, so memory stays at what the caller keeps.
+    """
+
+    def __init__(self, f, nbytes):
+        self._f = f
+        self._left = int(nbytes)
+        self._z = zlib.decompressobj()
+
+    def _inflate(self, max_out):
+        while True:
+            data = self._z.unconsumed_tail
+            if not data and self._left > 0:
+                data = self._f.read(min(CHUNK, self._left))
+                self._left -= len(data)
+                if not data:
+                    raise Mat5FormatError("unexpected end of file")
+            out = self._z.decompress(data, max_out)
+            if out:
+                return out
+            if not data or self._z.eof:
+                raise Mat5FormatError("compressed element is truncated")
+
+    def read(self, n):
+        buf = bytearray(n)
+        pos = 0
+        while pos < n:
+            out = self._inflate(n - pos)
+            buf[pos:pos + len(out)] = out
+            pos += len(out)
+        return buf
+
+    def skip(self, n):
+        while n > 0:
+            n -= len(self._inflate(min(n, CHUNK)))
+
+
+class _Limited:
+    """The ``nbytes`` of one element inside ``stream``."""
+
+    def __init__(self, stream, nbytes):
+        self._s = stream
+        self.left = int(nbytes)
+
+    def read(self, n):
+        if n > self.left:
+            raise Mat5FormatError("sub-element overruns its matrix")
+        self.left -= n
+        return self._s.read(n)
+
+    def skip(self, n):
+        n = min(n, self.left)
+        self.left -= n
+        self._s.skip(n)
+
+    def skip_rest(self):
+        self.skip(self.left)
+
+
+# ---------------------------------------------------------------------------
+# Elements
+# ---------------------------------------------------------------------------
+def _tag(s, order):
+    """(type, nbytes, inline data or None); small elements carry their data."""
+    raw = s.read(8)
+    mtype, nbytes = struct.unpack(order + "II", raw)
+    if mtype >> 16:
+        nbytes, mtype = mtype >> 16, mtype & 0xFFFF
+        return mtype, nbytes, bytes(raw[4:4 + nbytes])
+    return mtype, nbytes, None
+
+
+def _element(s, order):
+    """(type, data) of a non-matrix sub-element, padding consumed."""
+    mtype, nbytes, data = _tag(s, order)
+    if data is None:
+        data = s.read(nbytes)
+        s.skip(-nbytes % 8)
+    return mtype, data
+
+
+def _typed(mtype, data, order):
+    try:
+        return np.frombuffer(data, dtype=order + MI_DTYPES[mtype])
+    except KeyError:
+        raise Mat5FormatError(f"unsupported data type {mtype}") from None
+
+
+def _chars(mtype, data, order, dims):
+    if mtype == miUTF8 or mtype == miUINT8:
+        codes = np.frombuffer(bytes(data).decode("utf-8" if mtype == miUTF8 else "latin-1")
+                              .encode("utf-32-le"), dtype="<u4")
+    else:
+        codes = _typed(mtype, data, order)
+    if codes.size == 0:
+        return ""
+    rows = codes.reshape(dims, order="F").reshape(dims[0], -1)
+    strings = ["".join(map(chr, r)) for r in rows]
+    return strings[0] if len(strings) == 1 else np.array(strings, dtype=object)
+
+
+class _Matrix:
+    """Array flags, dims and name of a miMATRIX element (its data follows)."""
+
+    def __init__(self, s, order):
+        _, flags = _element(s, order)
+        word = struct.unpack(order + "I", bytes(flags[:4]))[0]
+        self.cls = word & 0xFF
+        self.flags = (word >> 8) & 0xFF
+        _, dims = _element(s, order)
+        self.dims = tuple(int(d) for d in _typed(miINT32, dims, order))
+        _, name = _element(s, order)
+        self.name = bytes(name).rstrip(b"\0").decode("latin-1")
+
+    @property
+    def count(self):
+        return int(np.prod(self.dims)) if self.dims else 0
+
+
+def _field_names(s, order):
+    _, raw = _element(s, order)
+    width = int(_typed(miINT32, raw, order)[0])
+    _, names = _element(s, order)
+    names = bytes(names)
+    return [names[i:i + width].split(b"\0", 1)[0].decode("latin-1")
+            for i in range(0, len(names), width)] if width else []
+
+
+def _value(s, order, want=None):
+    """
+    Decode the miMATRIX whose tag was just read (``s`` limited to it).
+
+    ``want`` maps struct field names to their own ``want`` (None: the
+    whole field, :data:`SHAPE`: its dims tuple); other fields are skipped.
+    Structs become dicts (first element only for struct arrays), cells
+    object arrays, chars str. Numeric arrays keep MATLAB's dims;
+    unsupported classes give None.
+    """
+    if s.left == 0:
+        return (0, 0) if want == SHAPE else np.zeros((0, 0))
+    m = _Matrix(s, order)
+    if want == SHAPE:
+        s.skip_rest()
+        return m.dims
+
+    if m.cls in MX_DTYPES:
+        mtype, data = _element(s, order)
+        out = _typed(mtype, data, order)
+        if m.flags & COMPLEX_FLAG:
+            imtype, idata = _element(s, order)
+            out = out.astype(np.complex128)
+            out.imag = _typed(imtype, idata, order)
+        else:
+            # MATLAB stores e.g. integer-valued doubles as a smaller type
+            dtype = np.dtype(bool) if m.flags & LOGICAL_FLAG else np.dtype(MX_DTYPES[m.cls])
+            if out.dtype != dtype:
+                out = out.astype(dtype)
+        s.skip_rest()
+        return out.reshape(m.dims, order="F")
+
+    if m.cls == mxCHAR:
+        mtype, data = _element(s, order)
+        s.skip_rest()
+        return _chars(mtype, data, order, m.dims)
+
+    if m.cls == mxCELL:
+        out = np.empty(m.count, dtype=object)
+        for i in range(m.count):
+            out[i] = _child(s, order)
+        return out.reshape(m.dims, order="F")
+
+    if m.cls == mxSTRUCT:
+        names = _field_names(s, order)
+        fields = {}
+        for i in range(m.count):
+            for name in names:
+                if i == 0 and (want is None or name in want):
+                    fields[name] = _child(s, order, None if want is None else want[name])
+                else:
+                    _skip_child(s, order)
+            if want is not None and i == 0 and len(fields) == len(want):
+                break       # all requested fields read: leave the rest untouched
+        s.skip_rest()
+        return fields
+
+    s.skip_rest()       # sparse, objects, function handles
+    return None
+
+
+def _child(s, order, want=None):
+    mtype, nbytes, _ = _tag(s, order)
+    if mtype != miMATRIX:
+        raise Mat5FormatError(f"expected a matrix element, got type {mtype}")
+    sub = _Limited(s, nbytes)
+    out = _value(sub, order, want)
+    sub.skip_rest()
+    return out
+
+
+def _skip_child(s, order):
+    _, nbytes, _ = _tag(s, order)
+    s.skip(nbytes)
+
+
+# ---------------------------------------------------------------------------
+# Files
+# ---------------------------------------------------------------------------
+def _header(f):
+    head = f.read(128)
+    if len(head) < 128 or head[:4] == b"\0\0\0\0":
+        raise Mat5FormatError("not a MAT v5 file")
+    endian = head[126:128]
+    if endian == b"IM":
+        order = "<"
+    elif endian == b"MI":
+        order = ">"
+    else:
+        raise Mat5FormatError("not a MAT v5 file")
+    if struct.unpack(order + "H", head[124:126])[0] != 0x0100:
+        raise Mat5FormatError("unsupported MAT version")
+    return order
+
+
+def is_compressed(f):
+    """
+    True if the first top-level element of the MAT v5 file object ``f`` is
+    miCOMPRESSED (the ``-v7`` default); only its tag is read. Rewinds ``f``.
+    """
+    order = _header(f)
+    raw = f.read(8)
+    f.seek(0)
+    return len(raw) == 8 and struct.unpack(order + "I", raw[:4])[0] == miCOMPRESSED
+
+
+def read_struct_fields(f, want):
+    """
+    Selected fields of the first variable (a struct) of the MAT v5 file
+    object ``f``. ``want`` is a nested dict as for :func:`_value`, e.g.
+    ``{"Analog": {"Data": None, "Labels": None}}``.
+
+    Only the wanted path is decoded. Other fields of a compressed
+    variable are inflated and dropped, and nothing is inflated after the
+    last wanted field. Uncompressed fields are seeked over.
+    """
+    order = _header(f)
+    while True:
+        raw = f.read(8)
+        if len(raw) < 8:
+            raise Mat5FormatError("file has no variables")
+        mtype, nbytes = struct.unpack(order + "II", raw)
+        end = f.tell() + nbytes
+        if mtype == miCOMPRESSED:
+            s = _Limited(_InflateStream(f, nbytes), 1 << 62)
+            mtype, nbytes, _ = _tag(s, order)
+        else:
+            s = _FileStream(f)
+            end += -nbytes % 8
+        if mtype != miMATRIX:
+            raise Mat5FormatError(f"unexpected top-level element type {mtype}")
+        sub = _Limited(s, nbytes)
+        m = _Matrix(sub, order)
+        if m.name.startswith("__"):
+            f.seek(end)
+            continue
+        if m.cls != mxSTRUCT:
+            raise NotQTMError(f"variable {m.name!r} is not a struct")
+        return m.name, _struct_fields(sub, order, m, want)
+
+
+def _struct_fields(s, order, m, want):
+    names = _field_names(s, order)
+    fields = {}
+    for name in names:
+        if name in want:
+            fields[name] = _child(s, order, want[name])
+            if len(fields) == len(want):
+                break
+        else:
+            _skip_child(s, order)
+    return fields
+
+
+def read_analog(f, fields=DEFAULT_FIELDS):
+    """
+    ``Analog`` sub-struct fields (subset of ``fields``) of a QTM export,
+    as ``(variable_name, {field: value})``. Missing fields are absent.
+    """
+    return _analog(f, {k: None for k in fields})
+
+
+def scan_analog(f):
+    """
+    :func:`read_analog` for a pre-scan: ``Data`` comes back as its dims
+    tuple (its contents are skipped), ``Frequency`` as a value.
+
+    Cheap only for uncompressed variables. A compressed one is inflated
+    (and dropped) up to ``Analog``, including any large ``Force`` or
+    ``Trajectories`` fields stored before it, so on a typical QTM export
+    this costs almost as much as :func:`read_analog`; see
+    :func:`is_compressed`.
+    """
+    return _analog(f, {"Data": SHAPE, "Frequency": None})
+
+
+def _analog(f, want):
+    name, top = read_struct_fields(f, {"Analog": want})
+    analog = top.get("Analog")
+    if not isinstance(analog, dict):
+        raise NotQTMError(f"variable {name!r} has no Analog struct")
+    return name, analog
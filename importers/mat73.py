@@ -0,0 +1,156 @@
+# /importers/mat73.py
+
+import numpy as np
+
+try:
+    import h5py
+except ImportError:         # optional: only needed for -v7.3 files
+    h5py = None
+
+
+# v7.3 files are HDF5 behind MATLAB's 512-byte user block.
+HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+USER_BLOCK = 512
+
+
+def is_mat73(f):
+    """True if the open binary file ``f`` is a MAT v7.3 (HDF5) file; rewinds ``f``."""
+    head = f.read(USER_BLOCK + len(HDF5_SIGNATURE))
+    f.seek(0)
+    return HDF5_SIGNATURE in (head[:8], head[USER_BLOCK:])
+
+
+def _require_h5py():
+    if h5py is None:
+        raise ImportError("reading MAT v7.3 files needs h5py")
+
+
+class LazyChannels:
+    """
+    ``(channels x samples)`` view of a v7.3 ``Analog.Data`` dataset that
+    reads from disk only what is indexed.
+
+    MATLAB writes column-major, so the HDF5 dataset is ``(samples x
+    channels)``. Whole-channel reads decode the band of channels sharing
+    the requested channel's chunks once and keep it, so walking the
+    channels in order decompresses every chunk once. Pickling sends the
+    path and re-opens the file on the other side.
+    """
+
+    ndim = 2
+
+    def __init__(self, path, name):
+        _require_h5py()
+        self._path, self._name = path, name
+        self._file = h5py.File(path, "r")
+        self._ds = self._file[name]
+        npts, nch = self._ds.shape
+        self.shape = (int(nch), int(npts))
+        self.dtype = np.dtype(self._ds.dtype)
+        chunks = self._ds.chunks
+        self._band = int(chunks[1]) if chunks else 1
+        self._cache = {}        # channel -> samples of the last band read
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def chunks(self):
+        return self._ds.chunks
+
+    def _row(self, row):
+        row = int(row)
+        if row < 0:
+            row += self.shape[0]
+        if not 0 <= row < self.shape[0]:
+            raise IndexError(f"channel {row} out of range for {self.shape[0]} channels")
+        return row
+
+    def channel(self, row):
+        row = self._row(row)
+        if row not in self._cache:
+            lo = row - row % self._band
+            hi = min(lo + self._band, self.shape[0])
+            block = np.ascontiguousarray(self._ds[:, lo:hi].T)
+            self._cache = {lo + i: block[i] for i in range(hi - lo)}
+        return self._cache[row]
+
+    def __getitem__(self, key):
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(rows, (int, np.integer)):
+            if cols == slice(None):
+                return self.channel(rows)
+            return self._ds[cols, self._row(rows)]
+        if isinstance(rows, slice):
+            rows = range(*rows.indices(self.shape[0]))
+        if not len(rows):
+            return np.empty((0, 0), dtype=self.dtype)
+        return np.stack([self[r, cols] for r in rows])
+
+    def __array__(self, dtype=None, copy=None):
+        out = self._ds[()].T
+        return out if dtype is None else out.astype(dtype)
+
+    def close(self):
+        self._cache = {}
+        self._file.close()
+
+    def __getstate__(self):
+        return {"path": self._path, "name": self._name}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["name"])
+
+
+def _string(f, ds):
+    """A MATLAB char array (uint16 code units, column-major) as str rows."""
+    codes = np.asarray(ds[()])
+    if codes.size == 0 or ds.attrs.get("MATLAB_empty", 0):
+        return [""]
+    return ["".join(map(chr, r)).rstrip("\0") for r in codes.T]
+
+
+def _labels(f, ds):
+    if ds.dtype == h5py.ref_dtype:
+        refs = np.asarray(ds[()]).T.ravel()
+        return np.array([_string(f, f[r])[0] for r in refs], dtype=object)
+    return np.array(_string(f, ds), dtype=object)
+
+
+def load_mat73(path):
+    """
+    :func:`importers.mat.load_mat` for v7.3 files: ``"data"`` is a
+    :class:`LazyChannels` (open until closed or garbage-collected); labels
+    and frequency are read eagerly.
+    """
+    _require_h5py()
+    with h5py.File(path, "r") as f:
+        key = next((k for k in f.keys() if not k.startswith("#")), None)
+        if not key:
+            return None
+        grp = f[key]
+        if "Analog" not in grp or "Data" not in grp["Analog"]:
+            raise ValueError(f"variable {key!r} has no Analog.Data")
+        analog = grp["Analog"]
+        labels = _labels(f, analog["Labels"]) if "Labels" in analog else None
+        freq = float(np.ravel(analog["Frequency"][()])[0]) if "Frequency" in analog else None
+        name = analog["Data"].name
+    return {
+        "path": path,
+        "data": LazyChannels(path, name),
+        "labels": labels,
+        "frequency": freq,
+    }
+
+
+def scan_mat73(path):
+    """``(channels, samples, frequency)`` of a v7.3 export, from metadata only."""
+    _require_h5py()
+    with h5py.File(path, "r") as f:
+        key = next((k for k in f.keys() if not k.startswith("#")), None)
+        analog = f[key].get("Analog") if key else None
+        if analog is None or "Data" not in analog:
+            raise ValueError(f"variable {key!r} has no Analog.Data")
+        npts, nch = analog["Data"].shape
+        freq = float(np.ravel(analog["Frequency"][()])[0]) if "Frequency" in analog else None
+    return int(nch), int(npts), freq
@@ -0,0 +1,95 @@
+# /importers/prescan.py
+
+import os
+
+import numpy as np
+import scipy.io
+
+from importers import mat5, mat73
+
+
+def scan_mat(path):
+    """
+    Header facts of one ``.mat`` export, without decoding its data arrays:
+    ``{"path", "size", "channels", "samples", "frequency", "duration",
+    "error"}``. ``error`` is None for an importable file, otherwise the
+    reason it will fail (the other fields may then be None). ``channels``
+    is None without an error for a v5 layout :mod:`importers.mat5` does
+    not handle: the import reads it with ``scipy.io.loadmat`` instead, so
+    it is kept (see :func:`_scan_scipy`).
+
+    v7.3 files only read HDF5 metadata and uncompressed v5 files seek over
+    their data. Compressed v5 variables have to be inflated up to
+    ``Analog`` (every field before it, e.g. Force or Trajectories data,
+    is inflated and dropped), which costs close to a full decode: check
+    :func:`is_quick` before scanning on the GUI thread.
+    """
+    info = {"path": path, "size": None, "channels": None, "samples": None,
+            "frequency": None, "duration": None, "error": None}
+    try:
+        info["size"] = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if mat73.is_mat73(f):
+                nch, npts, freq = mat73.scan_mat73(path)
+            else:
+                _, analog = mat5.scan_analog(f)
+                if "Data" not in analog:
+                    raise ValueError("Analog has no Data field")
+                nch, npts = analog["Data"][:2]
+                freq = analog.get("Frequency")
+                freq = None if freq is None else float(np.ravel(freq)[0])
+    except mat5.NotQTMError as e:
+        info["error"] = str(e)
+        return info
+    except mat5.Mat5FormatError as e:
+        return _scan_scipy(info, e)
+    except Exception as e:
+        info["error"] = str(e)
+        return info
+
+    info.update(channels=int(nch), samples=int(npts), frequency=freq,
+                duration=npts / freq if freq else None)
+    return info
+
+
+def _scan_scipy(info, reason):
+    """
+    :func:`scan_mat` of a file :mod:`importers.mat5` gave up on (``reason``).
+    The import falls back to ``scipy.io.loadmat`` for it, so the file is
+    kept, with unknown dims, if scipy lists a struct as its first variable.
+    """
+    try:
+        names = [v for v in scipy.io.whosmat(info["path"]) if not v[0].startswith("__")]
+    except Exception:
+        names = []
+    if not names:
+        info["error"] = f"not a readable QTM MAT file ({reason})"
+    elif names[0][2] != "struct":
+        info["error"] = f"variable {names[0][0]!r} is not a struct"
+    return info
+
+
+def is_quick(path):
+    """
+    True if :func:`scan_mat` only reads headers for ``path`` (v7.3 or
+    uncompressed v5), False for a compressed v5 file. Unreadable files
+    count as quick: :func:`scan_mat` fails on them straight away.
+    """
+    try:
+        with open(path, "rb") as f:
+            return mat73.is_mat73(f) or not mat5.is_compressed(f)
+    except (OSError, mat5.Mat5FormatError):
+        return True
+
+
+def describe(info):
+    """One-line summary of :func:`scan_mat`'s result for the file list."""
+    if info["error"]:
+        return f"excluded: {info['error']}"
+    if info["channels"] is None:
+        return f"layout not pre-scanned, read on import · {info['size'] / 2**20:.1f} MB"
+    parts = [f"{info['channels']} ch", f"{info['samples']:,} samples"]
+    if info["duration"] is not None:
+        parts.append(f"{info['duration']:.1f} s @ {info['frequency']:g} Hz")
+    parts.append(f"{info['size'] / 2**20:.1f} MB")
+    return " · ".join(parts)
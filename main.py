@@ -82,8 +82,10 @@ from matplotlib.figure import Figure
 # -- CUSTOM ---------------------
 from config.defaults import BEST_OF
 from dialogs.load_mat_dialog import LoadMat
+from importers.cache import default_cache
 from processors.processors import Processor
-from plot_controller import PlotController
+from plotting.backends import controller_class
+from plotting.tab_cache import CanvasLRU
 import ui_initializer as gui
 from utilities.version_info import (
     GITREVHEAD, BUILDNUMBER, VERSIONNUMBER, VERSIONNAME, FRIENDLYVERSIONNAME,
@@ -178,7 +180,7 @@ class ApplicationWindow(QtWidgets.QMainWindow):
             print("❌ form_btm_graph not found!")
 
         # Plot controller
-        self.plot_controller = PlotController(
+        self.plot_controller = controller_class()(
             parent=self,
             container=self.lbl_background,
             main_window=self
@@ -231,6 +233,9 @@ class ApplicationWindow(QtWidgets.QMainWindow):
             QTabBar::tab { font-size: 13px; padding: 8px 16px; height: 15px; }
         """)
         self.tw_plotting.clear()
+        self._canvas_lru = CanvasLRU()
+        self._replace_tabs = False
+        self.tw_plotting.currentChanged.connect(self._on_tab_activated)
         self._enable_tab_context_menu()
 
     # ---------------- Tab context menu ----------------
@@ -255,10 +260,19 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         tab_name = self.tw_plotting.tabText(index)
         widget = self.tw_plotting.widget(index)
         if widget:
-            widget.deleteLater()
+            self._dispose_tab(widget)
         self.tw_plotting.removeTab(index)
         self.ledt_output.appendPlainText(f"[info] Closed tab: {tab_name}")
 
+    def _dispose_tab(self, widget):
+        """Release the tab's controller (canvas, timers, pyramids) and delete the tab."""
+        plot_ctrl = getattr(widget, "plot_ctrl", None)
+        if plot_ctrl is not None:
+            self._canvas_lru.discard(plot_ctrl)
+            plot_ctrl.release()
+            widget.plot_ctrl = None
+        widget.deleteLater()
+
     # ---------------- Helpers ----------------
     def _get_current_plot_and_row(self):
         """
@@ -291,7 +305,7 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         """Clear selections from all rows in the given PlotController."""
         if not plot_ctrl:
             return
-        for row in range(len(plot_ctrl.axes)):
+        for row in list(plot_ctrl._selections):
             plot_ctrl.clear_row_selections(row)
         self.ledt_output.appendPlainText("[info] Cleared all selections in current tab")
 
@@ -303,24 +317,62 @@ class ApplicationWindow(QtWidgets.QMainWindow):
             return
         
         dialog = LoadMat(self)
-        dialog.matsImported.connect(self.on_mats_imported)
+        dialog.importStarted.connect(self.on_mats_import_started)
+        dialog.matImported.connect(self.on_mat_imported)
         dialog.exec_()
 
+    def on_mats_import_started(self):
+        # Old tabs are replaced once the first new file has arrived
+        self._replace_tabs = True
+
+    def on_mat_imported(self, res):
+        """Add the tab of one decoded file (files arrive while the rest still load)."""
+        if self._replace_tabs:
+            self._replace_tabs = False
+            for i in range(self.tw_plotting.count()):
+                self._dispose_tab(self.tw_plotting.widget(i))
+            self.tw_plotting.clear()
+            self._canvas_lru.clear()
+
+        base_name = os.path.basename(res["path"])
+        tab = QWidget()
+        QVBoxLayout(tab)
+
+        # Placeholder only: the canvas is built when the tab is first shown
+        plot_ctrl = controller_class()(parent=self, container=tab, main_window=self, lazy=True)
+        plot_ctrl.set_data(res["data"], res["labels"], source_path=res["path"],
+                           frequency=res.get("frequency"), channels=res.get("channels"))
+
+        tab.plot_ctrl = plot_ctrl
+        index = self.tw_plotting.addTab(tab, base_name)    # first tab: currentChanged renders it
+        self._update_tab_memory(index)
+
     def on_mats_imported(self, results):
-        self.tw_plotting.clear()
+        self.on_mats_import_started()
         for res in results:
-            base_name = os.path.basename(res["path"])
-            tab = QWidget()
-            layout = QVBoxLayout(tab)
+            self.on_mat_imported(res)
 
-            plot_ctrl = PlotController(parent=self, container=tab, main_window=self)
-            layout.addWidget(plot_ctrl.toolbar)
-            layout.addWidget(plot_ctrl.canvas)
-
-            plot_ctrl.plot_mat_arrays(res["data"], res["labels"], source_path=res["path"])
+    def _on_tab_activated(self, index):
+        """Render the shown tab, releasing the least recently shown beyond LIVE_CANVASES."""
+        tab = self.tw_plotting.widget(index) if index >= 0 else None
+        plot_ctrl = getattr(tab, "plot_ctrl", None)
+        if plot_ctrl is not None:
+            self._canvas_lru.activate(plot_ctrl, tab)
+            self._update_tab_memory(index)
 
-            tab.plot_ctrl = plot_ctrl
-            self.tw_plotting.addTab(tab, base_name)
+    def _update_tab_memory(self, index):
+        """Show the tab's in-memory size (samples + plot pyramids) in its tooltip."""
+        tab = self.tw_plotting.widget(index)
+        plot_ctrl = getattr(tab, "plot_ctrl", None)
+        if plot_ctrl is None:
+            return
+        store = plot_ctrl._data
+        where = "memory-mapped" if store is not None and store.is_mapped else "in memory"
+        self.tw_plotting.setTabToolTip(
+            index,
+            f"{plot_ctrl._source_path or self.tw_plotting.tabText(index)}\n"
+            f"{plot_ctrl.memory_usage() / 2**20:.1f} MB in memory (samples {where})",
+        )
 
     # ---------------- Burst detection ----------------
     def on_burst_detection(self):
@@ -350,35 +402,20 @@ class ApplicationWindow(QtWidgets.QMainWindow):
             return
 
         signal = plot_ctrl._data[row, :]
-        fs = globals().get("DEFAULT_SEMG_FREQUENCY", 2000)
+        fs = plot_ctrl.sample_rate
 
         try:
             proc = Processor()
-            energy_vec, _ = proc.energy_detection(signal, fs=fs)
+            starts, ends = proc.energy_bursts(signal, fs=fs)
 
             # clear old patches + selections for this row
             if row in plot_ctrl._patches:
                 for patch in plot_ctrl._patches[row]:
-                    try:
-                        patch.remove()
-                    except Exception:
-                        pass
+                    plot_ctrl._blit.remove(patch)
                 plot_ctrl._patches[row] = []
             plot_ctrl._selections[row] = []
 
-            # detect bursts
-            bursts = []
-            inside = False
-            start = None
-            for i, val in enumerate(energy_vec):
-                if val == 1 and not inside:
-                    start = i
-                    inside = True
-                elif val == 0 and inside:
-                    bursts.append((start, i))
-                    inside = False
-            if inside:
-                bursts.append((start, len(energy_vec)))
+            bursts = list(zip(starts.tolist(), ends.tolist()))
 
             fname = os.path.basename(plot_ctrl._source_path) if plot_ctrl._source_path else f"Tab {idx}"
             label = plot_ctrl._labels[row] if plot_ctrl._labels is not None else f"Row {row+1}"
@@ -388,19 +425,18 @@ class ApplicationWindow(QtWidgets.QMainWindow):
                     f"[info] Burst detection for {fname}, {label}: {len(bursts)} bursts"
                 )
 
+                # Use same MVC processing as the MVC calculation for consistency
+                burst_mvcs = plot_ctrl.span_mvcs(row, bursts)
+
                 burst_vals = []
                 for j, (lo, hi) in enumerate(bursts, 1):
                     seg = signal[int(lo):int(hi)]
                     if seg.size > 0:
-                        # Use same MVC processing as the MVC calculation for consistency
-                        mvc_val, _ = proc.mvc_matlab(seg)
+                        mvc_val = burst_mvcs[j - 1]
                         val = float(mvc_val) if not np.isnan(mvc_val) else 0.0
                         burst_vals.append(val)
 
-                        # draw new span
-                        p = plot_ctrl.axes[row].axvspan(lo, hi, color="orange", alpha=0.30)
                         plot_ctrl._selections[row].append((lo, hi))
-                        plot_ctrl._patches[row].append(p)
 
                         self.ledt_output.appendPlainText(f"   Burst {j}: {lo}–{hi} → {val:.2f}")
 
@@ -410,13 +446,51 @@ class ApplicationWindow(QtWidgets.QMainWindow):
                     self.ledt_output.appendPlainText(f"   Average MVC value: {avg_val:.2f}")
                     self.ledt_output.appendPlainText(f"   Max MVC value: {max_val:.2f}")
 
-                plot_ctrl.canvas.draw_idle()
+                # draw new spans (only if the row is in the visible bank)
+                plot_ctrl._show_spans(row)
             else:
                 self.ledt_output.appendPlainText(f"[warn] No bursts detected for {fname}, {label}")
 
         except Exception as e:
             self.ledt_output.appendPlainText(f"[error] Burst detection failed: {e}")
 
+    # ---------------- Auto MVC windows ----------------
+    def on_auto_mvc(self):
+        if not self._is_license_valid(recheck=True):
+            self._show_license_required_message("Automatic MVC selection")
+            return
+
+        idx = self.tw_plotting.currentIndex()
+        if idx < 0:
+            self.ledt_output.appendPlainText("[warn] No plotting tab is selected.")
+            return
+
+        tab = self.tw_plotting.widget(idx)
+        plot_ctrl = getattr(tab, "plot_ctrl", None)
+        if plot_ctrl is None or plot_ctrl._data is None:
+            self.ledt_output.appendPlainText("[warn] No data loaded on this tab.")
+            return
+
+        fs = plot_ctrl.sample_rate
+        try:
+            selections = plot_ctrl.auto_select_windows(fs)
+        except Exception as e:
+            self.ledt_output.appendPlainText(f"[error] Automatic MVC selection failed: {e}")
+            return
+
+        fname = os.path.basename(plot_ctrl._source_path) if plot_ctrl._source_path else f"Tab {idx}"
+        self.ledt_output.appendPlainText(f"\n=== Auto MVC windows: {fname} ===")
+        for row, spans in selections.items():
+            label = plot_ctrl._labels[row] if plot_ctrl._labels is not None else f"Row {row+1}"
+            if not spans:
+                self.ledt_output.appendPlainText(f"[warn] {label}: signal shorter than one window")
+                continue
+            mvc_values = plot_ctrl.span_mvcs(row, spans)
+            windows = ", ".join(f"{lo}–{hi}" for lo, hi in spans)
+            self.ledt_output.appendPlainText(
+                f"{label}: {windows} → MVC = {float(np.nanmax(mvc_values)):.2f}"
+            )
+
     # ---------------- Selections ----------------
     def on_clear_selections(self):
         """Remove all selections from all subplots in the current tab."""
@@ -434,15 +508,12 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         for r in range(plot_ctrl._data.shape[0]):
             if r in plot_ctrl._patches:
                 for patch in plot_ctrl._patches[r]:
-                    try:
-                        patch.remove()
-                    except Exception:
-                        pass
+                    plot_ctrl._blit.remove(patch)
                 plot_ctrl._patches[r] = []
             if r in plot_ctrl._selections:
                 plot_ctrl._selections[r] = []
 
-        plot_ctrl.canvas.draw_idle()
+        plot_ctrl._blit.update(*plot_ctrl.axes)
         self.ledt_output.appendPlainText("[info] Cleared all selections for this tab]")
 
     # ---------------- Export / Import XML ----------------
@@ -485,7 +556,9 @@ class ApplicationWindow(QtWidgets.QMainWindow):
 
         for f in session_data:
             fe = ET.SubElement(root, "File", name=f["filename"])
-            ET.SubElement(fe, "Row").text = str(f["row"])
+            ET.SubElement(fe, "Row").text = str(f["row"])         # channel index in the file
+            if f["label"] is not None:
+                ET.SubElement(fe, "Label").text = f["label"]
             if f["mvc"] is not None:
                 ET.SubElement(fe, "MVC").text = str(f["mvc"])
             bursts = ET.SubElement(fe, "Bursts")
@@ -554,16 +627,24 @@ class ApplicationWindow(QtWidgets.QMainWindow):
                 tab = self.tw_plotting.widget(tab_idx)
                 plot_ctrl = getattr(tab, "plot_ctrl", None)
 
-                if plot_ctrl is not None and intervals:
-                    row = int(row_text)
-                    if row in plot_ctrl._selections:
-                        plot_ctrl.clear_row_selections(row)
-                    ax = plot_ctrl.axes[row]
+                # <Row> is the channel index in the file; map it to this tab's row
+                try:
+                    row = plot_ctrl.row_of_channel(int(row_text)) if plot_ctrl is not None else None
+                except ValueError:
+                    row = None
+                if plot_ctrl is not None and intervals and row is None:
+                    msg = (
+                        f"[warn] MATLAB MVC (imported)\n"
+                        f"{fname}:{spacer}Row {row_text}: {mvc_text}\n"
+                        f"bursts at: {bursts_str} (channel not in this tab: "
+                        f"excluded by its channel filter or out of range)"
+                    )
+                elif plot_ctrl is not None and intervals:
+                    plot_ctrl.clear_row_selections(row)
                     for (lo, hi) in intervals:
-                        patch = ax.axvspan(lo, hi, color="orange", alpha=0.3)
-                        plot_ctrl._patches[row].append(patch)
                         plot_ctrl._selections[row].append((lo, hi))
-                    plot_ctrl.canvas.draw_idle()
+                    if plot_ctrl.is_live:
+                        plot_ctrl._show_spans(row)
 
                     msg = (
                         f"[info] MATLAB MVC (imported)\n"
@@ -662,6 +743,8 @@ class ApplicationWindow(QtWidgets.QMainWindow):
             self.importXMLmot_action.setEnabled(license_valid)
         if hasattr(self, 'exportXMLmot_action'):
             self.exportXMLmot_action.setEnabled(license_valid)
+        if hasattr(self, 'autoMVC_action'):
+            self.autoMVC_action.setEnabled(license_valid)
         # Note: licenseInfoAction (Request License) should always be enabled
         
         if not license_valid:
@@ -707,7 +790,6 @@ class ApplicationWindow(QtWidgets.QMainWindow):
             self.ledt_output.appendPlainText("[warn] No data loaded in this PlotController")
             return
 
-        signal = plot_ctrl._data[row, :]
         selections = plot_ctrl._selections.get(row, [])
 
         if len(selections) < BEST_OF:
@@ -716,19 +798,14 @@ class ApplicationWindow(QtWidgets.QMainWindow):
             )
             return
 
-        proc = Processor()
-        mvc_values = []
-        for (lo, hi) in selections[:BEST_OF]:
-            segment = signal[int(lo):int(hi)]
-            if segment.size > 0:
-                mvc_val, rms_val = proc.mvc_matlab(segment)
-                mvc_values.append(mvc_val)
+        mvc_values = plot_ctrl.span_mvcs(row, selections[:BEST_OF])
+        mvc_values = mvc_values[~np.isnan(mvc_values)]
 
-        if not mvc_values:
+        if not mvc_values.size:
             self.ledt_output.appendPlainText("[warn] No valid data in selected intervals.")
             return
 
-        mvc_final = max(mvc_values)
+        mvc_final = float(np.max(mvc_values))
         fname = os.path.basename(plot_ctrl._source_path) if plot_ctrl._source_path else f"Tab {idx}"
         label = plot_ctrl._labels[row] if plot_ctrl._labels is not None else f"Row {row+1}"
         msg = f"[info] MATLAB MVC (best of {BEST_OF})\nfor {fname}, {label}: {mvc_final:.3f}"
@@ -747,7 +824,6 @@ class ApplicationWindow(QtWidgets.QMainWindow):
             return
 
         self.ledt_output.appendPlainText("\n=== Batch MVC all open tabs ===")
-        proc = Processor()
         any_processed = False
 
         for i in range(total_tabs):
@@ -776,19 +852,14 @@ class ApplicationWindow(QtWidgets.QMainWindow):
 
             self.set_tab_alert(i, False)
 
-            signal = plot_ctrl._data[row, :]
-            mvc_values = []
-            for (lo, hi) in selections[:BEST_OF]:
-                segment = signal[int(lo):int(hi)]
-                if segment.size > 0:
-                    mvc_val, _ = proc.mvc_matlab(segment)
-                    mvc_values.append(mvc_val)
+            mvc_values = plot_ctrl.span_mvcs(row, selections[:BEST_OF])
+            mvc_values = mvc_values[~np.isnan(mvc_values)]
 
-            if not mvc_values:
+            if not mvc_values.size:
                 self.ledt_output.appendPlainText(f"[warn] {tab_name}: No valid data in selections.")
                 continue
 
-            mvc_final = max(mvc_values)
+            mvc_final = float(np.max(mvc_values))
             fname = os.path.basename(plot_ctrl._source_path) if plot_ctrl._source_path else tab_name
             label = plot_ctrl._labels[row] if plot_ctrl._labels is not None else f"Row {row+1}"
 
@@ -822,6 +893,38 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         else:
             self.tw_plotting.setTabIcon(index, QIcon())
 
+    # ---------------- Decoded-data cache ----------------
+    def show_mat_cache(self):
+        """Show the decoded MAT cache's location and size, with a Clear button."""
+        cache = default_cache()
+        if cache is None:
+            QMessageBox.information(self, "Import Cache",
+                                    "The import cache is disabled (MAT_CACHE_MB = 0).")
+            return
+        entries = cache.entries()
+        used = sum(e[1] for e in entries) / 2**20
+        box = QMessageBox(self)
+        box.setWindowTitle("Import Cache")
+        box.setIcon(QMessageBox.Information)
+        box.setText(
+            f"Decoded MAT files: {len(entries)}\n"
+            f"Size: {used:.1f} MB of {cache.max_bytes / 2**20:.0f} MB\n\n"
+            f"Location:\n{cache.root}"
+        )
+        if entries:
+            box.setDetailedText("\n".join(src or key for key, _, _, src in reversed(entries)))
+        clear_btn = box.addButton("Clear Cache", QMessageBox.DestructiveRole)
+        box.addButton(QMessageBox.Close)
+        box.exec_()
+        if box.clickedButton() is clear_btn:
+            kept = cache.clear()
+            freed = used - cache.size() / 2**20
+            self.ledt_output.appendPlainText(f"[info] Import cache cleared ({freed:.1f} MB)")
+            if kept:
+                self.ledt_output.appendPlainText(
+                    f"[warn] {kept} cached file(s) still open in a tab were kept; close the tab and clear again"
+                )
+
 
     def launch_about(self):
         QMessageBox.information(
@@ -1306,4 +1409,6 @@ def main():
 #  Entry point
 # ============================================================
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()     # process-pool MAT import in frozen builds
     main()
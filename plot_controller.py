@@ -7,53 +7,154 @@ from matplotlib.figure import Figure
 from matplotlib.backend_bases import MouseButton
 import numpy as np
 
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import (
-    QWidget, QHBoxLayout, QLabel, QRadioButton,
-    QButtonGroup, QVBoxLayout, QPushButton, QSizePolicy
-)
-
+import time
 
-from PyQt5.QtGui import QPixmap, QIcon
-from PyQt5.QtCore import QSize
+from PyQt5 import sip
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QHBoxLayout, QScrollBar, QVBoxLayout, QWidget
 
 
-from config.defaults import BEST_OF
+from config.defaults import (
+    AUTO_MVC_WINDOW_MS, BEST_OF, DEFAULT_SEMG_FREQUENCY, LIVE_MVC_FPS, OFFTHREAD_RENDER,
+    WHOLE_SIGNAL_MVC,
+)
+from importers.channel_store import ChannelStore
 from processors.processors import Processor
+from processors import bursts
+from plotting.blit import BlitManager
+from plotting.lod import LODLine, MinMaxPyramid
+from plotting.offscreen import CompositingCanvas, FrameRenderer
+from plotting.overlays import OverlayPool
 
 class PlotController:
-    def __init__(self, parent=None, container=None, main_window=None):
+    def __init__(self, parent=None, container=None, main_window=None, lazy=False):
+        """
+        ``lazy=True`` creates the controller without a figure or canvas: it
+        only holds data and selections until :meth:`materialize` is called.
+        """
         self.parent = parent
         self.main_window = main_window
 
-        fig = Figure(figsize=(5, 4))
-        self.canvas = FigureCanvas(fig)
-        self.toolbar = NavigationToolbar(self.canvas, container)
-
-        if container.layout() is None:
-            layout = QVBoxLayout(container)
-            layout.addWidget(self.toolbar)
-            layout.addWidget(self.canvas)
-        else:
-            container.layout().addWidget(self.toolbar)
-            container.layout().addWidget(self.canvas)
-
-        self.canvas.setVisible(False)
-        self.toolbar.setVisible(False)
+        self.canvas = None
+        self.toolbar = None
+        self._host = None
+        self._scrollbar = None
+        self._blit = None
+        self._frames = None         # FrameRenderer when waveforms render off-thread
+        self._resize_cid = None
+        self._scroll_cid = None
+        self._frame_cid = None
 
         self.axes = []
         self._press_cid = None
-        self._draw_cid = None
         self._active_row = 0
         self._selections = {}
         self._patches = {}
-        self._overlay_items = []
-        self._row_group = None
+        self._overlays = None
         self._data = None
         self._labels = None
+        self._source_path = None
+        self._frequency = None      # sampling rate stored in the file, if any
+        self._channels = None       # row -> channel index in the file (None: the same)
+        self._max_rows = 6
+        self._row_offset = 0        # first channel shown in the visible bank
+        self._pyramids = {}         # channel -> MinMaxPyramid
         self._processor = None
+        self._envelope_index = None
+        self._preview_index = None
+        self._lod_lines = []
 
         self._live_rect = None
+        self._live_text = None
+        self._live_span = None
+        self._live_last = 0.0
+        self._live_timer = QTimer()
+        self._live_timer.setSingleShot(True)
+        self._live_timer.timeout.connect(self._refresh_live_mvc)
+
+        # Builds off-screen pyramids one per event-loop turn
+        self._prefetch_timer = QTimer()
+        self._prefetch_timer.setInterval(0)
+        self._prefetch_timer.timeout.connect(self._prefetch_step)
+
+        if not lazy:
+            self._create_canvas(container)
+
+    def _create_canvas(self, container):
+        self._make_canvas(container)
+
+        # Canvas + channel scrollbar side by side
+        self._host = QWidget(container)
+        host_layout = QHBoxLayout(self._host)
+        host_layout.setContentsMargins(0, 0, 0, 0)
+        host_layout.setSpacing(0)
+        self._scrollbar = QScrollBar(Qt.Vertical, self._host)
+        self._scrollbar.setVisible(False)
+        self._scrollbar.valueChanged.connect(self.scroll_to)
+        host_layout.addWidget(self.canvas, 1)
+        host_layout.addWidget(self._scrollbar, 0)
+
+        layout = container.layout()
+        if layout is None:
+            layout = QVBoxLayout(container)
+        if self.toolbar is not None:
+            layout.addWidget(self.toolbar)
+            self.toolbar.setVisible(False)
+        layout.addWidget(self._host)
+        self.canvas.setVisible(False)
+
+    # ============================================================
+    #                BACKEND HOOKS
+    # ============================================================
+    # Drawing-library specific code lives in this section and in _render,
+    # _attach_mouse_handlers, _span_patch, _start_live_mvc and
+    # _stop_live_mvc. Selections, BEST_OF, row activation and the channel
+    # bank are shared: another backend subclasses PlotController and
+    # overrides only these (see plotting/pg_backend.py). self._blit and
+    # self._overlays just need the BlitManager / OverlayPool interfaces.
+
+    def _make_canvas(self, container):
+        """Create canvas, toolbar (or None), blit layer, overlays and canvas events."""
+        fig = Figure(figsize=(5, 4))
+        if OFFTHREAD_RENDER:
+            # Waveforms are rasterized by a worker and composited over the Agg buffer
+            self.canvas = CompositingCanvas(fig)
+            self._frames = FrameRenderer(OFFTHREAD_RENDER)
+            self._frames.frameReady.connect(self._place_frame)
+        else:
+            self.canvas = FigureCanvas(fig)
+        self.toolbar = NavigationToolbar(self.canvas, container)
+
+        # Frames become part of the static content, under the blitted spans
+        self._blit = BlitManager(self.canvas, underlay=self.canvas.composite if self._frames else None)
+        self._overlays = OverlayPool(
+            self.canvas, self._on_row_clicked,
+            lambda slot: self.clear_row_selections(self._row_offset + slot),
+        )
+        self._resize_cid = self.canvas.mpl_connect("resize_event", self._on_canvas_resize)
+        self._scroll_cid = self.canvas.mpl_connect("scroll_event", self._on_canvas_scroll)
+        if self._frames is not None:
+            self._frame_cid = self.canvas.mpl_connect("draw_event", self._request_frame)
+
+    def _fill_slots(self):
+        """Put the channels of the current bank into the axes."""
+        for i, (ax, lod) in enumerate(zip(self.axes, self._lod_lines)):
+            lod.set_y(self._pyramid(self._row_offset + i))
+            ax.relim()
+            ax.autoscale_view(scalex=False, scaley=True)
+
+    def _bold_slot(self, active):
+        """Bold spines and waveform of axes ``active`` (None: no axes)."""
+        for i, ax in enumerate(self.axes):
+            lw = 2.2 if i == active else 0.8
+            for sp in ax.spines.values():
+                sp.set_linewidth(lw)
+            for line in ax.lines:
+                line.set_linewidth(2.2 if i == active else 1.0)
+
+    def _set_live_text(self, text):
+        self._live_text.set_text(text)
+        self._blit.update(self._live_text.axes)
 
         
         
@@ -67,59 +168,335 @@ class PlotController:
     # ============================================================
     
     
-    def plot_mat_arrays(self, data, labels, max_rows=6, source_path=None):
-        self._data = data
+    def plot_mat_arrays(self, data, labels, max_rows=6, source_path=None, frequency=None,
+                        channels=None):
+        self.set_data(data, labels, max_rows=max_rows, source_path=source_path,
+                      frequency=frequency, channels=channels)
+        self._render()
+    
+    def set_data(self, data, labels, max_rows=6, source_path=None, frequency=None, channels=None):
+        """
+        Attach a recording and reset the selections, without drawing anything.
+        ``channels`` gives the file's channel index of each row when only
+        some channels were imported (``importers.mat.select_channels``).
+        """
+        self._data = data = ChannelStore.wrap(data)
         self._labels = labels
         self._source_path = source_path
+        self._frequency = frequency
+        self._channels = None if channels is None else [int(c) for c in channels]
+        self._max_rows = int(max_rows)
+        self._envelope_index = None
+        self._preview_index = None
+        self._stop_live_mvc()
+        if self._blit is not None:
+            for p in [p for ps in self._patches.values() for p in ps] + [self._live_rect]:
+                if p is not None:
+                    self._blit.remove(p)
+            self._live_rect = None
+        if WHOLE_SIGNAL_MVC:
+            if self._processor is None:
+                self._processor = Processor()
+            self._envelope_index = self._processor.build_envelope_index(data)
     
-        nrows = min(int(max_rows), int(data.shape[0]))
+        # Every channel keeps its selections, visible or not
+        nch = int(data.shape[0])
+        self._selections = {i: [] for i in range(nch)}
+        self._patches = {i: [] for i in range(nch)}
+        self._active_row = 0
+        self._row_offset = 0
+        self._pyramids = {}
+        self._prefetch_timer.stop()
+        self._mvc_result = None
+    
+    @property
+    def sample_rate(self):
+        """Sampling rate (Hz) of the recording: the file's, else DEFAULT_SEMG_FREQUENCY."""
+        try:
+            fs = float(self._frequency)
+        except (TypeError, ValueError):
+            return DEFAULT_SEMG_FREQUENCY
+        return fs if np.isfinite(fs) and fs > 0 else DEFAULT_SEMG_FREQUENCY
+
+    def file_channel(self, row: int) -> int:
+        """Channel index in the file of ``row``."""
+        return int(row) if self._channels is None else self._channels[row]
+
+    def row_of_channel(self, channel: int):
+        """Row showing the file's ``channel``, None if it was not imported."""
+        channel = int(channel)
+        if self._channels is not None:
+            return self._channels.index(channel) if channel in self._channels else None
+        return channel if channel in self._selections else None
+
+    def _render(self):
+        """Build the figure for the attached data (canvas must exist)."""
+        data, labels = self._data, self._labels
+        if self._envelope_index is not None:
+            self._envelope_index.build()
+    
+        nrows = min(self._max_rows, int(data.shape[0]))
         npts = int(data.shape[1])
-        x = np.arange(npts)
         xlim = (0, npts - 1)
     
         fig = self.canvas.figure
-        fig.clear()
-        axes = fig.subplots(nrows, 1, sharex=True)
-        if not isinstance(axes, (list, np.ndarray)):
-            axes = [axes]
-        self.axes = list(axes)
-    
-        for i, ax in enumerate(self.axes):
-            ax.plot(x, data[i, :], lw=1.0, zorder=1)
-            ax.set_xlim(xlim)
-            ax.autoscale(enable=False, axis='x')
-            ax.relim()
-            ax.autoscale_view(scalex=False, scaley=True)
-            ax.grid(True, which="both", linestyle="--", alpha=0.6, zorder=0)
-            ax.set_title(""); ax.set_xlabel(""); ax.set_ylabel("")
-            ax.set_xticks([]); ax.set_yticks([])
-    
-        fig.subplots_adjust(left=0.02, right=0.985, top=0.985, bottom=0.06, hspace=0.15)
-    
-        # Build the overlay buttons and initialize data containers
-        self._build_qt_overlays(self.axes, labels)
-        self._selections = {i: [] for i in range(nrows)}
-        self._patches = {i: [] for i in range(nrows)}
+        reuse = nrows > 0 and len(self.axes) == nrows and len(self._lod_lines) == nrows \
+            and all(ax.figure is fig for ax in self.axes)
+        if reuse:
+            # Same row count: keep axes and Line2D objects; _show_rows swaps the data
+            for ax in self.axes:
+                ax.set_xlim(xlim)
+        else:
+            for lod in self._lod_lines:
+                lod.disconnect()
+            self._lod_lines = []
+            self._live_rect = None
+            fig.clear()
+            self._blit.reset()
+            axes = fig.subplots(nrows, 1, sharex=True)
+            if not isinstance(axes, (list, np.ndarray)):
+                axes = [axes]
+            self.axes = list(axes)
+    
+            for i, ax in enumerate(self.axes):
+                # Min/max pyramid: only ~2 points per pixel reach Agg at any zoom
+                self._lod_lines.append(LODLine(ax, self._pyramid(self._row_offset + i), lw=1.0, zorder=1))
+                if self._frames is not None:
+                    self._lod_lines[-1].line.set_visible(False)     # drawn by the worker
+                ax.set_xlim(xlim)
+                ax.autoscale(enable=False, axis='x')
+                ax.relim()
+                ax.autoscale_view(scalex=False, scaley=True)
+                ax.grid(True, which="both", linestyle="--", alpha=0.6, zorder=0)
+                ax.set_title(""); ax.set_xlabel(""); ax.set_ylabel("")
+                ax.set_xticks([]); ax.set_yticks([])
+                for sp in ax.spines.values():
+                    self._blit.add(sp)
+    
+            fig.subplots_adjust(left=0.02, right=0.985, top=0.985, bottom=0.06, hspace=0.15)
+    
+        # Waveforms, overlay labels, spans and highlight of the visible bank
+        self._patches = {r: [] for r in self._selections}
+        self._show_rows()
     
         try:
             self.toolbar.mode = ""
+            if reuse:
+                self.toolbar.update()       # new data: forget the old zoom history
         except Exception:
             pass
     
         # Connect mouse handlers (your existing method)
         self._attach_mouse_handlers()
-    
-        # --- ✅ NEW: Bold the first row initially ---
-        self._active_row = 0
-        for i, ax in enumerate(self.axes):
-            lw = 2.2 if i == self._active_row else 0.8
-            for sp in ax.spines.values():
-                sp.set_linewidth(lw)
+        self._update_scrollbar()
+        self._prefetch_timer.start()
     
         self.canvas.setVisible(True)
         self.toolbar.setVisible(True)
         self.canvas.draw_idle()
 
+    # ============================================================
+    #                CHANNEL BANK (virtualized rows)
+    # ============================================================
+
+    def _slot(self, row):
+        """Axes index showing channel ``row``, or None while it is scrolled out."""
+        if row is None:
+            return None
+        i = int(row) - self._row_offset
+        return i if 0 <= i < len(self.axes) else None
+
+    def axes_for(self, row):
+        """Axes of channel ``row`` if it is in the visible bank, else None."""
+        i = self._slot(row)
+        return None if i is None else self.axes[i]
+
+    def visible_rows(self):
+        return range(self._row_offset, self._row_offset + len(self.axes))
+
+    def _row_label(self, row):
+        labels = self._labels
+        return str(labels[row]) if labels is not None and len(labels) > row else f"EMG {row+1}"
+
+    def _pyramid(self, row):
+        pyr = self._pyramids.get(row)
+        if pyr is None:
+            pyr = self._pyramids[row] = MinMaxPyramid(self._data.channel(row))
+        return pyr
+
+    def _prefetch_step(self):
+        """Build the missing pyramid nearest to the visible bank (one per call)."""
+        if self._data is None or self.canvas is None or sip.isdeleted(self.canvas):
+            self._prefetch_timer.stop()     # released, or destroyed with its tab
+            return
+        centre = self._row_offset + len(self.axes) / 2.0
+        missing = [r for r in range(self._data.shape[0]) if r not in self._pyramids]
+        if not missing:
+            self._prefetch_timer.stop()
+            return
+        self._pyramid(min(missing, key=lambda r: abs(r - centre)))
+
+    def _show_rows(self):
+        """Fill the axes with the channels of the current bank."""
+        self._fill_slots()
+        self._overlays.sync(self.axes, [self._row_label(r) for r in self.visible_rows()])
+        for r in self.visible_rows():
+            self._show_spans(r, update=False)
+        self._apply_row_highlight()
+
+    def scroll_to(self, offset):
+        """Show channels ``offset .. offset + max_rows - 1`` in the existing axes."""
+        if self._data is None or not self.axes:
+            return
+        top = max(0, int(self._data.shape[0]) - len(self.axes))
+        offset = min(max(0, int(offset)), top)
+        if offset == self._row_offset:
+            return
+        self._stop_live_mvc()
+        if self._live_rect is not None:
+            self._blit.remove(self._live_rect)
+            self._live_rect = None
+        self._click_x = None
+        for r in self.visible_rows():
+            for p in self._patches.get(r, []):
+                self._blit.remove(p)
+            self._patches[r] = []
+
+        self._row_offset = offset
+        self._show_rows()
+        self._update_scrollbar()
+        self._prefetch_timer.start()
+        self.canvas.draw_idle()
+
+    def _update_scrollbar(self):
+        sb = self._scrollbar
+        if sb is None or self._data is None:
+            return
+        hidden = int(self._data.shape[0]) - len(self.axes)
+        sb.blockSignals(True)
+        sb.setRange(0, max(0, hidden))
+        sb.setPageStep(max(1, len(self.axes)))
+        sb.setSingleStep(1)
+        sb.setValue(self._row_offset)
+        sb.blockSignals(False)
+        sb.setVisible(hidden > 0)
+
+    def _on_canvas_scroll(self, event):
+        """Mouse wheel over the plots scrolls the channel bank by one row."""
+        if self._data is not None and self._data.shape[0] > len(self.axes):
+            self.scroll_to(self._row_offset - int(np.sign(event.step)))
+
+    # ============================================================
+    #                LIVE / RELEASED CANVAS
+    # ============================================================
+
+    @property
+    def is_live(self):
+        return self.canvas is not None
+
+    def materialize(self, container):
+        """
+        Create the canvas in ``container`` and draw the attached data,
+        restoring the selections and active row kept while released.
+        """
+        if self.canvas is not None or self._data is None:
+            return
+        selections = {r: list(spans) for r, spans in self._selections.items()}
+        active_row = self._active_row
+
+        self._create_canvas(container)
+        self._selections = selections
+        self._active_row = active_row
+        self._render()
+
+    def memory_usage(self):
+        """Bytes this tab holds in memory: its channel store plus the plot pyramids."""
+        if self._data is None:
+            return 0
+        return self._data.memory_usage() + sum(p.nbytes for p in self._pyramids.values())
+
+    def release(self):
+        """
+        Drop the figure, canvas, toolbar and overlays. Data, selections,
+        active row and ``_mvc_result`` are kept for the next
+        :meth:`materialize`.
+        """
+        if self.canvas is None:
+            return
+        self._stop_live_mvc()
+        self._prefetch_timer.stop()
+        for lod in self._lod_lines:
+            lod.disconnect()
+        self._lod_lines = []
+        self._pyramids = {}
+        self._overlays.clear()
+        self._overlays = None
+        if self._frames is not None:
+            self._frames.cancel()
+            self._frames.frameReady.disconnect()
+            self._frames = None
+
+        for w in (self.toolbar, self._host):
+            if w is None:
+                continue
+            parent = w.parentWidget()
+            if parent is not None and parent.layout() is not None:
+                parent.layout().removeWidget(w)
+            w.setParent(None)
+            w.deleteLater()
+        if isinstance(self.canvas, FigureCanvas):
+            self.canvas.figure.clear()
+
+        self.canvas = None
+        self.toolbar = None
+        self._host = None
+        self._scrollbar = None
+        self._blit = None
+        self._resize_cid = self._scroll_cid = self._frame_cid = None
+        self._press_cid = self._release_cid = self._motion_cid = None
+        self._live_rect = None
+        self._click_x = None
+        self.axes = []
+        self._patches = {r: [] for r in self._selections}
+
+    def _on_canvas_resize(self, _event):
+        """Pixel widths changed: re-decimate every line and move the overlays."""
+        for lod in self._lod_lines:
+            lod.update()
+        if self._overlays is not None:
+            self._overlays.reposition()
+
+    def _request_frame(self, _event=None):
+        """
+        Off-thread mode: send the current waveform view (decimated line data,
+        limits, pixel boxes, widths) to the worker. Called after every full
+        draw and when the active row's line width changes.
+        """
+        if self._frames is None or self.canvas is None or not self._lod_lines:
+            return
+        fig = self.canvas.figure
+        layers = []
+        for ax, lod in zip(self.axes, self._lod_lines):
+            line = lod.line
+            layers.append({
+                "bbox": tuple(ax.bbox.bounds),
+                "xlim": ax.get_xlim(),
+                "ylim": ax.get_ylim(),
+                "x": np.array(line.get_xdata(), dtype=float),
+                "y": np.array(line.get_ydata(), dtype=float),
+                "lw": line.get_linewidth(),
+                "color": line.get_color(),
+            })
+        w, h = self.canvas.get_width_height(physical=True)
+        self._frames.submit(w, h, layers, fig.dpi)
+
+    def _place_frame(self, image):
+        """A worker frame arrived: blend it in and re-blit the spans over it."""
+        if self.canvas is None or sip.isdeleted(self.canvas):
+            return      # tab closed while the frame was rendering
+        if self.canvas.set_frame(image):
+            self._blit.refresh()
+
     def _attach_mouse_handlers(self):
         """Up to 'BEST_OF' spans per active row; Shift-click deletes; shows live rectangle."""
         self._click_x = None
@@ -147,7 +524,7 @@ class PlotController:
                 return
     
             # ✅ Enforce single-row selection
-            if event.inaxes != self.axes[self._active_row]:
+            if self.axes_for(self._active_row) is None or event.inaxes != self.axes_for(self._active_row):
                 print(f"[skip] Click ignored — not in active row ({self._active_row})")
                 return
     
@@ -155,23 +532,8 @@ class PlotController:
     
             # --- Handle Shift+Click (delete span) ---
             if shift_held(event):
-                if row not in self._selections:
-                    return
-                ax = self.axes[row]
-                if event.xdata is None:
-                    return
-                x_click = float(event.xdata)
-                tol = px_to_data_x(ax, 6.0)
-                best_idx, best_dist = None, None
-                for j, (lo, hi) in enumerate(self._selections[row]):
-                    dist = 0.0 if lo <= x_click <= hi else min(abs(x_click - lo), abs(x_click - hi))
-                    if dist <= tol and (best_dist is None or dist < best_dist):
-                        best_idx, best_dist = j, dist
-                if best_idx is not None:
-                    self._patches[row][best_idx].remove()
-                    self._patches[row].pop(best_idx)
-                    self._selections[row].pop(best_idx)
-                    self.canvas.draw_idle()
+                if event.xdata is not None:
+                    self._delete_span_at(row, float(event.xdata), px_to_data_x(event.inaxes, 6.0))
                 return
     
             # --- Start new span ---
@@ -179,14 +541,11 @@ class PlotController:
     
             # 🟧 Remove any old live rectangle
             if self._live_rect is not None:
-                try:
-                    self._live_rect.remove()
-                except Exception:
-                    pass
+                self._blit.remove(self._live_rect)
                 self._live_rect = None
     
             # 🟧 Create temporary rectangle for live feedback
-            ax = self.axes[self._active_row]
+            ax = event.inaxes
             y0, y1 = ax.get_ylim()
             from matplotlib.patches import Rectangle
             self._live_rect = Rectangle(
@@ -197,22 +556,24 @@ class PlotController:
                 alpha=0.2,
                 zorder=5
             )
-            ax.add_patch(self._live_rect)
-            self.canvas.draw_idle()
+            self._blit.add(ax.add_patch(self._live_rect))
+            self._start_live_mvc(ax)
+            self._blit.update(ax)
     
         # --------------------------------------------------------------
         def on_motion(event):
             """Update live rectangle width while dragging."""
             if self._click_x is None or self._live_rect is None:
                 return
-            if event.inaxes != self.axes[self._active_row] or event.xdata is None:
+            if event.inaxes != self.axes_for(self._active_row) or event.xdata is None:
                 return
     
             x0, x1 = self._click_x, event.xdata
             lo, hi = sorted([x0, x1])
             self._live_rect.set_x(lo)
             self._live_rect.set_width(hi - lo)
-            self.canvas.draw_idle()
+            self._schedule_live_mvc(self._active_row, lo, hi)
+            self._blit.update(self._live_rect.axes)
     
         # --------------------------------------------------------------
         def on_release(event):
@@ -222,7 +583,7 @@ class PlotController:
                 return
     
             # ✅ Single-row enforcement again
-            if event.inaxes != self.axes[self._active_row]:
+            if event.inaxes != self.axes_for(self._active_row):
                 self._click_x = None
                 return
     
@@ -233,24 +594,12 @@ class PlotController:
     
             # remove live rectangle
             if self._live_rect is not None:
-                try:
-                    self._live_rect.remove()
-                except Exception:
-                    pass
+                self._blit.remove(self._live_rect)
                 self._live_rect = None
+            self._stop_live_mvc()
     
-            if len(self._selections[row]) >= BEST_OF:
-                print(f"[limit] 'BEST_OF' selections already on row {row}. Ignored.")
-                self._click_x = None
-                self.canvas.draw_idle()
-                return
-    
-            ax = self.axes[row]
-            patch = ax.axvspan(lo, hi, color="orange", alpha=0.3)
-            self._selections[row].append((lo, hi))
-            self._patches[row].append(patch)
             self._click_x = None
-            self.canvas.draw_idle()
+            self._add_span(row, lo, hi)
     
         # --------------------------------------------------------------
         # Safe reconnection
@@ -274,6 +623,116 @@ class PlotController:
         self._release_cid = self.canvas.mpl_connect("button_release_event", on_release)
         self._motion_cid = self.canvas.mpl_connect("motion_notify_event", on_motion)
 
+    def _add_span(self, row: int, lo, hi):
+        """Add span ``[lo, hi]`` to ``row`` unless it already has BEST_OF; True if added."""
+        ax = self.axes_for(row)
+        if len(self._selections[row]) >= BEST_OF:
+            print(f"[limit] 'BEST_OF' selections already on row {row}. Ignored.")
+            if ax is not None:
+                self._blit.update(ax)
+            return False
+        self._selections[row].append((lo, hi))
+        if ax is not None:
+            self._patches[row].append(self._span_patch(row, lo, hi))
+            self._blit.update(ax)
+        return True
+
+    def _delete_span_at(self, row: int, x, tol):
+        """Shift-click: drop the span of ``row`` containing ``x`` or nearest within ``tol``."""
+        if row not in self._selections:
+            return False
+        best_idx, best_dist = None, None
+        for j, (lo, hi) in enumerate(self._selections[row]):
+            dist = 0.0 if lo <= x <= hi else min(abs(x - lo), abs(x - hi))
+            if dist <= tol and (best_dist is None or dist < best_dist):
+                best_idx, best_dist = j, dist
+        if best_idx is None:
+            return False
+        if best_idx < len(self._patches.get(row, [])):
+            self._blit.remove(self._patches[row].pop(best_idx))
+        self._selections[row].pop(best_idx)
+        ax = self.axes_for(row)
+        if ax is not None:
+            self._blit.update(ax)
+        return True
+
+    # ============================================================
+    #                LIVE MVC READOUT
+    # ============================================================
+
+    def live_mvc(self, row: int, lo, hi):
+        """
+        MVC of the span ``[lo, hi)`` read from the whole-signal envelope
+        index: O(1) once the row's envelope exists. The row is filtered on
+        first use (at press time), not on every mouse move.
+        """
+        if self._data is None:
+            return np.nan
+        return self._mvc_index().mvc(row, int(np.floor(lo)), int(np.ceil(hi)))
+
+    def _mvc_index(self):
+        """The load-time envelope index, or a lazily built one for previews."""
+        if self._envelope_index is not None:
+            return self._envelope_index
+        if self._preview_index is None:
+            if self._processor is None:
+                self._processor = Processor()
+            self._preview_index = self._processor.build_envelope_index(self._data)
+        return self._preview_index
+
+    def _live_interval(self):
+        """Seconds between readout updates: one per display refresh."""
+        try:
+            hz = float(self.canvas.screen().refreshRate())
+        except Exception:
+            hz = 0.0
+        return 1.0 / (hz if hz > 0 else LIVE_MVC_FPS)
+
+    def _start_live_mvc(self, ax):
+        self._stop_live_mvc()
+        try:
+            self.live_mvc(self._active_row, 0, 0)    # build the row envelope now
+        except Exception:
+            return
+        self._live_text = self._blit.add(ax.text(
+            0.005, 0.95, "", transform=ax.transAxes, ha="left", va="top",
+            fontsize=8, zorder=6,
+            bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="orange", alpha=0.8),
+        ))
+        self._live_last = 0.0
+
+    def _schedule_live_mvc(self, row, lo, hi):
+        """Record the span; update now if a refresh interval has passed, else once it does."""
+        if self._live_text is None:
+            return
+        self._live_span = (row, lo, hi)
+        wait = self._live_last + self._live_interval() - time.perf_counter()
+        if wait <= 0:
+            self._live_timer.stop()
+            self._refresh_live_mvc()
+        elif not self._live_timer.isActive():
+            self._live_timer.start(max(1, int(wait * 1000)))
+
+    def _refresh_live_mvc(self):
+        if self._live_text is None or self._live_span is None:
+            return
+        self._live_last = time.perf_counter()
+        try:
+            value = self.live_mvc(*self._live_span)
+        except Exception:
+            value = np.nan
+        self._set_live_text("MVC: –" if np.isnan(value) else f"MVC: {value:.4g}")
+
+    def _stop_live_mvc(self):
+        self._live_timer.stop()
+        self._live_span = None
+        if self._live_text is not None:
+            ax = self._live_text.axes
+            self._blit.remove(self._live_text)
+            self._live_text = None
+            if ax is not None:
+                self._blit.update(ax)
+
     # ============================================================
     #                CLEAR / ENERGY DETECTION
     # ============================================================
@@ -283,307 +742,114 @@ class PlotController:
             raise RuntimeError("No data or axes in PlotController.")
 
         row = int(self._active_row)
-        x = self._data[row, :].astype(float).ravel()
-        energy = np.abs(x) ** 2
-        L = max(1, int(round(min_silence * fs)))
-        b = np.ones(L, dtype=float) / L
-        moving_ave = np.convolve(energy, b, mode="same")
-        if moving_ave.max() > 0:
-            moving_ave /= moving_ave.max()
-
-        mask = (moving_ave >= 0.010).astype(np.uint8)
-        min_sound_samples = max(1, int(round(min_sound * fs)))
-        run = 0
-        for i in range(len(mask)):
-            if mask[i]:
-                run += 1
-            else:
-                if 0 < run < min_sound_samples:
-                    mask[i - run:i] = 0
-                run = 0
-        if 0 < run < min_sound_samples:
-            mask[-run:] = 0
-
-        intervals = []
-        i = 0
-        while i < len(mask):
-            if mask[i]:
-                j = i
-                while j < len(mask) and mask[j]:
-                    j += 1
-                intervals.append((i, j))
-                i = j
-            else:
-                i += 1
-
-        ax = self.axes[row]
-        x0, x1 = ax.get_xlim()
-        for p in list(self._patches[row]):
-            try: p.remove()
-            except Exception: pass
-        self._patches[row].clear()
-        self._selections[row].clear()
+        starts, ends = bursts.energy_bursts(self._data[row, :], fs, min_silence, min_sound)
+        intervals = list(zip(starts.tolist(), ends.tolist()))
 
-        for (lo, hi) in intervals[:BEST_OF]:
-            patch = ax.axvspan(lo, hi, color="orange", alpha=0.3)
-            self._patches[row].append(patch)
-            self._selections[row].append((lo, hi))
-        ax.set_xlim(x0, x1)
-        self.canvas.draw_idle()
+        self._selections[row] = list(intervals[:BEST_OF])
+        self._show_spans(row)
+
+    def auto_select_windows(self, fs: int, window_ms: float = AUTO_MVC_WINDOW_MS):
+        """
+        Replace the selections of every row with its best ``BEST_OF``
+        windows of ``window_ms`` (``Processor.auto_mvc_windows``), all rows
+        in one pass. Returns the new ``{row: [(lo, hi), ...]}``.
+        """
+        if self._data is None or not self.axes:
+            raise RuntimeError("No data or axes in PlotController.")
+
+        index = self._mvc_index()
+        index.build()
+        rows = range(len(index))
+        env = np.stack([index.envelope(r) for r in rows])
+        spans = self._processor.auto_mvc_windows(self._data, fs, window_ms, BEST_OF, envelope=env)
+
+        for row, row_spans in zip(rows, spans):
+            self._selections[row] = list(row_spans)
+            self._show_spans(row, update=False)
+        self._blit.update(*self.axes)
+        return {r: list(self._selections[r]) for r in rows}
+
+    def _span_patch(self, row: int, lo, hi):
+        """Orange selection patch on (visible) ``row``, drawn by the blit layer."""
+        return self._blit.add(self.axes_for(row).axvspan(lo, hi, color="orange", alpha=0.3))
+
+    def _show_spans(self, row: int, update=True):
+        """Redraw the patches of ``row`` from its selections (none while scrolled out)."""
+        for p in self._patches.get(row, []):
+            self._blit.remove(p)
+        self._patches[row] = []
+        ax = self.axes_for(row)
+        if ax is None:
+            return
+        self._patches[row] = [self._span_patch(row, lo, hi) for lo, hi in self._selections.get(row, [])]
+        if update:
+            self._blit.update(ax)
 
     def clear_row_selections(self, row: int):
         if row not in self._patches or row not in self._selections:
             return
-        ax = self.axes[row]
         for p in list(self._patches[row]):
-            try: p.remove()
-            except Exception: pass
+            self._blit.remove(p)
         self._patches[row].clear()
         self._selections[row].clear()
-        ax.figure.canvas.draw_idle()
+        ax = self.axes_for(row)
+        if ax is not None:
+            self._blit.update(ax)
 
     def clear_all_selections(self):
-        for r in range(len(self.axes)):
+        for r in list(self._selections):
             for p in self._patches.get(r, []):
-                try: p.remove()
-                except Exception: pass
+                self._blit.remove(p)
             self._patches[r] = []
             self._selections[r] = []
         self._active_row = None
-        self.canvas.draw_idle()
+        self._blit.update(*self.axes)
 
     # ============================================================
     #                OVERLAYS (Qt Widgets)
     # ============================================================
 
-    def _build_qt_overlays(self, axes, labels):
-        for itm in self._overlay_items:
-            for key in ("widget_top", "widget_bottom"):
-                try: itm[key].deleteLater()
-                except Exception: pass
-        self._overlay_items = []
-
-        if self._row_group:
-            try: self._row_group.idClicked.disconnect(self._on_row_clicked)
-            except Exception: pass
-        self._row_group = QButtonGroup(self.canvas)
-        self._row_group.setExclusive(True)
-        self._row_group.idClicked.connect(self._on_row_clicked)
-
-        radio_style = """
-            QRadioButton { margin: 0px; padding: 0px; }
-            QRadioButton::indicator { width: 18px; height: 18px; margin: 0px; }
-            QRadioButton::indicator:unchecked {
-                border: 3px solid black; border-radius: 13px; background: white;
-            }
-            QRadioButton::indicator:checked {
-                border: 3px solid black; border-radius: 13px; background: #3daee9;
-            }
-        """
-        label_style = """
-            QLabel {
-                font-size: 18px; font-weight: 700; color: black;
-                background: rgba(255,255,255,230);
-                border-radius: 6px; padding: 2px 10px;
-            }
-        """
-
-        for i, ax in enumerate(axes):
-            w_top = QWidget(self.canvas)
-            w_top.setAttribute(Qt.WA_NoSystemBackground, True)
-            w_top.setAttribute(Qt.WA_TranslucentBackground, True)
-            w_top.setStyleSheet("background: transparent;")
-            lay_top = QHBoxLayout(w_top)
-            lay_top.setContentsMargins(8, 4, 0, 4)
-            lay_top.setSpacing(6)
-
-            label_text = str(labels[i]) if labels is not None and len(labels) > i else f"EMG {i+1}"
-            lbl = QLabel(label_text, w_top)
-            lbl.setStyleSheet(label_style)
-
-            rdo = QRadioButton(w_top)
-            rdo.setStyleSheet(radio_style)
-            rdo.setChecked(i == 0)
-            self._row_group.addButton(rdo, i)
-
-            lay_top.addWidget(lbl, 1)
-            lay_top.addWidget(rdo, 0, alignment=Qt.AlignRight | Qt.AlignTop)
-
-            w_bottom = QWidget(self.canvas)
-            w_bottom.setAttribute(Qt.WA_NoSystemBackground, True)
-            w_bottom.setAttribute(Qt.WA_TranslucentBackground, True)
-            lay_bottom = QHBoxLayout(w_bottom)
-            lay_bottom.setContentsMargins(0, 0, 0, 0)
-            lay_bottom.setSpacing(0)
-            
-            from PyQt5.QtGui import QPixmap, QIcon
-            from PyQt5.QtCore import QSize
-            
-            btn_clear = QPushButton(w_bottom)
-            btn_clear.setFixedSize(30, 30)  # 🔹 slightly larger than 24×24 radio
-            btn_clear.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-            
-            # --- Load and scale the broom PNG properly ---
-            pixmap = QPixmap("resources/icons/icn_broom.png")
-            # scale to fill the button but preserve aspect ratio
-            scaled = pixmap.scaled(28, 28, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            icon = QIcon(scaled)
-            btn_clear.setIcon(icon)
-            btn_clear.setIconSize(QSize(28, 28))  # 🔹 ensure icon fills almost entire button
-            
-            # --- Button styling ---
-            btn_clear.setStyleSheet("""
-                QPushButton {
-                    background-color: transparent;
-                    border: none;
-                    padding: 0px;
-                }
-                QPushButton:hover {
-                    background-color: transparent;
-                }
-                QPushButton:pressed {
-                    background-color: #f4a742;
-                }
-            """)
-            
-            btn_clear.setToolTip("Clear selections for this row")
-            btn_clear.clicked.connect(lambda _, r=i: self.clear_row_selections(r))
-            lay_bottom.addStretch(1)
-            lay_bottom.addWidget(btn_clear, 0, alignment=Qt.AlignRight | Qt.AlignBottom)
-
-
-
-
-            # btn_clear = QPushButton(w_bottom)
-            # btn_clear.setFixedSize(40, 40)
-            # btn_clear.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-            
-            # # --- Force proper scaling and sharp rendering ---
-            # pixmap = QPixmap("resources/icons/icn_broom.png")
-            # scaled = pixmap.scaled(40, 40, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            # icon = QIcon()
-            # icon.addPixmap(scaled, QIcon.Normal, QIcon.Off)
-            
-            # btn_clear.setIcon(icon)
-            # btn_clear.setIconSize(QSize(28, 28))   # Force icon to fill button
-            
-            # btn_clear.setStyleSheet("""
-            #     QPushButton {
-            #         border: none;
-            #         background: transparent;
-            #         padding: 0;
-            #         margin: 0;
-            #     }
-            #     QPushButton:hover {
-            #         background-color: rgba(255,165,0,0.15);
-            #         border-radius: 6px;
-            #     }
-            #     QPushButton:pressed {
-            #         background-color: rgba(255,165,0,0.3);
-            #         border-radius: 6px;
-            #     }
-            # """)
-            
-            # btn_clear.setToolTip("Clear all selections for this row")
-            # btn_clear.clicked.connect(lambda _, r=i: self.clear_row_selections(r))
-            # lay_bottom.addStretch(1)
-            # lay_bottom.addWidget(btn_clear, 0, alignment=Qt.AlignRight | Qt.AlignBottom)
-
-
-
-            # btn_clear = QPushButton("", w_bottom)
-            # btn_clear.setFixedSize(24, 24)
-            # btn_clear.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-            # btn_clear.setStyleSheet("""
-            #     QPushButton {
-            #         font-size: 14px;
-            #         font-weight: bold;
-            #         color: black;
-            #         background-color: white;
-            #         border: 2.5px solid black;
-            #         border-radius: 4px;
-            #         padding: 0;
-            #         margin: 0;
-            #         outline: none;
-            #         box-sizing: border-box;
-            #     }
-            #     QPushButton:hover {
-            #         background-color: #f4f4f4;
-            #     }
-            #     QPushButton:pressed {
-            #         background-color: red;
-            #         color: white;
-            #         border: 2.5px solid black;
-            #     }
-            # """)
-
-
-
-            # btn_clear.setStyleSheet("""
-            #     QPushButton {
-            #         font-size: 14px;
-            #         font-weight: bold;
-            #         color: black;
-            #         background-color: white;
-            #         border: 3px solid black;
-            #     }
-            #     QPushButton:pressed {
-            #         background-color: red;
-            #         color: white;
-            #     }
-            # """)
-            btn_clear.clicked.connect(lambda _, r=i: self.clear_row_selections(r))
-            lay_bottom.addStretch(1)
-            lay_bottom.addWidget(btn_clear, 0, alignment=Qt.AlignRight | Qt.AlignBottom)
-
-            self._overlay_items.append({
-                "ax": ax,
-                "widget_top": w_top,
-                "widget_bottom": w_bottom,
-                "label": lbl,
-                "radio": rdo,
-                "row_index": i,
-                "clear_btn": btn_clear,
-            })
-
-        if self._draw_cid:
-            try: self.canvas.mpl_disconnect(self._draw_cid)
-            except Exception: pass
-        self._draw_cid = self.canvas.mpl_connect("draw_event", self._on_canvas_draw)
-        self.canvas.draw_idle()
+    @property
+    def _overlay_items(self):
+        return self._overlays.items if self._overlays is not None else []
 
+    @property
+    def _row_group(self):
+        return self._overlays.group if self._overlays is not None else None
 
     def _on_row_clicked(self, row_id: int):
         """Handle radio button click → make that row active, bold it, and clear the previous row's selections."""
         prev_row = self._active_row
-        new_row = int(row_id)
+        new_row = self._row_offset + int(row_id)     # radio ids are axes slots
 
         # 🧹 If switching to a new row, clear all selections from the previous one
         if prev_row is not None and prev_row != new_row:
             self.clear_row_selections(prev_row)
 
-        # Update active row
+        # Update active row, bold it (spines + waveform) and sync the radios
         self._active_row = new_row
+        self._apply_row_highlight()
+        self._redraw_rows(prev_row, new_row)
 
-        # Bold the active row; unbold others
-        for i, ax in enumerate(self.axes):
-            lw = 2.2 if i == self._active_row else 0.8
-            for sp in ax.spines.values():
-                sp.set_linewidth(lw)
-
-        # Also thicken waveform line for the active row
-        for i, ax in enumerate(self.axes):
-            for line in ax.lines:
-                line.set_linewidth(2.2 if i == self._active_row else 1.0)
+    def _apply_row_highlight(self):
+        """Bold spines and waveform of the active channel's axes; check its radio."""
+        active = self._slot(self._active_row)
+        self._bold_slot(active)
 
-        # Ensure radio button reflects state
-        if self._row_group is not None:
-            btn = self._row_group.button(self._active_row)
+        group = self._row_group
+        if group is None:
+            return
+        if active is None:
+            btn = group.checkedButton()
+            if btn is not None:
+                group.setExclusive(False)
+                btn.setChecked(False)
+                group.setExclusive(True)
+        else:
+            btn = group.button(active)
             if btn and not btn.isChecked():
                 btn.setChecked(True)
 
-        self.canvas.draw_idle()
-
 
     # def _on_row_clicked(self, row_id: int):
     #     """Handle radio button click → make that row active and bold its border."""
@@ -598,54 +864,23 @@ class PlotController:
     #     self.canvas.draw_idle()
 
 
-    def _on_canvas_draw(self, _event):
-        if not self.axes or not self._overlay_items:
-            return
-        W_TOP, H_TOP = 160, 40
-        W_BTN, H_BTN = 40, 40
-        margin_x, margin_y = 10, 8
-        cW, cH = self.canvas.width(), self.canvas.height()
-        for itm in self._overlay_items:
-            ax = itm["ax"]
-            bbox = ax.get_position()
-            x_right = int(bbox.x1 * cW - margin_x)
-            x0_top = x_right - W_TOP
-            y0_top = int((1.0 - bbox.y1) * cH + margin_y)
-            itm["widget_top"].setGeometry(x0_top, y0_top, W_TOP, H_TOP)
-            itm["widget_top"].raise_()
-            x0_btn = x_right - W_BTN - 7
-            y0_btn = int((1.0 - bbox.y0) * cH - H_BTN - margin_y)
-            itm["widget_bottom"].setGeometry(x0_btn, y0_btn, W_BTN, H_BTN)
-            itm["widget_bottom"].raise_()
-            
-            
     def _set_active_row(self, row: int, reattach_cb=None):
-        """Switch active EMG row and visually highlight it."""
-        # deactivate previous
-        if self._active_row is not None and self._active_row != row:
-            for sp in self.axes[self._active_row].spines.values():
-                sp.set_linewidth(0.8)
-    
+        """Switch active EMG row (scrolling it into view) and visually highlight it."""
+        prev_row = self._active_row
         self._active_row = int(row)
-    
-        # visually highlight new active row
-        for i, ax in enumerate(self.axes):
-            lw = 2.2 if i == self._active_row else 0.8
-            for sp in ax.spines.values():
-                sp.set_linewidth(lw)
-    
-        # also thicken the waveform line itself for the active row
-        for i, ax in enumerate(self.axes):
-            for line in ax.lines:
-                line.set_linewidth(2.2 if i == self._active_row else 1.0)
-    
-        # ensure radio button reflects state if you use them
-        if self._row_group is not None:
-            btn = self._row_group.button(self._active_row)
-            if btn and not btn.isChecked():
-                btn.setChecked(True)
-    
-        self.canvas.draw_idle()
+        if self._slot(row) is None:
+            self.scroll_to(int(row) - len(self.axes) // 2)   # redraws everything
+            return
+        self._apply_row_highlight()
+        self._redraw_rows(prev_row, self._active_row)
+
+    def _redraw_rows(self, *rows):
+        """Re-render only the given rows (line width changed) via the blit layer."""
+        axes = [self.axes_for(r) for r in sorted({r for r in rows if r is not None})]
+        axes = [ax for ax in axes if ax is not None]
+        if axes:
+            self._blit.redraw_static(*axes)
+            self._request_frame()
         
         
     # ============================================================
@@ -655,7 +890,8 @@ class PlotController:
     def get_export_payload(self, filename: str, require_three: bool = True):
         """
         Return a structured payload for XML export.
-        Contains filename, active row index, selections, and computed MVC.
+        Contains filename, the active row's channel index in the file and
+        label, selections, and computed MVC.
         """
         if self._data is None or self._active_row is None:
             return None
@@ -669,9 +905,13 @@ class PlotController:
         if mvc_val is None and bursts:
             mvc_val = self._compute_mvc_from_bursts(row, bursts[:BEST_OF])
 
+        label = None
+        if self._labels is not None and row < len(self._labels):
+            label = str(self._labels[row])
         return {
             "filename": filename,
-            "row": row,
+            "row": self.file_channel(row),
+            "label": label,
             "bursts": bursts[:BEST_OF],
             "mvc": mvc_val,
         }
@@ -679,29 +919,30 @@ class PlotController:
     def _compute_mvc_from_bursts(self, row: int, bursts):
         if self._data is None:
             return None
-        if self._processor is None:
-            try:
-                self._processor = Processor()
-            except Exception:
-                self._processor = None
-                return None
-
-        signal = self._data[row, :]
-        mvc_values = []
-        for lo, hi in bursts:
-            lo_i = int(lo)
-            hi_i = int(hi)
-            segment = signal[lo_i:hi_i]
-            if segment.size == 0:
-                continue
-            try:
-                mvc_val, _ = self._processor.mvc_matlab(segment)
-                mvc_values.append(mvc_val)
-            except Exception:
-                continue
+        try:
+            mvc_values = self.span_mvcs(row, bursts)
+        except Exception:
+            return None
 
-        if not mvc_values:
+        mvc_values = mvc_values[~np.isnan(mvc_values)]
+        if not mvc_values.size:
             return None
-        return max(mvc_values)
+        return float(np.max(mvc_values))
 
+    # ============================================================
+    #                MVC OF SPANS
+    # ============================================================
 
+    def span_mvcs(self, row: int, spans):
+        """
+        MVC of each (lo, hi) span on ``row`` (NaN for an empty span).
+        Uses the whole-signal envelope index when WHOLE_SIGNAL_MVC is on,
+        the per-segment ``mvc_matlab`` pipeline otherwise.
+        """
+        spans = [(row, lo, hi) for lo, hi in spans]
+        if self._envelope_index is not None:
+            return self._envelope_index.mvc_batch(spans)
+        if self._processor is None:
+            self._processor = Processor()
+        mvc_values, _ = self._processor.mvc_matlab_batch(self._data, spans)
+        return mvc_values
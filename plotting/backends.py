@@ -0,0 +1,23 @@
+# /plotting/backends.py
+
+from config.defaults import PLOT_BACKEND
+
+
+BACKENDS = ("matplotlib", "pyqtgraph")
+
+
+def controller_class(name=None):
+    """PlotController class of backend ``name`` (default: ``PLOT_BACKEND``)."""
+    name = PLOT_BACKEND if name is None else name
+    if name == "matplotlib":
+        from plot_controller import PlotController
+        return PlotController
+    if name == "pyqtgraph":
+        try:
+            from plotting.pg_backend import PgPlotController
+        except ImportError as exc:
+            print(f"[warn] pyqtgraph backend unavailable ({exc}); using matplotlib")
+            from plot_controller import PlotController
+            return PlotController
+        return PgPlotController
+    raise ValueError(f"unknown plot backend {name!r} (expected one of {BACKENDS})")
@@ -0,0 +1,105 @@
+# /plotting/blit.py
+
+
+# Extra pixels saved around each axes so thick (animated) spines that
+# straddle the axes edge are erased on restore.
+PAD_PX = 4
+
+
+class BlitManager:
+    """
+    Blitting layer for interactive artists on a Qt/Agg canvas.
+
+    Registered artists are marked animated, so a full ``canvas.draw``
+    renders only the static content (waveforms, grid), after which the
+    background of every axes is saved. :meth:`update` then restores one
+    axes' background, draws its animated artists and blits that region
+    only. :meth:`redraw_static` re-rasterises the static content of
+    selected axes (e.g. a waveform line-width change) without a full draw.
+    Anything that changes data, limits or size should still go through
+    ``draw_idle``; the next draw event refreshes all backgrounds.
+
+    ``underlay(bbox)`` (optional) is called whenever static content has
+    been drawn, before backgrounds are saved (``bbox`` None: the whole
+    canvas), to add to it, e.g. :meth:`CompositingCanvas.composite`.
+    """
+
+    def __init__(self, canvas, underlay=None):
+        self.canvas = canvas
+        self.underlay = underlay
+        self._artists = {}      # axes -> [artist]
+        self._bg = {}           # axes -> saved region
+        self._cid = canvas.mpl_connect("draw_event", self._on_draw)
+
+    def reset(self):
+        """Forget all artists and backgrounds (after ``figure.clear()``)."""
+        self._artists.clear()
+        self._bg.clear()
+
+    def add(self, artist, ax=None):
+        ax = artist.axes if ax is None else ax
+        artist.set_animated(True)
+        self._artists.setdefault(ax, []).append(artist)
+        return artist
+
+    def remove(self, artist):
+        """Detach ``artist`` from the figure and from the animated set."""
+        for arts in self._artists.values():
+            if artist in arts:
+                arts.remove(artist)
+        try:
+            artist.remove()
+        except Exception:
+            pass
+
+    def _region(self, ax):
+        return ax.bbox.padded(PAD_PX)
+
+    def _draw_animated(self, ax):
+        fig = self.canvas.figure
+        for a in self._artists.get(ax, []):
+            if a.figure is not None and a.get_visible():
+                fig.draw_artist(a)
+
+    def _on_draw(self, _event):
+        if self.underlay is not None:
+            self.underlay(None)
+        self._bg = {ax: self.canvas.copy_from_bbox(self._region(ax)) for ax in self._artists}
+        for ax in self._artists:
+            self._draw_animated(ax)
+
+    def refresh(self):
+        """
+        The whole static buffer was redrawn outside a draw (e.g. a new
+        composited frame): save it as the backgrounds, then draw and blit
+        the animated artists over it.
+        """
+        self._bg = {ax: self.canvas.copy_from_bbox(self._region(ax)) for ax in self._artists}
+        for ax in self._artists:
+            self._draw_animated(ax)
+        self.canvas.blit()
+
+    def update(self, *axes):
+        """Re-blit the animated artists of ``axes`` (all registered if none)."""
+        axes = axes or tuple(self._artists)
+        if any(ax not in self._bg for ax in axes):
+            self.canvas.draw_idle()
+            return
+        for ax in axes:
+            self.canvas.restore_region(self._bg[ax])
+            self._draw_animated(ax)
+            self.canvas.blit(self._region(ax))
+
+    def redraw_static(self, *axes):
+        """Re-render the static content of ``axes`` only, then blit them."""
+        if any(ax not in self._bg for ax in axes):
+            self.canvas.draw_idle()
+            return
+        fig = self.canvas.figure
+        for ax in axes:
+            self.canvas.restore_region(self._bg[ax])
+            fig.draw_artist(ax)
+            if self.underlay is not None:
+                self.underlay(self._region(ax))
+            self._bg[ax] = self.canvas.copy_from_bbox(self._region(ax))
+        self.update(*axes)
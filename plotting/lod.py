@@ -0,0 +1,123 @@
+# /plotting/lod.py
+
+import numpy as np
+
+from processors.precision import as_float
+
+
+# Samples per bucket on the first decimated level, and between levels.
+# Total pyramid size is ~2n / (BASE - 1) floats on top of the raw data.
+BASE = 4
+
+# Points drawn per horizontal pixel of the axes (one min + one max).
+POINTS_PER_PIXEL = 2
+
+
+def _reduce(lo, hi, factor):
+    """Min/max of consecutive groups of ``factor`` buckets (NaN-padded tail)."""
+    nb = -(-lo.size // factor)
+    pad = nb * factor - lo.size
+    if pad:
+        lo = np.concatenate([lo, np.full(pad, np.nan, dtype=lo.dtype)])
+        hi = np.concatenate([hi, np.full(pad, np.nan, dtype=hi.dtype)])
+    return (np.fmin.reduce(lo.reshape(nb, factor), axis=1),
+            np.fmax.reduce(hi.reshape(nb, factor), axis=1))
+
+
+class MinMaxPyramid:
+    """
+    Min/max decimation levels of one channel for level-of-detail plotting.
+
+    Level ``k`` holds the min and max of every ``BASE ** k`` consecutive
+    samples (level 0 is the raw signal). :meth:`view` picks the coarsest
+    level that still gives at least one bucket per output pixel, so the
+    number of points returned depends on the pixel width, not on how many
+    samples the x-range covers. NaN gaps are ignored inside a bucket and
+    kept when a whole bucket is NaN.
+    """
+
+    def __init__(self, y, base=BASE):
+        self.y = np.asarray(y).ravel()
+        self.n = self.y.size
+        self.base = int(base)
+        self.levels = []        # [(bucket, mins, maxs)], bucket = base ** k
+        lo = hi = as_float(self.y)        # float32 samples stay float32 in FLOAT32 mode
+        bucket = 1
+        while lo.size > 1:
+            lo, hi = _reduce(lo, hi, self.base)
+            bucket *= self.base
+            self.levels.append((bucket, lo, hi))
+
+    def view(self, x0, x1, pixels, per_pixel=POINTS_PER_PIXEL):
+        """
+        ``(x, y)`` to draw for the sample range ``[x0, x1]`` on an axes
+        ``pixels`` wide: the exact samples when there are at most
+        ``per_pixel * pixels`` of them, otherwise a min/max envelope of
+        about that many points. One sample/bucket of margin is included on
+        both sides so the line runs to the axes edges.
+        """
+        if self.n == 0:
+            return np.zeros(0), np.zeros(0)
+        budget = max(2, int(per_pixel * max(1, pixels)))
+        span = max(1.0, float(x1) - float(x0))
+
+        if span + 2 <= budget or not self.levels:
+            i0 = max(0, int(np.floor(x0)) - 1)
+            i1 = min(self.n, int(np.ceil(x1)) + 2)
+            return np.arange(i0, i1, dtype=float), self.y[i0:i1]
+
+        bucket, mins, maxs = next(
+            (lv for lv in self.levels if 2 * span / lv[0] <= budget), self.levels[-1])
+        b0 = max(0, int(np.floor(x0)) // bucket - 1)
+        b1 = min(mins.size, int(np.ceil(x1)) // bucket + 2)
+        centres = (np.arange(b0, b1) * bucket + 0.5 * (bucket - 1)).clip(0, self.n - 1)
+        x = np.repeat(centres, 2)
+        y = np.empty(x.size)
+        y[0::2] = mins[b0:b1]
+        y[1::2] = maxs[b0:b1]
+        return x, y
+
+    @property
+    def nbytes(self):
+        """Memory of the decimation levels (level 0 is the caller's samples)."""
+        return sum(mins.nbytes + maxs.nbytes for _, mins, maxs in self.levels)
+
+
+class LODLine:
+    """
+    A ``Line2D`` fed from a :class:`MinMaxPyramid` (built from ``y``, or
+    ``y`` itself when it already is one): re-decimated whenever
+    the axes' x-limits change or the canvas is resized, so each redraw
+    handles ~``POINTS_PER_PIXEL`` x axes width vertices.
+    """
+
+    def __init__(self, ax, y, **line_kw):
+        self.ax = ax
+        self.pyramid = y if isinstance(y, MinMaxPyramid) else MinMaxPyramid(y)
+        x0, x1 = 0, max(0, self.pyramid.n - 1)
+        (self.line,) = ax.plot(*self.pyramid.view(x0, x1, self._pixels()), **line_kw)
+        self._cid = ax.callbacks.connect("xlim_changed", lambda _ax: self.update())
+
+    def set_y(self, y):
+        """
+        Swap in a new signal (array or prebuilt :class:`MinMaxPyramid`),
+        keeping the ``Line2D`` and its callbacks.
+        """
+        self.pyramid = y if isinstance(y, MinMaxPyramid) else MinMaxPyramid(y)
+        self.update()
+
+    def _pixels(self):
+        try:
+            return max(1, int(round(self.ax.get_window_extent().width)))
+        except Exception:
+            return 1000
+
+    def update(self):
+        x0, x1 = self.ax.get_xlim()
+        self.line.set_data(*self.pyramid.view(min(x0, x1), max(x0, x1), self._pixels()))
+
+    def disconnect(self):
+        try:
+            self.ax.callbacks.disconnect(self._cid)
+        except Exception:
+            pass
@@ -0,0 +1,193 @@
+# /plotting/offscreen.py
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QImage
+
+
+# One worker per mode, shared by every canvas: frames are rendered one at
+# a time and each renderer keeps at most one frame in flight.
+_EXECUTORS = {}
+
+
+def _executor(mode):
+    pool = _EXECUTORS.get(mode)
+    if pool is None:
+        if mode == "process":
+            ctx = multiprocessing.get_context("spawn")
+            pool = ProcessPoolExecutor(max_workers=1, mp_context=ctx)
+        elif mode == "thread":
+            pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="emg-render")
+        else:
+            raise ValueError(f"unknown render mode {mode!r} (expected 'thread' or 'process')")
+        _EXECUTORS[mode] = pool
+    return pool
+
+
+def rasterize_layers(width, height, layers, dpi):
+    """
+    Rasterize waveform layers into a transparent ``(height, width, 4)``
+    RGBA array.
+
+    Each layer is a dict with ``bbox`` (x0, y0, w, h in figure pixels,
+    origin bottom-left), ``xlim``, ``ylim``, ``x``, ``y``, ``lw`` and
+    ``color``. A private Agg figure is used, so this runs on any thread
+    or in another process.
+    """
+    width, height = int(width), int(height)
+    fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    fig.patch.set_alpha(0.0)
+    agg = FigureCanvasAgg(fig)
+    for layer in layers:
+        x0, y0, w, h = layer["bbox"]
+        ax = fig.add_axes([x0 / width, y0 / height, w / width, h / height])
+        ax.set_axis_off()
+        ax.plot(layer["x"], layer["y"], lw=layer["lw"], color=layer["color"])
+        ax.set_xlim(*layer["xlim"])
+        ax.set_ylim(*layer["ylim"])
+    agg.draw()
+    return np.asarray(agg.buffer_rgba()).copy()
+
+
+class FrameRenderer(QObject):
+    """
+    Renders frames with :func:`rasterize_layers` on a worker (``"thread"``
+    or ``"process"``) and delivers them on the GUI thread as ``QImage``.
+
+    Every :meth:`submit` gets a new version token. While a frame is being
+    rendered only the newest request is queued behind it; frames whose
+    token is no longer the newest are dropped, so ``frameReady`` only ever
+    carries the current view.
+    """
+
+    frameReady = pyqtSignal(QImage)
+    _rendered = pyqtSignal(int, QImage)     # worker -> GUI thread (queued)
+
+    def __init__(self, mode="thread", parent=None):
+        super().__init__(parent)
+        self.mode = mode
+        self.version = 0
+        self._lock = threading.Lock()
+        self._busy = False
+        self._pending = None
+        self._rendered.connect(self._deliver)
+
+    def submit(self, width, height, layers, dpi):
+        """Request a frame; returns its version token."""
+        self.version += 1
+        job = (self.version, (width, height, layers, dpi))
+        with self._lock:
+            if self._busy:
+                self._pending = job
+                return self.version
+            self._busy = True
+        self._start(job)
+        return self.version
+
+    def cancel(self):
+        """Invalidate every frame requested so far."""
+        self.version += 1
+        with self._lock:
+            self._pending = None
+
+    def _start(self, job):
+        version, args = job
+        fut = _executor(self.mode).submit(rasterize_layers, *args)
+        fut.add_done_callback(lambda f, v=version: self._done(v, f))
+
+    def _done(self, version, fut):
+        with self._lock:
+            job, self._pending = self._pending, None
+            self._busy = job is not None
+        if job is not None:
+            self._start(job)
+
+        if version != self.version or fut.cancelled():
+            return
+        exc = fut.exception()
+        if exc is not None:
+            print(f"[warn] Off-thread render failed: {exc}")
+            return
+        rgba = fut.result()
+        h, w = rgba.shape[:2]
+        image = QImage(rgba.data, w, h, 4 * w, QImage.Format_RGBA8888).copy()
+        try:
+            self._rendered.emit(version, image)
+        except RuntimeError:
+            pass    # renderer deleted meanwhile
+
+    def _deliver(self, version, image):
+        if version == self.version:
+            self.frameReady.emit(image)
+
+
+class CompositingCanvas(FigureCanvasQTAgg):
+    """
+    Qt/Agg canvas that blends the latest completed waveform frame into the
+    Agg buffer as part of its static content: above axes and grid, below
+    the blitted artists (selections, live readout), which the blit layer
+    draws over it. A frame whose size no longer matches the canvas is not
+    blended.
+    """
+
+    def __init__(self, figure=None):
+        super().__init__(figure)
+        self.frame = None
+        self._frame_rgba = None
+        self._static = None     # Agg buffer as last drawn, without the frame
+
+    def _buffer(self):
+        return np.asarray(self.get_renderer().buffer_rgba())
+
+    def _slices(self, bbox):
+        """Buffer rows/columns of a display-space ``bbox`` (as ``copy_from_bbox`` rounds it)."""
+        if bbox is None:
+            return np.s_[:, :]
+        h = self._static.shape[0]
+        l, b, r, t = bbox.extents
+        return np.s_[max(0, h - int(t)):max(0, h - int(b)), max(0, int(l)):max(0, int(r))]
+
+    def composite(self, bbox=None):
+        """
+        Keep the static content just drawn inside ``bbox`` (the whole
+        canvas if None) and blend the frame over it. Called by the blit
+        layer before it saves its backgrounds.
+        """
+        buf = self._buffer()
+        if bbox is None or self._static is None or self._static.shape != buf.shape:
+            self._static = buf.copy()
+        else:
+            sl = self._slices(bbox)
+            self._static[sl] = buf[sl]
+        self._blend(self._slices(bbox))
+
+    def _blend(self, sl):
+        frame = self._frame_rgba
+        if frame is None or self._static is None or frame.shape != self._static.shape:
+            return False
+        alpha = frame[sl][..., 3:4].astype(np.float32) / 255.0
+        out = self._buffer()[sl]
+        out[..., :3] = (frame[sl][..., :3] * alpha + self._static[sl][..., :3] * (1.0 - alpha)).astype(np.uint8)
+        out[..., 3] = np.maximum(frame[sl][..., 3], self._static[sl][..., 3])
+        return True
+
+    def set_frame(self, image):
+        """
+        Blend ``image`` over the static content. True if it was placed:
+        the blitted artists must then be redrawn over it (BlitManager.refresh).
+        """
+        rgba = image.convertToFormat(QImage.Format_RGBA8888)
+        bits = rgba.constBits()
+        bits.setsize(rgba.sizeInBytes())
+        rows = np.frombuffer(bits, np.uint8).reshape(rgba.height(), rgba.bytesPerLine())
+        self._frame_rgba = rows[:, :4 * rgba.width()].reshape(rgba.height(), rgba.width(), 4).copy()
+        image.setDevicePixelRatio(self.device_pixel_ratio)
+        self.frame = image
+        return self._blend(self._slices(None))
@@ -0,0 +1,174 @@
+# /plotting/overlays.py
+
+from functools import lru_cache
+
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QIcon, QPixmap
+from PyQt5.QtWidgets import (
+    QButtonGroup, QHBoxLayout, QLabel, QPushButton, QRadioButton, QSizePolicy, QWidget
+)
+
+from utilities.path_utils import base_path
+
+
+# Overlay geometry (pixels)
+W_TOP, H_TOP = 160, 40
+W_BTN, H_BTN = 40, 40
+MARGIN_X, MARGIN_Y = 10, 8
+
+# Shared by every overlay of every tab
+RADIO_STYLE = """
+    QRadioButton { margin: 0px; padding: 0px; }
+    QRadioButton::indicator { width: 18px; height: 18px; margin: 0px; }
+    QRadioButton::indicator:unchecked {
+        border: 3px solid black; border-radius: 13px; background: white;
+    }
+    QRadioButton::indicator:checked {
+        border: 3px solid black; border-radius: 13px; background: #3daee9;
+    }
+"""
+LABEL_STYLE = """
+    QLabel {
+        font-size: 18px; font-weight: 700; color: black;
+        background: rgba(255,255,255,230);
+        border-radius: 6px; padding: 2px 10px;
+    }
+"""
+CLEAR_STYLE = """
+    QPushButton {
+        background-color: transparent;
+        border: none;
+        padding: 0px;
+    }
+    QPushButton:hover {
+        background-color: transparent;
+    }
+    QPushButton:pressed {
+        background-color: #f4a742;
+    }
+"""
+
+
+@lru_cache(maxsize=None)
+def broom_icon():
+    """The clear-row icon, loaded and smooth-scaled once per process."""
+    pixmap = QPixmap(base_path("resources/icons", "icn_broom.png"))
+    return QIcon(pixmap.scaled(28, 28, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+
+class OverlayPool:
+    """
+    Per-canvas pool of row overlays (label + radio button at the top right
+    of each axes, clear button at the bottom right).
+
+    Widgets are created the first time a row index is needed and reused
+    afterwards: :meth:`sync` only relabels, shows or hides them.
+    :meth:`reposition` places them from the axes positions (:meth:`_box`)
+    and should be called when the canvas size or the subplot layout changes.
+    """
+
+    def __init__(self, canvas, on_row_clicked, on_clear):
+        self.canvas = canvas
+        self.group = QButtonGroup(canvas)
+        self.group.setExclusive(True)
+        self.group.idClicked.connect(on_row_clicked)
+        self._on_clear = on_clear
+        self._items = []
+
+    @property
+    def items(self):
+        """Overlays currently attached to an axes."""
+        return [itm for itm in self._items if itm["ax"] is not None]
+
+    def _make_row(self, i):
+        w_top = QWidget(self.canvas)
+        w_top.setAttribute(Qt.WA_NoSystemBackground, True)
+        w_top.setAttribute(Qt.WA_TranslucentBackground, True)
+        w_top.setStyleSheet("background: transparent;")
+        lay_top = QHBoxLayout(w_top)
+        lay_top.setContentsMargins(8, 4, 0, 4)
+        lay_top.setSpacing(6)
+
+        lbl = QLabel("", w_top)
+        lbl.setStyleSheet(LABEL_STYLE)
+
+        rdo = QRadioButton(w_top)
+        rdo.setStyleSheet(RADIO_STYLE)
+        self.group.addButton(rdo, i)
+
+        lay_top.addWidget(lbl, 1)
+        lay_top.addWidget(rdo, 0, alignment=Qt.AlignRight | Qt.AlignTop)
+
+        w_bottom = QWidget(self.canvas)
+        w_bottom.setAttribute(Qt.WA_NoSystemBackground, True)
+        w_bottom.setAttribute(Qt.WA_TranslucentBackground, True)
+        lay_bottom = QHBoxLayout(w_bottom)
+        lay_bottom.setContentsMargins(0, 0, 0, 0)
+        lay_bottom.setSpacing(0)
+
+        btn_clear = QPushButton(w_bottom)
+        btn_clear.setFixedSize(30, 30)
+        btn_clear.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        btn_clear.setIcon(broom_icon())
+        btn_clear.setIconSize(QSize(28, 28))
+        btn_clear.setStyleSheet(CLEAR_STYLE)
+        btn_clear.setToolTip("Clear selections for this row")
+        btn_clear.clicked.connect(lambda _, r=i: self._on_clear(r))
+        lay_bottom.addStretch(1)
+        lay_bottom.addWidget(btn_clear, 0, alignment=Qt.AlignRight | Qt.AlignBottom)
+
+        return {
+            "ax": None,
+            "widget_top": w_top,
+            "widget_bottom": w_bottom,
+            "label": lbl,
+            "radio": rdo,
+            "row_index": i,
+            "clear_btn": btn_clear,
+        }
+
+    def sync(self, axes, labels):
+        """Attach one overlay per axes (creating only missing ones); row 0 checked."""
+        for i, ax in enumerate(axes):
+            if i == len(self._items):
+                self._items.append(self._make_row(i))
+            itm = self._items[i]
+            itm["ax"] = ax
+            text = str(labels[i]) if labels is not None and len(labels) > i else f"EMG {i+1}"
+            if itm["label"].text() != text:
+                itm["label"].setText(text)
+            itm["widget_top"].show()
+            itm["widget_bottom"].show()
+        for itm in self._items[len(axes):]:
+            itm["ax"] = None
+            itm["widget_top"].hide()
+            itm["widget_bottom"].hide()
+        if axes:
+            self._items[0]["radio"].setChecked(True)
+        self.reposition()
+
+    def _box(self, ax):
+        """(right, top, bottom) of ``ax`` in canvas pixels (Qt, origin top-left)."""
+        cW, cH = self.canvas.width(), self.canvas.height()
+        bbox = ax.get_position()
+        return bbox.x1 * cW, (1.0 - bbox.y1) * cH, (1.0 - bbox.y0) * cH
+
+    def reposition(self):
+        for itm in self.items:
+            right, top, bottom = self._box(itm["ax"])
+            x_right = int(right - MARGIN_X)
+            x0_top = x_right - W_TOP
+            y0_top = int(top + MARGIN_Y)
+            itm["widget_top"].setGeometry(x0_top, y0_top, W_TOP, H_TOP)
+            itm["widget_top"].raise_()
+            x0_btn = x_right - W_BTN - 7
+            y0_btn = int(bottom - H_BTN - MARGIN_Y)
+            itm["widget_bottom"].setGeometry(x0_btn, y0_btn, W_BTN, H_BTN)
+            itm["widget_bottom"].raise_()
+
+    def clear(self):
+        for itm in self._items:
+            for key in ("widget_top", "widget_bottom"):
+                try: itm[key].deleteLater()
+                except Exception: pass
+        self._items = []
@@ -0,0 +1,254 @@
+# /plotting/pg_backend.py
+
+import pyqtgraph as pg
+from PyQt5 import sip
+from PyQt5.QtCore import Qt
+
+from plot_controller import PlotController
+from plotting.overlays import OverlayPool
+
+
+LINE_COLOR = "#1f77b4"              # matplotlib's default C0
+SPAN_BRUSH = (255, 165, 0, 76)      # orange, alpha 0.3 (as axvspan)
+LIVE_BRUSH = (255, 165, 0, 51)      # orange, alpha 0.2 (live rectangle)
+DELETE_TOL_PX = 6.0
+
+
+class PgCanvas(pg.GraphicsLayoutWidget):
+    """Layout widget answering the ``draw_idle`` calls of PlotController."""
+
+    def draw_idle(self):
+        self.update()
+
+
+class ItemLayer:
+    """
+    :class:`~plotting.blit.BlitManager` stand-in: pyqtgraph repaints
+    changed items on its own, so this only attaches and detaches them.
+    """
+
+    def __init__(self):
+        self._owner = {}        # item -> PlotItem
+
+    def reset(self):
+        self._owner.clear()
+
+    def add(self, item, ax=None):
+        if ax is not None:
+            ax.addItem(item, ignoreBounds=True)
+            self._owner[item] = ax
+        return item
+
+    def remove(self, item):
+        ax = self._owner.pop(item, None)
+        if ax is not None:
+            ax.removeItem(item)
+
+    def update(self, *axes):
+        pass
+
+    def redraw_static(self, *axes):
+        pass
+
+
+class PgOverlayPool(OverlayPool):
+    """Row overlays placed from the PlotItems' view boxes."""
+
+    def _box(self, ax):
+        rect = self.canvas.mapFromScene(ax.vb.sceneBoundingRect()).boundingRect()
+        return rect.right(), rect.top(), rect.bottom()
+
+
+class SpanViewBox(pg.ViewBox):
+    """
+    Left drag draws a span and Shift+click deletes one (both handled by
+    the controller); other buttons and the wheel pan / zoom along x.
+    """
+
+    def __init__(self, ctrl):
+        super().__init__()
+        self._ctrl = ctrl
+        self.setMouseEnabled(x=True, y=False)
+        self.setMenuEnabled(False)
+
+    def _x(self, scene_pos):
+        return float(self.mapSceneToView(scene_pos).x())
+
+    def mouseClickEvent(self, ev):
+        if ev.button() == Qt.LeftButton and ev.modifiers() & Qt.ShiftModifier:
+            ev.accept()
+            self._ctrl._pg_shift_click(self, self._x(ev.scenePos()))
+        else:
+            super().mouseClickEvent(ev)
+
+    def mouseDragEvent(self, ev, axis=None):
+        if ev.button() != Qt.LeftButton or ev.modifiers() & Qt.ShiftModifier:
+            super().mouseDragEvent(ev, axis)
+            return
+        ev.accept()
+        if ev.isStart():
+            self._ctrl._pg_press(self, self._x(ev.buttonDownScenePos()))
+        if ev.isFinish():
+            self._ctrl._pg_release(self, self._x(ev.scenePos()))
+        else:
+            self._ctrl._pg_motion(self, self._x(ev.scenePos()))
+
+
+class PgPlotController(PlotController):
+    """
+    PlotController drawn with pyqtgraph (software rendering): each row is a
+    PlotItem with peak downsampling and clip-to-view, so only the visible
+    samples, reduced to about one min/max pair per pixel, are painted.
+
+    Only the backend hooks are overridden; selections, BEST_OF, Shift+click
+    deletion, row activation and the channel bank are PlotController's.
+    """
+
+    def _make_canvas(self, container):
+        self.canvas = PgCanvas()
+        self.canvas.setBackground("w")
+        self.toolbar = None
+        self._blit = ItemLayer()
+        self._overlays = PgOverlayPool(
+            self.canvas, self._on_row_clicked,
+            lambda slot: self.clear_row_selections(self._row_offset + slot),
+        )
+        self._curves = []
+
+    def _render(self):
+        data = self._data
+        if data is None:
+            return
+        nrows = min(self._max_rows, int(data.shape[0]))
+        npts = int(data.shape[1])
+
+        if len(self.axes) != nrows:
+            self._live_rect = None
+            self.canvas.clear()
+            self._blit.reset()
+            self.axes, self._curves = [], []
+            for i in range(nrows):
+                ax = self.canvas.addPlot(row=i, col=0, viewBox=SpanViewBox(self))
+                ax.hideAxis("left"); ax.hideAxis("bottom")
+                ax.showGrid(x=True, y=True, alpha=0.4)
+                ax.setDownsampling(auto=True, mode="peak")
+                ax.setClipToView(True)
+                if self.axes:
+                    ax.setXLink(self.axes[0])
+                ax.vb.sigResized.connect(self._on_view_resized)
+                self._curves.append(ax.plot(pen=pg.mkPen(LINE_COLOR, width=1.0)))
+                self.axes.append(ax)
+
+        for ax in self.axes:
+            ax.vb.setLimits(xMin=0, xMax=max(1, npts - 1))
+        if self.axes:
+            self.axes[0].setXRange(0, max(1, npts - 1), padding=0)
+
+        self._patches = {r: [] for r in self._selections}
+        self._show_rows()
+        self._attach_mouse_handlers()
+        self._update_scrollbar()
+        self.canvas.setVisible(True)
+
+    def release(self):
+        super().release()
+        self._curves = []
+
+    def _on_view_resized(self, *_):
+        # The canvas deletes its view boxes one by one; the survivors resize meanwhile
+        if self._overlays is not None and not any(sip.isdeleted(ax.vb) for ax in self.axes):
+            self._overlays.reposition()
+
+    def _prefetch_step(self):
+        self._prefetch_timer.stop()     # pyqtgraph downsamples by itself
+
+    # ---------------- hooks ----------------
+    def _fill_slots(self):
+        for i, (ax, curve) in enumerate(zip(self.axes, self._curves)):
+            curve.setData(self._data[self._row_offset + i, :])
+            ax.enableAutoRange(axis="y")
+
+    def _bold_slot(self, active):
+        for i, (ax, curve) in enumerate(zip(self.axes, self._curves)):
+            ax.vb.setBorder(pg.mkPen("k", width=2.2 if i == active else 0.8))
+            curve.setPen(pg.mkPen(LINE_COLOR, width=2.2 if i == active else 1.0))
+
+    def _span_patch(self, row: int, lo, hi):
+        item = pg.LinearRegionItem(values=(lo, hi), movable=False,
+                                   brush=pg.mkBrush(*SPAN_BRUSH), pen=pg.mkPen(None))
+        return self._blit.add(item, self.axes_for(row))
+
+    def _start_live_mvc(self, ax):
+        self._stop_live_mvc()
+        try:
+            self.live_mvc(self._active_row, 0, 0)    # build the row envelope now
+        except Exception:
+            return
+        text = pg.TextItem("", color="k", anchor=(0, 0),
+                           fill=pg.mkBrush(255, 255, 255, 204), border=pg.mkPen("orange"))
+        (x0, _), (_, y1) = ax.vb.viewRange()
+        text.setPos(x0, y1)
+        self._live_text = self._blit.add(text, ax)
+        self._live_last = 0.0
+
+    def _set_live_text(self, text):
+        self._live_text.setText(text)
+
+    def _stop_live_mvc(self):
+        self._live_timer.stop()
+        self._live_span = None
+        if self._live_text is not None:
+            self._blit.remove(self._live_text)
+            self._live_text = None
+
+    # ---------------- mouse (called by SpanViewBox) ----------------
+    def _attach_mouse_handlers(self):
+        self._click_x = None
+
+    def _active_ax(self, vb):
+        """The active row's PlotItem if ``vb`` belongs to it, else None."""
+        ax = self.axes_for(self._active_row)
+        return ax if ax is not None and ax.vb is vb else None
+
+    def _pg_press(self, vb, x):
+        ax = self._active_ax(vb)
+        if ax is None:
+            print(f"[skip] Click ignored — not in active row ({self._active_row})")
+            return
+        self._click_x = x
+        if self._live_rect is not None:
+            self._blit.remove(self._live_rect)
+        self._live_rect = self._blit.add(
+            pg.LinearRegionItem(values=(x, x), movable=False,
+                                brush=pg.mkBrush(*LIVE_BRUSH), pen=pg.mkPen(None)),
+            ax,
+        )
+        self._start_live_mvc(ax)
+
+    def _pg_motion(self, vb, x):
+        if self._click_x is None or self._live_rect is None or self._active_ax(vb) is None:
+            return
+        lo, hi = sorted([self._click_x, x])
+        self._live_rect.setRegion((lo, hi))
+        self._schedule_live_mvc(self._active_row, lo, hi)
+
+    def _pg_release(self, vb, x):
+        if self._click_x is None:
+            return
+        if self._active_ax(vb) is None:
+            self._click_x = None
+            return
+        lo, hi = sorted([self._click_x, x])
+        if self._live_rect is not None:
+            self._blit.remove(self._live_rect)
+            self._live_rect = None
+        self._stop_live_mvc()
+        self._click_x = None
+        if abs(hi - lo) >= 1e-6:
+            self._add_span(self._active_row, lo, hi)
+
+    def _pg_shift_click(self, vb, x):
+        if self._active_ax(vb) is None:
+            print(f"[skip] Click ignored — not in active row ({self._active_row})")
+            return
+        self._delete_span_at(self._active_row, x, DELETE_TOL_PX * vb.viewPixelSize()[0])
@@ -0,0 +1,40 @@
+# /plotting/tab_cache.py
+
+from collections import OrderedDict
+
+from config.defaults import LIVE_CANVASES
+
+
+class CanvasLRU:
+    """
+    Least-recently-activated set of rendered ``PlotController`` s.
+
+    :meth:`activate` renders a controller into its tab on first use (or
+    after it was released) and marks it most recent; once more than
+    ``capacity`` are live, the oldest is released back to a data-only
+    state. Controllers keep their selections and results either way.
+    """
+
+    def __init__(self, capacity=LIVE_CANVASES):
+        self.capacity = max(1, int(capacity))
+        self._live = OrderedDict()      # PlotController -> container
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, plot_ctrl):
+        return plot_ctrl in self._live
+
+    def activate(self, plot_ctrl, container):
+        self._live.pop(plot_ctrl, None)
+        self._live[plot_ctrl] = container
+        plot_ctrl.materialize(container)
+        while len(self._live) > self.capacity:
+            old, _ = self._live.popitem(last=False)
+            old.release()
+
+    def discard(self, plot_ctrl):
+        self._live.pop(plot_ctrl, None)
+
+    def clear(self):
+        self._live.clear()
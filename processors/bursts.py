@@ -0,0 +1,119 @@
+# /processors/bursts.py
+
+import numpy as np
+
+from processors import sliding
+
+
+def runs(mask):
+    """
+    Start/end indices (end exclusive) of every run of truthy samples.
+    """
+    m = np.asarray(mask).astype(bool).ravel()
+    if m.size == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty.copy()
+    edges = np.diff(m.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return starts, ends
+
+
+def drop_short(starts, ends, min_len):
+    """Keep only the runs that are at least ``min_len`` samples long."""
+    keep = (ends - starts) >= int(min_len)
+    return starts[keep], ends[keep]
+
+
+def run_sums(values, starts, ends):
+    """``values[s:e].sum()`` for every run, in one ``np.add.reduceat`` pass."""
+    values = np.asarray(values, float).ravel()
+    if len(starts) == 0:
+        return np.zeros(0)
+    # Pad so a run ending at len(values) is still a valid reduceat index.
+    padded = np.append(values, 0.0)
+    idx = np.column_stack([starts, ends]).ravel()
+    return np.add.reduceat(padded, idx)[::2]
+
+
+def top_k(starts, ends, scores, k):
+    """The ``k`` highest-scoring runs, returned in time order."""
+    k = int(k)
+    if len(starts) <= k:
+        return starts, ends
+    idx = np.argpartition(np.asarray(scores), -k)[-k:]
+    idx.sort()
+    return starts[idx], ends[idx]
+
+
+def energy_bursts(x, fs, min_silence=0.080, min_sound=0.200, threshold=0.010, keep=None):
+    """
+    Burst intervals of a 1-D signal by time-domain energy detection.
+
+    The energy is smoothed over ``min_silence`` seconds and normalised to
+    its maximum; samples at or above ``threshold`` are sound. Runs shorter
+    than ``min_sound`` seconds are dropped and, if ``keep`` is given, only
+    the ``keep`` runs with the largest total energy survive.
+
+    Returns
+    -------
+    starts, ends : np.ndarray
+        Integer sample indices, ``ends`` exclusive, sorted by start.
+    """
+    if min_sound <= min_silence:
+        raise ValueError("min_sound must be larger than min_silence")
+    x = np.asarray(x).astype(float).ravel()
+    if x.size == 0:
+        return runs(x)
+
+    energy = np.abs(x) ** 2
+    min_silence_samples = max(1, int(round(min_silence * fs)))
+    min_sound_samples = max(1, int(round(min_sound * fs)))
+    moving_ave = sliding.moving_mean(energy, min_silence_samples)[:x.size]
+    moving_ave /= moving_ave.max() + 1e-12
+
+    starts, ends = drop_short(*runs(moving_ave >= threshold), min_sound_samples)
+    if keep is not None:
+        starts, ends = top_k(starts, ends, run_sums(energy, starts, ends), keep)
+    return starts, ends
+
+
+def intervals_to_mask(starts, ends, n):
+    """0/1 mask of length ``n`` with ones inside every interval."""
+    delta = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(delta, np.asarray(starts, dtype=np.intp), 1)
+    np.add.at(delta, np.asarray(ends, dtype=np.intp), -1)
+    return (np.cumsum(delta[:-1]) > 0).astype(int)
+
+
+def best_windows(values, width, count):
+    """
+    Start indices of the ``count`` non-overlapping windows of ``width``
+    samples with the highest mean, per row of a 1-D or 2-D ``values``.
+
+    Window means come from one prefix sum (O(n) per row); windows are then
+    picked greedily, best first, each pick ruling out every start closer
+    than ``width`` to it. All rows are handled together. NaN samples count
+    as 0. Returns an int array of shape (rows, count), or (count,) for 1-D
+    input, sorted by time and padded with -1 where fewer windows fit.
+    """
+    w = int(width); k = int(count)
+    if w < 1:
+        raise ValueError("width must be >= 1")
+    V = np.nan_to_num(np.array(values, dtype=float, ndmin=2), nan=0.0)
+    rows, n = V.shape
+    starts = np.full((rows, k), -1, dtype=np.intp)
+    m = n - w + 1
+    if m > 0 and k > 0:
+        P = sliding.prefix_sum(V, axis=1)
+        score = (P[:, w:] - P[:, :m]) / w
+        idx = np.arange(m)
+        r = np.arange(rows)
+        for j in range(k):
+            best = np.argmax(score, axis=1)
+            ok = np.isfinite(score[r, best])
+            starts[ok, j] = best[ok]
+            score[np.abs(idx[None, :] - best[:, None]) < w] = -np.inf
+        starts = np.sort(np.where(starts < 0, np.iinfo(np.intp).max, starts), axis=1)
+        starts[starts == np.iinfo(np.intp).max] = -1
+    return starts[0] if np.ndim(values) == 1 else starts
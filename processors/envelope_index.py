@@ -0,0 +1,103 @@
+# /processors/envelope_index.py
+
+import numpy as np
+
+from processors.precision import as_float
+
+
+# Samples per leaf block. A query scans at most two partial blocks
+# (<= 2 * BLOCK samples) plus two sparse-table cells.
+BLOCK = 64
+
+
+class RangeMax:
+    """
+    Range-maximum index over a 1-D array: a sparse table built on block
+    maxima, so ``max(values[lo:hi])`` costs O(1) whatever the span length
+    while the table stays at ~n / BLOCK * log2(n / BLOCK) floats.
+    NaN samples are ignored (``np.nanmax`` semantics).
+    """
+
+    def __init__(self, values, block=BLOCK):
+        v = as_float(values).ravel()
+        self.values = np.where(np.isnan(v), -np.inf, v)
+        self.n = v.size
+        self.block = int(block)
+
+        nb = -(-self.n // self.block) if self.n else 0
+        padded = np.full(nb * self.block, -np.inf, dtype=v.dtype)
+        padded[:self.n] = self.values
+        level = padded.reshape(nb, self.block).max(axis=1) if nb else np.zeros(0)
+        self._table = [level]
+        span = 1
+        while 2 * span <= nb:
+            level = np.maximum(level[:-span], level[span:])
+            self._table.append(level)
+            span *= 2
+
+    def _blocks_max(self, b0, b1):
+        """Max over whole blocks ``b0 .. b1 - 1`` (b1 > b0)."""
+        k = (b1 - b0).bit_length() - 1
+        t = self._table[k]
+        return max(t[b0], t[b1 - (1 << k)])
+
+    def query(self, lo, hi):
+        """``nanmax(values[lo:hi])``, NaN for an empty or all-NaN span."""
+        lo = max(0, int(lo)); hi = min(self.n, int(hi))
+        if hi <= lo:
+            return np.nan
+        B = self.block
+        b_lo, b_hi = lo // B, (hi - 1) // B
+        if b_lo == b_hi:
+            m = self.values[lo:hi].max()
+        else:
+            m = max(self.values[lo:(b_lo + 1) * B].max(), self.values[b_hi * B:hi].max())
+            if b_hi - b_lo > 1:
+                m = max(m, self._blocks_max(b_lo + 1, b_hi))
+        return np.nan if m == -np.inf else float(m)
+
+
+class EnvelopeIndex:
+    """
+    Whole-signal MVC envelopes of a (channels x samples) matrix with a
+    :class:`RangeMax` per channel.
+
+    Each channel is band-passed, rectified and RMS-smoothed once (on first
+    use, or all at once with :meth:`build`); afterwards the MVC of any
+    ``(row, lo, hi)`` span is a constant-time lookup. Values differ from
+    per-segment ``Processor.mvc_matlab`` only through filter edge effects
+    at the span borders, which the whole-signal envelope does not have.
+    """
+
+    def __init__(self, data, processor):
+        self._data = data
+        self._processor = processor
+        self._envelopes = {}
+        self._index = {}
+
+    def __len__(self):
+        return int(self._data.shape[0])
+
+    def build(self, rows=None):
+        """Compute envelopes and indexes for ``rows`` (default: all) in one pass."""
+        rows = [r for r in (range(len(self)) if rows is None else rows) if r not in self._index]
+        if not rows:
+            return
+        env = self._processor.mvc_envelope(np.asarray(self._data[rows, :]))
+        for r, e in zip(rows, env):
+            self._envelopes[r] = e
+            self._index[r] = RangeMax(e)
+
+    def envelope(self, row):
+        self.build([int(row)])
+        return self._envelopes[int(row)]
+
+    def mvc(self, row, lo, hi):
+        self.build([int(row)])
+        return self._index[int(row)].query(lo, hi)
+
+    def mvc_batch(self, spans):
+        """MVC of every (row, lo, hi) span; NaN for empty spans."""
+        spans = list(spans)
+        self.build(sorted({int(r) for r, _, _ in spans}))
+        return np.array([self._index[int(r)].query(lo, hi) for r, lo, hi in spans], dtype=float)
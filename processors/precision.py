@@ -0,0 +1,23 @@
+# /processors/precision.py
+
+import numpy as np
+
+from config.defaults import FLOAT32
+
+
+# Sample dtype of the MVC pipeline (see FLOAT32 in config/defaults.py).
+WORK_DTYPE = np.dtype(np.float32 if FLOAT32 else np.float64)
+
+
+def as_float(x, dtype=None):
+    """
+    ``x`` as a floating array without copying when it already is one,
+    unless ``dtype`` forces one. In FLOAT32 mode float32 stays float32, so
+    kernels never widen it on the way through; otherwise everything,
+    float32 included, becomes float64 and results match the float64
+    pipeline bit for bit.
+    """
+    x = np.asarray(x)
+    if dtype is None:
+        dtype = WORK_DTYPE if x.dtype == np.float32 else np.float64
+    return x.astype(dtype, copy=False)
@@ -4,7 +4,6 @@ import math
 import numpy as np
 import os
 import pandas as pd
-from scipy.signal import butter, filtfilt
 
 
 # -- PYQT -----------------------
@@ -13,7 +12,10 @@ from PyQt5 import uic
 from PyQt5.QtGui import QIcon
 
 # -- CUSTOM ---------------------
-from config.defaults import DEFAULT_SEMG_FREQUENCY
+from config.defaults import BEST_OF, DEFAULT_SEMG_FREQUENCY
+from processors import bursts, filterbank, hampel, sliding, streaming
+from processors.envelope_index import EnvelopeIndex
+from processors.precision import WORK_DTYPE, as_float
 from utilities.path_utils import resource_path
 from utilities.path_utils import base_path
 
@@ -24,33 +26,30 @@ class Processor:
         self.winsize = winsize
         
     @staticmethod  
-    def bandpass(x, fs, lo=20, hi=450, order=4):
-        b, a = butter(order, [lo, hi], btype="band", fs=fs)
-        return filtfilt(b, a, x)
+    def bandpass(x, fs, lo=20, hi=450, order=4, axis=-1):
+        return filterbank.bandpass(x, fs, lo, hi, order, axis=axis)
+
+    @staticmethod
+    def filter_cache_info():
+        return filterbank.cache_info()
     
     
     @staticmethod
     def hampel_filter(x, win_samples=51, k=3.0):
-        x = np.asarray(x, float); n = x.size
-        w = int(win_samples) | 1; half = w // 2
-        y = x.copy()
-        for i in range(n):
-            lo = max(0, i - half); hi = min(n, i + half + 1)
-            seg = x[lo:hi]; med = np.median(seg)
-            mad = np.median(np.abs(seg - med)) + 1e-12
-            if abs(x[i] - med) > k * 1.4826 * mad:
-                y[i] = med
-        return y
+        return hampel.hampel_filter(x, win_samples, k)
+
+    @staticmethod
+    def hampel_filter_2d(X, win_samples=51, k=3.0, axis=-1):
+        return hampel.hampel_filter_2d(X, win_samples, k, axis=axis)
     
     @staticmethod
     def moving_rms(x, win_samples):
-        # centered window via convolution
-        w = np.ones(win_samples) / win_samples
-        return np.sqrt(np.convolve(x**2, w, mode="same"))
+        # centered window, convolution edge semantics (prefix sums, O(n))
+        return sliding.moving_rms(x, win_samples)
 
 
     def clean_semg(self, x, fs, rms_ms=50, hampel_ms=50):
-        x = np.asarray(x, float)
+        x = as_float(x, WORK_DTYPE)
         x = x[~np.isnan(x)]
         if x.size == 0:
             return x
@@ -60,6 +59,19 @@ class Processor:
         rms = type(self).moving_rms(x, max(1, int(fs * rms_ms / 1000)))
         rms_h = type(self).hampel_filter(rms, max(3, int(fs * hampel_ms / 1000)) | 1, k=3.0)
         return rms_h
+
+    def clean_semg_stream(self, source, fs, rms_ms=50, hampel_ms=50, block_size=streaming.DEFAULT_BLOCK):
+        """
+        Streaming ``clean_semg``: yields envelope blocks from ``source``
+        (an iterable of 1-D blocks, or an array / ``np.memmap`` read in
+        ``block_size`` pieces) while holding only a few blocks in memory.
+        Concatenated, the blocks match ``clean_semg`` on the whole signal.
+        """
+        return streaming.clean_semg_blocks(
+            source, fs, rms_ms=rms_ms, hampel_ms=hampel_ms, lo=50, hi=500,
+            block_size=block_size,
+            whole=lambda x: self.clean_semg(x, fs, rms_ms=rms_ms, hampel_ms=hampel_ms),
+        )
     
     
     def energy_detection(self, in_audio: np.ndarray,
@@ -68,62 +80,28 @@ class Processor:
                      fs: int = 44100):
         """
         Detect exactly the 3 strongest bursts of energy in the signal.
+
+        Mask form of :meth:`energy_bursts`, kept for callers that want the
+        0/1 vector and the gated signal.
         """
         x = np.asarray(in_audio).astype(float).ravel()
         if x.size == 0:
             return np.zeros_like(x), x
-        if min_sound <= min_silence:
-            raise ValueError("min_sound must be larger than min_silence")
-    
-        # --- Energy and normalized moving average
-        energy = np.abs(x) ** 2
-        min_silence_samples = max(1, int(round(min_silence * fs)))
-        min_sound_samples   = max(1, int(round(min_sound * fs)))
-        b = np.ones(min_silence_samples, dtype=float) / min_silence_samples
-        moving_ave = np.convolve(energy, b, mode="same")
-        moving_ave /= moving_ave.max() + 1e-12
-    
-        # --- Binary mask: 1 = sound, 0 = silence
-        energy_vector = (moving_ave >= 0.010).astype(int)
-    
-        # --- Remove too-short bursts
-        cum = 0
-        for i in range(len(energy_vector)):
-            if energy_vector[i]:
-                cum += 1
-            else:
-                if 0 < cum < min_sound_samples:
-                    energy_vector[i - cum:i] = 0
-                cum = 0
-        if 0 < cum < min_sound_samples:
-            energy_vector[-cum:] = 0
-    
-        # --- Identify burst start/end indices
-        bursts = []
-        i = 0
-        n = len(energy_vector)
-        while i < n:
-            if energy_vector[i]:
-                start = i
-                while i < n and energy_vector[i]:
-                    i += 1
-                end = i
-                bursts.append((start, end))
-            i += 1
-    
-        # --- Keep only 3 strongest bursts (by total energy)
-        if len(bursts) > 3:
-            energies = [energy[s:e].sum() for s, e in bursts]
-            top3_idx = np.argsort(energies)[-3:]  # highest three
-            top3_bursts = [bursts[i] for i in sorted(top3_idx)]
-            # zero out all others
-            energy_vector[:] = 0
-            for s, e in top3_bursts:
-                energy_vector[s:e] = 1
-    
+        starts, ends = self.energy_bursts(x, min_silence, min_sound, fs)
+        energy_vector = bursts.intervals_to_mask(starts, ends, x.size)
         out_audio = x * energy_vector
         return energy_vector, out_audio
 
+    def energy_bursts(self, in_audio: np.ndarray,
+                      min_silence: float = 0.080,
+                      min_sound: float = 0.200,
+                      fs: int = 44100,
+                      keep: int = 3):
+        """
+        (starts, ends) of the ``keep`` strongest energy bursts, ends exclusive.
+        """
+        return bursts.energy_bursts(in_audio, fs, min_silence, min_sound, keep=keep)
+
 
     # def energy_detection(self, in_audio: np.ndarray,
     #                      min_silence: float = 0.080,
@@ -184,52 +162,122 @@ class Processor:
     #     out_audio = x * energy_vector
     #     return energy_vector, out_audio
 
-    def moving_rms_matlab(self, interval, halfwindow):
-        n = len(interval)
-        rms_signal = np.zeros(n)
-        for i in range(n):
-            small_index = max(0, i - halfwindow)
-            big_index   = min(n, i + halfwindow)
-            window_samples = interval[small_index:big_index]
-            rms_signal[i] = np.sqrt(np.sum(window_samples**2)/len(window_samples))
-        return rms_signal
+    def moving_rms_matlab(self, interval, halfwindow, axis=-1):
+        return sliding.moving_rms_matlab(interval, halfwindow, axis=axis)
 
 
     def mvc_matlab(self, in_vec):
-        x = np.asarray(in_vec, dtype=float)
+        x = as_float(in_vec, WORK_DTYPE)
         x = x[~np.isnan(x)]
         if x.size == 0:
             return np.nan, x  # nothing to do
-    
-        x = x - np.mean(x)
+
+        mvc, movingrms = self._mvc_block(x[None, :])
+        return mvc[0], movingrms[0]
+
+    def mvc_matlab_batch(self, data, spans):
+        """
+        ``mvc_matlab`` for many spans of a (channels x samples) matrix at once.
+
+        Parameters
+        ----------
+        data : 2-D array, one channel per row.
+        spans : iterable of (row, lo, hi); the segment is ``data[row, lo:hi]``.
+
+        Returns
+        -------
+        mvc : np.ndarray, one value per span (NaN for an empty segment).
+        envelopes : list of np.ndarray, the moving-RMS envelope of each span.
+
+        Segments of equal length (after NaN removal) are stacked and filtered
+        together along the sample axis, so each distinct length costs one
+        vectorised pass instead of one pass per span.
+        """
+        segments = []
+        for row, lo, hi in spans:
+            x = as_float(data[int(row), int(lo):int(hi)], WORK_DTYPE)
+            segments.append(x[~np.isnan(x)])
+
+        mvc = np.full(len(segments), np.nan)
+        envelopes = [np.zeros(0)] * len(segments)
+        by_length = {}
+        for i, x in enumerate(segments):
+            if x.size:
+                by_length.setdefault(x.size, []).append(i)
+
+        for idx in by_length.values():
+            block_mvc, block_env = self._mvc_block(np.stack([segments[i] for i in idx]))
+            for j, i in enumerate(idx):
+                mvc[i] = block_mvc[j]
+                envelopes[i] = block_env[j]
+        return mvc, envelopes
+
+    def mvc_envelope(self, data):
+        """
+        Whole-signal MVC envelope of one channel (1-D) or of every row of a
+        (channels x samples) matrix: the ``mvc_matlab`` pipeline run once
+        over the full recording. NaN samples stay NaN in the envelope and
+        keep their place, so envelope indices match the raw samples.
+        """
+        X = np.array(data, dtype=WORK_DTYPE, ndmin=2)
+        nan = np.isnan(X)
+        if nan.any():
+            fill = np.nanmean(np.where(nan.all(axis=1, keepdims=True), 0.0, X), axis=1, keepdims=True)
+            X = np.where(nan, fill, X)
+        _, env = self._mvc_block(X)
+        env[nan] = np.nan
+        return env[0] if np.ndim(data) == 1 else env
+
+    def auto_mvc_windows(self, data, fs=DEFAULT_SEMG_FREQUENCY, window_ms=500, count=BEST_OF,
+                         envelope=None):
+        """
+        Best ``count`` non-overlapping windows of ``window_ms`` per channel,
+        ranked by the mean of the MVC envelope (see :meth:`mvc_envelope`).
+
+        Parameters
+        ----------
+        data : 2-D array, one channel per row (1-D for a single channel).
+        fs : sampling rate used to convert ``window_ms`` to samples.
+        envelope : optional precomputed ``mvc_envelope(data)``.
+
+        Returns
+        -------
+        list of lists of (lo, hi) sample spans, one list per row, in time
+        order; a row shorter than one window gets no spans.
+        """
+        w = max(1, int(round(fs * window_ms / 1000)))
+        env = self.mvc_envelope(data) if envelope is None else envelope
+        starts = np.atleast_2d(bursts.best_windows(env, w, count))
+        spans = [[(int(s), int(s) + w) for s in row if s >= 0] for row in starts]
+        return spans[0] if np.ndim(data) == 1 else spans
+
+    def build_envelope_index(self, data):
+        """:class:`EnvelopeIndex` over ``data`` for O(1) span MVC lookups."""
+        return EnvelopeIndex(data, self)
+
+    def _mvc_block(self, X):
+        """MATLAB MVC pipeline on equal-length, NaN-free segments (one per row)."""
+        X = X - np.mean(X, axis=1, keepdims=True)
     
         # Zero out obvious spikes
-        signal_corrected = x.copy()
-        signal_corrected[signal_corrected > 9800] = 0.0
+        X[X > 9800] = 0.0
     
         # Bandpass filter
         fcutlow, fcuthigh = 10.0, 500.0
         if fcuthigh >= 0.5 * DEFAULT_SEMG_FREQUENCY:
             raise ValueError("fcuthigh must be < Nyquist")
-        b, a = butter(
-            N=4,
-            Wn=[fcutlow, fcuthigh],
-            btype="band",
-            fs=DEFAULT_SEMG_FREQUENCY
-        )
+        sos, zi = filterbank.bandpass_sos(DEFAULT_SEMG_FREQUENCY, fcutlow, fcuthigh, order=4)
     
         # Ensure length is sufficient for filtfilt
-        padlen = 3 * max(len(a), len(b))
-        if signal_corrected.size <= padlen:
+        if X.shape[1] <= filterbank.padlen(sos):
             # fall back to no filter or a simpler approach
-            signal_bp = signal_corrected
+            signal_bp = X
         else:
-            signal_bp = filtfilt(b, a, signal_corrected)
+            signal_bp = filterbank.sosfiltfilt(sos, zi, X, axis=1)
     
         # Rectify + RMS envelope
         full_wave_rectified = np.abs(signal_bp)
-        movingrms = self.moving_rms_matlab(full_wave_rectified, self.winsize)
+        movingrms = self.moving_rms_matlab(full_wave_rectified, self.winsize, axis=1)
     
-        MVC = np.nanmax(movingrms) if movingrms.size else np.nan
+        MVC = np.nanmax(movingrms, axis=1)
         return MVC, movingrms
-    
\ No newline at end of file
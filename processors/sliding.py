@@ -0,0 +1,114 @@
+# /processors/sliding.py
+
+import numpy as np
+
+from processors.precision import as_float
+
+
+# Windowed sums below are differences of a float64 prefix sum, so each
+# output costs O(1) whatever the window length. Cancellation error grows
+# with the running total (~n * eps * sum|x|); for sEMG energies this stays
+# orders of magnitude below the burst thresholds, and tiny negative
+# residues are clipped before any square root. float32 inputs (FLOAT32
+# mode) keep the float64 prefix sum and are cast back to float32 on output.
+# NaN/inf samples are kept out of the prefix sum (one would poison every
+# later output) and only affect the windows containing them, as with
+# np.convolve.
+
+
+def prefix_sum(x, axis=-1):
+    """Cumulative sum along ``axis`` with a leading zero (float64)."""
+    x = np.moveaxis(np.asarray(x), axis, -1)
+    P = np.zeros(x.shape[:-1] + (x.shape[-1] + 1,), dtype=np.float64)
+    np.cumsum(x, axis=-1, dtype=np.float64, out=P[..., 1:])
+    return np.moveaxis(P, -1, axis)
+
+
+def _span_sums(P, lo, hi):
+    """sum(x[lo:hi]) per output sample from the prefix sum ``P``."""
+    return P[..., hi] - P[..., lo]
+
+
+def _window_sums(x, lo, hi):
+    """``sum(x[..., lo:hi])`` per output sample; non-finite samples only reach their own windows."""
+    finite = np.isfinite(x)
+    if finite.all():
+        return _span_sums(prefix_sum(x), lo, hi)
+    out = _span_sums(prefix_sum(np.where(finite, x, 0.0)), lo, hi)
+    nan, pos, neg = (_span_sums(prefix_sum(m), lo, hi) > 0
+                     for m in (np.isnan(x), x == np.inf, x == -np.inf))
+    out[pos] = np.inf
+    out[neg] = -np.inf
+    out[nan | (pos & neg)] = np.nan
+    return out
+
+
+def clipped_window_sum(x, behind, ahead, axis=-1):
+    """
+    ``sum(x[max(0, i - behind):min(n, i + ahead + 1)])`` for every sample
+    ``i``; output has the input's length.
+    """
+    x = np.moveaxis(as_float(x), axis, -1)
+    n = x.shape[-1]
+    if n == 0:
+        return np.moveaxis(x.copy(), -1, axis)
+
+    i = np.arange(n)
+    lo = np.maximum(0, i - int(behind))
+    hi = np.minimum(n, i + int(ahead) + 1)
+    return np.moveaxis(_window_sums(x, lo, hi).astype(x.dtype, copy=False), -1, axis)
+
+
+def moving_sum(x, win_samples, axis=-1):
+    """
+    Centred moving sum with ``np.convolve(x, np.ones(w), mode="same")``
+    semantics: windows are clipped at the edges and, as with ``convolve``,
+    the output length is ``max(n, w)``.
+    """
+    w = int(win_samples)
+    if w < 1:
+        raise ValueError("win_samples must be >= 1")
+    x = np.moveaxis(as_float(x), axis, -1)
+    n = x.shape[-1]
+    if n >= w:
+        return np.moveaxis(clipped_window_sum(x, w // 2, (w - 1) // 2), -1, axis)
+    if n == 0:
+        return np.moveaxis(x.copy(), -1, axis)
+
+    # Window longer than the signal: convolve swaps its operands.
+    k = np.arange(w) + (n - 1) // 2
+    lo = np.maximum(0, k - w + 1)
+    hi = np.minimum(k, n - 1) + 1
+    return np.moveaxis(_window_sums(x, lo, hi).astype(x.dtype, copy=False), -1, axis)
+
+
+def moving_mean(x, win_samples, axis=-1):
+    """Centred moving average, same as ``np.convolve(x, ones(w)/w, "same")``."""
+    return moving_sum(x, win_samples, axis=axis) / int(win_samples)
+
+
+def moving_rms(x, win_samples, axis=-1):
+    """Centred moving RMS over ``win_samples`` (convolution edge semantics)."""
+    x = as_float(x)
+    ms = moving_mean(x * x, win_samples, axis=axis)
+    return np.sqrt(np.maximum(ms, 0.0))
+
+
+def moving_rms_matlab(x, halfwindow, axis=-1):
+    """
+    RMS over ``x[max(0, i - h):min(n, i + h)]`` for every sample ``i``,
+    i.e. the MATLAB ``movingrms`` window used by ``mvc_matlab``: ``2h``
+    samples, one more behind than ahead, shrinking at the edges.
+    """
+    h = int(halfwindow)
+    x = np.moveaxis(as_float(x), axis, -1)
+    n = x.shape[-1]
+    if n == 0:
+        return np.moveaxis(np.zeros(x.shape, dtype=x.dtype), -1, axis)
+
+    i = np.arange(n)
+    lo = np.maximum(0, i - h)
+    hi = np.minimum(n, i + h)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ms = _window_sums(x * x, lo, hi) / (hi - lo)
+    return np.moveaxis(np.sqrt(np.maximum(ms, 0.0)).astype(x.dtype, copy=False), -1, axis)
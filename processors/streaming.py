@@ -0,0 +1,202 @@
+# /processors/streaming.py
+
+import numpy as np
+from scipy.signal import sosfilt
+
+from processors import filterbank, hampel, sliding
+
+
+# Relative size of the start-up transient left in a finalised sample when
+# the backward pass is started ``lookahead`` samples later than it should.
+LOOKAHEAD_TOL = 1e-12
+
+DEFAULT_BLOCK = 1 << 16
+
+
+def settle_samples(sos, tol=LOOKAHEAD_TOL):
+    """Samples for the slowest pole of ``sos`` to decay below ``tol``."""
+    radius = max(np.abs(np.roots(sec[3:])).max() for sec in sos)
+    if radius <= 0:
+        return 1
+    if radius >= 1:
+        raise ValueError("filter is not stable")
+    return int(np.ceil(np.log(tol) / np.log(radius)))
+
+
+class ZeroPhaseStream:
+    """
+    Block-wise equivalent of ``filterbank.sosfiltfilt`` for a signal that
+    arrives in pieces.
+
+    The forward pass is exact: its ``zi`` state is carried from block to
+    block, starting from the same odd extension ``sosfiltfilt`` uses. The
+    backward pass of a sample needs the whole future, so a sample is only
+    released once ``lookahead`` newer forward outputs exist; the backward
+    pass is then started from the ``sosfilt_zi`` steady state of the newest
+    sample, whose error has decayed below ``LOOKAHEAD_TOL`` by the time it
+    reaches a released sample. ``finish`` applies the true end extension.
+    """
+
+    def __init__(self, sos, zi, lookahead=None):
+        self.sos = sos
+        self.zi = zi
+        self.edge = filterbank.padlen(sos)
+        self.lookahead = settle_samples(sos) if lookahead is None else int(lookahead)
+        self._head = []
+        self._zf = None
+        self._fwd = np.zeros(0)
+        self._tail = np.zeros(0)
+
+    def push(self, x):
+        """Feed raw samples; return the samples that are now final."""
+        x = np.asarray(x, float)
+        if self._zf is None:
+            self._head.append(x)
+            head = np.concatenate(self._head)
+            if head.size <= self.edge:
+                return np.zeros(0)
+            self._head = []
+            left = 2 * head[0] - head[self.edge:0:-1]
+            ext = np.concatenate([left, head])
+            y, self._zf = sosfilt(self.sos, ext, zi=self.zi * ext[0])
+            self._fwd = y[self.edge:]
+            self._tail = head[-(self.edge + 1):]
+            return self._release(final=False)
+
+        if x.size == 0:
+            return np.zeros(0)
+        y, self._zf = sosfilt(self.sos, x, zi=self._zf)
+        self._fwd = np.concatenate([self._fwd, y])
+        self._tail = np.concatenate([self._tail, x])[-(self.edge + 1):]
+        return self._release(final=False)
+
+    def finish(self):
+        """Flush every remaining sample using the true end extension."""
+        if self._zf is None:
+            head = np.concatenate(self._head) if self._head else np.zeros(0)
+            # Too short to stream at all: same result (or error) as one shot.
+            return filterbank.sosfiltfilt(self.sos, self.zi, head) if head.size else head
+        t = self._tail
+        right = 2 * t[-1] - t[-2:-self.edge - 2:-1]
+        y, self._zf = sosfilt(self.sos, right, zi=self._zf)
+        self._fwd = np.concatenate([self._fwd, y])
+        out = self._release(final=True)
+        return out[:out.size - self.edge]
+
+    def _release(self, final):
+        keep = 0 if final else self.lookahead
+        k = self._fwd.size - keep
+        if k <= 0:
+            return np.zeros(0)
+        rev = self._fwd[::-1]
+        back, _ = sosfilt(self.sos, rev, zi=self.zi * rev[0])
+        out = back[::-1][:k]
+        self._fwd = self._fwd[k:]
+        return out
+
+
+class WindowStage:
+    """
+    Runs a centred window operator ``func`` on a stream.
+
+    ``func`` maps a 1-D array to an array of the same length where output
+    ``i`` depends on inputs ``i - behind .. i + ahead`` only, clipped at the
+    array ends. Each call evaluates it on the new samples plus the margins
+    they need, so the concatenated output equals ``func`` on the whole
+    signal while only ``behind + ahead`` samples are carried over.
+    """
+
+    def __init__(self, func, behind, ahead):
+        self.func = func
+        self.behind = int(behind)
+        self.ahead = int(ahead)
+        self._buf = np.zeros(0)
+        self._start = 0     # global index of _buf[0]
+        self._done = 0      # outputs emitted so far
+        self._total = 0     # inputs received so far
+
+    def push(self, x, final=False):
+        x = np.asarray(x, float)
+        self._buf = np.concatenate([self._buf, x])
+        self._total += x.size
+        end = self._total if final else self._total - self.ahead
+        if end <= self._done:
+            return np.zeros(0)
+
+        lo = max(0, self._done - self.behind)
+        hi = self._total if final else min(self._total, end + self.ahead)
+        out = self.func(self._buf[lo - self._start:hi - self._start])
+        out = out[self._done - lo:end - lo]
+        self._done = end
+
+        keep_from = max(0, end - self.behind)
+        self._buf = self._buf[keep_from - self._start:]
+        self._start = keep_from
+        return out
+
+
+def iter_blocks(source, block_size=DEFAULT_BLOCK):
+    """Yield 1-D blocks from an array (incl. ``np.memmap``) or an iterable."""
+    if isinstance(source, np.ndarray):
+        flat = source.reshape(-1)
+        for s in range(0, flat.size, int(block_size)):
+            yield np.asarray(flat[s:s + int(block_size)], float)
+    else:
+        for blk in source:
+            yield np.asarray(blk, float).ravel()
+
+
+def clean_semg_blocks(source, fs, rms_ms=50, hampel_ms=50, lo=50, hi=500, order=4,
+                      block_size=DEFAULT_BLOCK, whole=None):
+    """
+    Generator form of ``Processor.clean_semg``: band-pass, rectify, moving
+    RMS and Hampel, yielding envelope blocks.
+
+    Peak memory is a few blocks plus the filter look-ahead and the RMS /
+    Hampel margins, independent of the recording length. The concatenated
+    output matches the one-shot pipeline to within ``LOOKAHEAD_TOL`` of the
+    signal scale. ``whole`` handles streams too short to split (for
+    ``Processor`` this is ``clean_semg`` itself).
+    """
+    sos, zi = filterbank.bandpass_sos(fs, lo, hi, order)
+    rms_w = max(1, int(fs * rms_ms / 1000))
+    ham_w = max(3, int(fs * hampel_ms / 1000)) | 1
+    ham_half = ham_w // 2
+
+    bp = ZeroPhaseStream(sos, zi)
+    rms = WindowStage(
+        lambda v: np.sqrt(np.maximum(
+            sliding.clipped_window_sum(v * v, rms_w // 2, (rms_w - 1) // 2) / rms_w, 0.0)),
+        rms_w // 2, (rms_w - 1) // 2,
+    )
+    ham = WindowStage(lambda v: hampel.hampel_filter(v, ham_w, k=3.0), ham_half, ham_half)
+
+    # Below this length the one-shot pipeline has special cases of its own.
+    warmup = max(bp.edge + 1, rms_w, ham_w)
+    pending, seen = [], 0
+
+    def stages(y, final=False):
+        return ham.push(rms.push(np.abs(y), final=final), final=final)
+
+    for blk in iter_blocks(source, block_size):
+        blk = blk[~np.isnan(blk)]
+        if seen < warmup:
+            pending.append(blk); seen += blk.size
+            if seen < warmup:
+                continue
+            blk = np.concatenate(pending); pending = []
+        out = stages(bp.push(blk))
+        if out.size:
+            yield out
+
+    if pending:
+        x = np.concatenate(pending)
+        if x.size and whole is None:
+            raise ValueError(f"stream of {x.size} samples is too short to split (< {warmup})")
+        if x.size:
+            yield whole(x)
+        return
+
+    out = stages(bp.finish(), final=True)
+    if out.size:
+        yield out
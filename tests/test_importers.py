@@ -0,0 +1,539 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the MAT importers (pooled, ordered decoding).
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+
+import numpy as np
+import pytest
+import scipy.io
+
+from importers import cache as mat_cache, mat5, mat73
+from importers.cache import DecodedCache
+from importers.channel_filter import ChannelFilter, ProtocolFilters
+from importers.channel_store import ChannelStore
+from importers.mat import (
+    CancellableFile, ImportCancelled, iter_mats, load_cached, load_mat, select_channels,
+)
+from importers.prescan import describe, is_quick, scan_mat
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def write_qtm_mat(path, nch=3, npts=500, seed=0):
+    """Minimal QTM-style export: <name>.Analog.{Data, Labels}."""
+    data = np.random.default_rng(seed).standard_normal((nch, npts))
+    labels = np.array([f"EMG {i+1}" for i in range(nch)], dtype=object)
+    scipy.io.savemat(str(path), {"trial": {"Analog": {"Data": data, "Labels": labels}}},
+                     do_compression=True)
+    return data
+
+
+@pytest.fixture(autouse=True)
+def private_cache(tmp_path, monkeypatch):
+    """Keep the dialog's default cache out of the user data directory."""
+    cache = DecodedCache(tmp_path / "cache", max_bytes=1 << 30)
+    monkeypatch.setattr(mat_cache, "_default", cache)
+    return cache
+
+
+@pytest.fixture
+def mat_files(tmp_path):
+    paths, datas = [], []
+    for i in range(5):
+        p = tmp_path / f"trial_{i}.mat"
+        datas.append(write_qtm_mat(p, nch=2 + i, seed=i))
+        paths.append(str(p))
+    return paths, datas
+
+
+# ---------------------------------------------------------------------------
+# Single file
+# ---------------------------------------------------------------------------
+def test_load_mat_reads_analog(mat_files):
+    paths, datas = mat_files
+    res = load_mat(paths[2])
+    assert res["path"] == paths[2]
+    np.testing.assert_array_equal(res["data"], datas[2])
+    assert list(res["labels"]) == ["EMG 1", "EMG 2", "EMG 3", "EMG 4"]
+
+
+def test_cancelled_file_stops_reading(mat_files):
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(ImportCancelled):
+        load_mat(mat_files[0][0], cancel)
+    with CancellableFile(mat_files[0][0]) as f:
+        assert f.read(4)
+
+
+# ---------------------------------------------------------------------------
+# Pooled import
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize("workers", [1, 3])
+def test_iter_mats_is_ordered(mat_files, tmp_path, workers):
+    paths, datas = mat_files
+    bad = tmp_path / "broken.mat"
+    bad.write_bytes(b"not a mat file")
+    order = paths[:2] + [str(bad)] + paths[2:]
+
+    out = list(iter_mats(order, mode="thread", workers=workers))
+    assert [i for i, *_ in out] == list(range(len(order)))
+    assert [p for _, p, _, _ in out] == order
+    assert out[2][2] is None and "broken.mat" in out[2][3]
+    got = [res for _, _, res, _ in out if res is not None]
+    for res, data in zip(got, datas):
+        np.testing.assert_array_equal(res["data"], data)
+
+
+def test_iter_mats_honours_cancel(mat_files):
+    paths, _ = mat_files
+    cancel = threading.Event()
+    seen = []
+    for i, *_ in iter_mats(paths, cancel=cancel, mode="thread", workers=2):
+        seen.append(i)
+        cancel.set()
+    assert seen == [0]
+
+
+def test_import_worker_emits_each_file(qtbot, mat_files):
+    from dialogs.load_mat_dialog import ImportWorker
+
+    paths, _ = mat_files
+    worker = ImportWorker(paths)
+    files, done = [], []
+    worker.fileImported.connect(files.append)
+    worker.finished.connect(done.append)
+    worker.run()
+    assert [r["path"] for r in files] == paths
+    assert [r["path"] for r in done[0]] == paths
+
+
+# ---------------------------------------------------------------------------
+# Selective MAT v5 reader
+# ---------------------------------------------------------------------------
+def write_full_qtm_mat(path, compress, npts=2000):
+    """QTM-style export with a large Trajectories field before Analog."""
+    rng = np.random.default_rng(7)
+    data = rng.standard_normal((4, npts))
+    trial = {
+        "File": "trial.qtm",
+        "Trajectories": {"Labeled": {"Data": rng.standard_normal((20, 4, npts))}},
+        "Analog": {"Data": data, "Labels": np.array(["A", "B", "C", "D"], dtype=object),
+                   "Frequency": 1500, "NrOfSamples": npts},
+        "Force": {"Force": rng.standard_normal((3, npts))},
+    }
+    scipy.io.savemat(str(path), {"trial": trial}, do_compression=compress)
+    return data
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_selective_reader_matches_scipy(tmp_path, compress):
+    p = tmp_path / "full.mat"
+    data = write_full_qtm_mat(p, compress)
+    with open(p, "rb") as f:
+        name, analog = mat5.read_analog(f)
+    assert name == "trial"
+    assert set(analog) == {"Data", "Labels", "Frequency"}
+
+    ref = scipy.io.loadmat(str(p), struct_as_record=False, squeeze_me=True)["trial"].Analog
+    np.testing.assert_array_equal(analog["Data"], ref.Data)
+    np.testing.assert_array_equal(analog["Data"], data)
+    assert list(np.ravel(analog["Labels"])) == list(ref.Labels)
+
+    res = load_mat(str(p))
+    assert res["frequency"] == 1500.0
+    assert list(res["labels"]) == ["A", "B", "C", "D"]
+
+
+def test_selective_reader_stops_after_analog(tmp_path):
+    """Nothing after the last wanted field is read from an uncompressed file."""
+    p = tmp_path / "full.mat"
+    write_full_qtm_mat(p, compress=False)
+    with open(p, "rb") as f:
+        mat5.read_analog(f, fields=("Data",))
+        pos = f.tell()
+    assert pos < os.path.getsize(p)
+
+
+def test_selective_reader_requires_analog(tmp_path):
+    p = tmp_path / "no_analog.mat"
+    scipy.io.savemat(str(p), {"trial": {"Force": np.zeros((3, 10))}})
+    with open(p, "rb") as f, pytest.raises(mat5.Mat5FormatError):
+        mat5.read_analog(f)
+
+
+def test_load_mat_falls_back_to_scipy_for_v4(tmp_path):
+    p = tmp_path / "v4.mat"
+    scipy.io.savemat(str(p), {"x": np.arange(6.0).reshape(2, 3)}, format="4")
+    with open(p, "rb") as f, pytest.raises(mat5.Mat5FormatError):
+        mat5.read_analog(f)
+    # scipy decodes it; a v4 file has no Analog struct, so the fallback fails loudly
+    with pytest.raises(AttributeError):
+        load_mat(str(p))
+
+
+# ---------------------------------------------------------------------------
+# MAT v7.3 (HDF5)
+# ---------------------------------------------------------------------------
+def write_mat73(path, data, labels, frequency=1500.0, chunk_channels=2):
+    """v7.3-style export: HDF5 behind a 512-byte header, data column-major."""
+    h5py = pytest.importorskip("h5py")
+    with h5py.File(path, "w", userblock_size=512) as f:
+        analog = f.create_group("trial").create_group("Analog")
+        analog.create_dataset("Data", data=data.T, compression="gzip",
+                              chunks=(min(256, data.shape[1]), chunk_channels))
+        analog.create_dataset("Frequency", data=np.array([[frequency]]))
+        refs = f.create_group("#refs#")
+        ref_list = []
+        for i, label in enumerate(labels):
+            ds = refs.create_dataset(f"l{i}", data=np.array([[ord(c)] for c in label], dtype="u2"))
+            ref_list.append(ds.ref)
+        analog.create_dataset("Labels", data=np.array([ref_list]).T, dtype=h5py.ref_dtype)
+    with open(path, "r+b") as f:
+        header = b"MATLAB 7.3 MAT-file".ljust(116) + b"\0" * 8 + b"\x00\x02IM"
+        f.write(header)
+
+
+def test_is_mat73_detects_hdf5_user_block(tmp_path, mat_files):
+    p = tmp_path / "v73.mat"
+    p.write_bytes(b"MATLAB 7.3 MAT-file".ljust(512) + b"\x89HDF\r\n\x1a\n" + b"\0" * 64)
+    with open(p, "rb") as f:
+        assert mat73.is_mat73(f)
+        assert f.tell() == 0
+    with open(mat_files[0][0], "rb") as f:
+        assert not mat73.is_mat73(f)
+
+
+def test_mat73_without_h5py_reports_error(tmp_path, monkeypatch):
+    p = tmp_path / "v73.mat"
+    p.write_bytes(b"MATLAB 7.3 MAT-file".ljust(512) + b"\x89HDF\r\n\x1a\n" + b"\0" * 64)
+    monkeypatch.setattr(mat73, "h5py", None)
+    [(_, _, res, err)] = list(iter_mats([str(p)], mode="thread", workers=1))
+    assert res is None and "h5py" in err
+
+
+def test_mat73_reads_channels_lazily(tmp_path):
+    p = tmp_path / "v73.mat"
+    data = np.random.default_rng(3).standard_normal((5, 1000))
+    write_mat73(str(p), data, ["EMG 1", "EMG 2", "EMG 3", "EMG 4", "EMG 5"])
+
+    res = load_mat(str(p))
+    lazy = res["data"]
+    assert lazy.shape == (5, 1000)
+    assert list(res["labels"]) == ["EMG 1", "EMG 2", "EMG 3", "EMG 4", "EMG 5"]
+    assert res["frequency"] == 1500.0
+
+    np.testing.assert_array_equal(lazy[3, :], data[3])
+    assert set(lazy._cache) == {2, 3}           # the chunk band holding channel 3
+    np.testing.assert_array_equal(lazy[1, 100:200], data[1, 100:200])
+    np.testing.assert_array_equal(lazy[[0, 4], :], data[[0, 4]])
+    np.testing.assert_array_equal(np.asarray(lazy), data)
+    lazy.close()
+
+
+# ---------------------------------------------------------------------------
+# Decoded-data cache
+# ---------------------------------------------------------------------------
+def test_cache_hit_is_memory_mapped(mat_files, private_cache, monkeypatch):
+    paths, datas = mat_files
+    first = load_cached(paths[1], cache=private_cache)
+    np.testing.assert_array_equal(first["data"], datas[1])
+    assert len(private_cache.entries()) == 1
+
+    def no_decode(*a, **k):
+        raise AssertionError("cache hit should not decode")
+    monkeypatch.setattr("importers.mat.load_mat", no_decode)
+    hit = load_cached(paths[1], cache=private_cache)
+    assert isinstance(hit["data"], np.memmap)
+    assert hit["data"].flags.c_contiguous
+    np.testing.assert_array_equal(hit["data"], datas[1])
+    assert list(hit["labels"]) == ["EMG 1", "EMG 2", "EMG 3"]
+
+
+def test_cache_is_keyed_by_content(mat_files, private_cache, tmp_path):
+    paths, _ = mat_files
+    copy = tmp_path / "copy.mat"
+    copy.write_bytes(open(paths[0], "rb").read())
+    assert private_cache.key_for(paths[0]) == private_cache.key_for(str(copy))
+    assert private_cache.key_for(paths[0]) != private_cache.key_for(paths[1])
+
+    # A rewritten file is re-hashed (size / mtime changed) and misses
+    data = write_qtm_mat(copy, nch=6, seed=42)
+    res = load_cached(str(copy), cache=private_cache)
+    np.testing.assert_array_equal(res["data"], data)
+
+
+def test_cache_evicts_least_recently_used(mat_files, tmp_path):
+    paths, _ = mat_files
+    cache = DecodedCache(tmp_path / "lru", max_bytes=1 << 30)
+    keys = []
+    for i, p in enumerate(paths[:3]):
+        load_cached(p, cache=cache)
+        keys.append(cache.key_for(p))
+        os.utime(cache._entry(keys[-1])[1], (1000 + i, 1000 + i))
+    load_cached(paths[0], cache=cache)       # touch: now the most recent
+
+    sizes = {k: n for k, n, _, _ in cache.entries()}
+    cache.evict(sizes[keys[0]] + sizes[keys[2]])
+    assert {k for k, *_ in cache.entries()} == {keys[0], keys[2]}
+
+    cache.clear()
+    assert cache.entries() == [] and cache.size() == 0
+
+
+def test_cache_keeps_entries_it_cannot_delete(mat_files, tmp_path, monkeypatch, capsys):
+    paths, _ = mat_files
+    cache = DecodedCache(tmp_path / "busy", max_bytes=1 << 30)
+    keys = []
+    for i, p in enumerate(paths[:3]):
+        load_cached(p, cache=cache)
+        keys.append(cache.key_for(p))
+        os.utime(cache._entry(keys[-1])[1], (1000 + i, 1000 + i))
+    sizes = {k: n for k, n, _, _ in cache.entries()}
+
+    # The oldest entry is still mapped by a tab (deleting it fails on Windows)
+    busy = cache._entry(keys[0])[0]
+    remove = os.remove
+    def remove_unless_mapped(path):
+        if path == busy:
+            raise PermissionError(13, "file in use", path)
+        remove(path)
+    monkeypatch.setattr(os, "remove", remove_unless_mapped)
+
+    # Skipping it, eviction goes on to the next oldest
+    cache.evict(sizes[keys[0]] + sizes[keys[2]])
+    assert {k for k, *_ in cache.entries()} == {keys[0], keys[2]}
+    assert cache.size() == sizes[keys[0]] + sizes[keys[2]]
+    assert "in use" in capsys.readouterr().out
+
+    assert cache.clear() == 1
+    assert [k for k, *_ in cache.entries()] == [keys[0]]
+    assert cache.size() == sizes[keys[0]]
+
+
+def test_import_worker_uses_default_cache(qtbot, mat_files, private_cache):
+    from dialogs.load_mat_dialog import ImportWorker
+
+    paths, _ = mat_files
+    ImportWorker(paths).run()
+    assert len(private_cache.entries()) == len(paths)
+
+
+# ---------------------------------------------------------------------------
+# Channel store
+# ---------------------------------------------------------------------------
+def test_channel_store_normalizes_layout_once():
+    data = np.asfortranarray(np.arange(12, dtype=np.int16).reshape(3, 4))
+    store = ChannelStore(data, dtype="float32")
+    assert store.shape == (3, 4) and store.dtype == np.float32
+    row = store.channel(1)
+    assert row.flags.c_contiguous and np.shares_memory(row, store[1, :])
+    np.testing.assert_array_equal(store[1:, 2], data[1:, 2])
+    assert ChannelStore.wrap(store, "float32") is store
+    assert store.memory_usage() == 12 * 4 and not store.is_mapped
+
+
+def test_channel_store_keeps_cache_memmap(mat_files, private_cache):
+    paths, datas = mat_files
+    load_cached(paths[0], cache=private_cache)
+    hit = load_cached(paths[0], cache=private_cache)
+    store = ChannelStore(hit["data"])
+    assert store.is_mapped and store.memory_usage() == 0
+    assert np.shares_memory(store[0, :], hit["data"])
+    np.testing.assert_array_equal(store.channel(1), datas[0][1])
+
+
+def test_channel_store_reads_lazy_sources_per_channel(tmp_path):
+    p = tmp_path / "v73.mat"
+    data = np.random.default_rng(5).standard_normal((4, 600))
+    write_mat73(str(p), data, ["A", "B", "C", "D"], chunk_channels=1)
+    store = ChannelStore(load_mat(str(p))["data"])
+    assert store.is_mapped and store.memory_usage() == 0
+    np.testing.assert_array_equal(store[2, :], data[2])
+    assert store.memory_usage() == data[2].nbytes
+    np.testing.assert_array_equal(store[[0, 3], 10:20], data[[0, 3], 10:20])
+
+
+# ---------------------------------------------------------------------------
+# Channel-subset import
+# ---------------------------------------------------------------------------
+def test_channel_filter_labels_and_regex():
+    labels = ["TA_L", "GM_L", "VL_R", "emg 4"]
+    assert ChannelFilter("").rows(labels, 4) == [0, 1, 2, 3]
+    assert ChannelFilter("EMG 4, ta_l").rows(labels, 4) == [0, 3]
+    assert ChannelFilter("/_L$/").rows(labels, 4) == [0, 1]
+    with pytest.raises(ValueError):
+        ChannelFilter("/(unclosed/")
+
+
+def test_iter_mats_keeps_only_filtered_channels(mat_files, private_cache):
+    paths, datas = mat_files
+    out = list(iter_mats(paths[2:4], mode="thread", workers=2, cache=private_cache,
+                         channel_filter=ChannelFilter("/EMG [24]/")))
+    for (_, _, res, err), data in zip(out, datas[2:4]):
+        assert err is None
+        assert list(res["labels"]) == ["EMG 2", "EMG 4"] and res["channels"] == [1, 3]
+        assert res["data"].shape == (2, data.shape[1])
+        np.testing.assert_array_equal(np.asarray(res["data"]), data[[1, 3]])
+        assert res["data"].memory_usage() == data[[1, 3]].nbytes
+
+    [(_, _, res, err)] = list(iter_mats(paths[:1], mode="thread", workers=1,
+                                        channel_filter=ChannelFilter("nothing")))
+    assert res is None and "no channel matches" in err
+
+
+def test_filtered_lazy_import_reads_only_selected(tmp_path):
+    p = tmp_path / "v73.mat"
+    data = np.random.default_rng(9).standard_normal((6, 400))
+    write_mat73(str(p), data, [f"M{i}" for i in range(6)], chunk_channels=1)
+    res = select_channels(load_mat(str(p)), ChannelFilter("M5, M2"))
+    store = res["data"]
+    assert store.shape == (2, 400) and list(res["labels"]) == ["M2", "M5"]
+    np.testing.assert_array_equal(store[1, :], data[5])
+    assert store.memory_usage() == data[5].nbytes      # M2 not read yet
+
+
+def test_protocol_filters_are_remembered(tmp_path):
+    store = ProtocolFilters(tmp_path)
+    store.remember("Gait", "/^(TA|GM)/")
+    store.remember("Squat", "VL_L, VL_R")
+    again = ProtocolFilters(tmp_path)
+    assert again.last == "Squat"
+    assert again.spec("Gait") == "/^(TA|GM)/" and again.spec("Unknown") == ""
+
+
+# ---------------------------------------------------------------------------
+# Header pre-scan and largest-first scheduling
+# ---------------------------------------------------------------------------
+def _no_data_decode(typed, big):
+    """mat5._typed that fails on any array as large as the Data matrix."""
+    def guarded(mtype, data, order):
+        out = typed(mtype, data, order)
+        assert out.size < big, "pre-scan decoded a data array"
+        return out
+    return guarded
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_prescan_reads_shape_without_data(tmp_path, compress, monkeypatch):
+    p = tmp_path / "full.mat"
+    data = write_full_qtm_mat(p, compress)
+    monkeypatch.setattr(mat5, "_typed", _no_data_decode(mat5._typed, data.size))
+    info = scan_mat(str(p))
+    assert info["error"] is None
+    assert (info["channels"], info["samples"]) == data.shape
+    assert info["frequency"] == 1500.0
+    assert info["duration"] == pytest.approx(data.shape[1] / 1500.0)
+    assert info["size"] == os.path.getsize(p)
+    assert "4 ch" in describe(info)
+
+
+def test_prescan_flags_bad_files(tmp_path):
+    bad = tmp_path / "bad.mat"
+    bad.write_bytes(b"not a mat file")
+    no_analog = tmp_path / "no_analog.mat"
+    scipy.io.savemat(str(no_analog), {"trial": {"Force": np.zeros((3, 10))}})
+    assert scan_mat(str(bad))["error"]
+    assert "Analog" in scan_mat(str(no_analog))["error"]
+    assert scan_mat(str(tmp_path / "missing.mat"))["error"]
+
+
+def test_prescan_keeps_layouts_left_to_scipy(tmp_path, monkeypatch):
+    # A v5 layout the selective reader gives up on still imports through scipy
+    p = tmp_path / "odd.mat"
+    write_full_qtm_mat(p, False)
+    def unsupported(f):
+        raise mat5.Mat5FormatError("unsupported data type 99")
+    monkeypatch.setattr(mat5, "scan_analog", unsupported)
+    info = scan_mat(str(p))
+    assert info["error"] is None and info["channels"] is None
+    assert "read on import" in describe(info)
+
+    # ... but not one whose first variable scipy lists as a plain matrix
+    v4 = tmp_path / "v4.mat"
+    scipy.io.savemat(str(v4), {"x": np.arange(6.0).reshape(2, 3)}, format="4")
+    assert "not a struct" in scan_mat(str(v4))["error"]
+
+
+def test_prescan_mat73(tmp_path):
+    p = tmp_path / "v73.mat"
+    write_mat73(str(p), np.zeros((3, 700)), ["A", "B", "C"], frequency=2000.0)
+    info = scan_mat(str(p))
+    assert (info["channels"], info["samples"], info["frequency"]) == (3, 700, 2000.0)
+
+
+def test_prescan_is_quick_unless_compressed(tmp_path):
+    for compress in (True, False):
+        write_full_qtm_mat(tmp_path / f"{compress}.mat", compress)
+    v73 = tmp_path / "v73.mat"
+    write_mat73(str(v73), np.zeros((3, 700)), ["A", "B", "C"])
+    bad = tmp_path / "bad.mat"
+    bad.write_bytes(b"not a mat file")
+    assert not is_quick(str(tmp_path / "True.mat"))
+    assert is_quick(str(tmp_path / "False.mat")) and is_quick(str(v73))
+    assert is_quick(str(bad)) and is_quick(str(tmp_path / "missing.mat"))
+
+
+def test_iter_mats_priority_keeps_output_order(mat_files, monkeypatch):
+    from importers import mat
+
+    paths, datas = mat_files
+    started = []
+    decode = mat._decode
+    monkeypatch.setattr(mat, "_decode", lambda job: (started.append(job[0]), decode(job))[1])
+    out = list(iter_mats(paths, mode="thread", workers=1, priority=[1, 5, 2, 4, 3]))
+    assert started == [paths[1], paths[3], paths[4], paths[2], paths[0]]
+    assert [p for _, p, _, _ in out] == paths
+    for (_, _, res, _), data in zip(out, datas):
+        np.testing.assert_array_equal(np.asarray(res["data"]), data)
+
+
+def test_dialog_prescan_excludes_bad_files(qtbot, tmp_path, mat_files, monkeypatch):
+    from dialogs import load_mat_dialog
+
+    monkeypatch.setattr(load_mat_dialog, "ProtocolFilters", lambda: ProtocolFilters(tmp_path))
+    dlg = load_mat_dialog.LoadMat()
+    qtbot.addWidget(dlg)
+    bad = tmp_path / "broken.mat"
+    bad.write_bytes(b"not a mat file")
+    dlg.paths = [mat_files[0][0], str(bad)]
+    dlg._add_items(dlg.paths, 12)
+    qtbot.waitUntil(lambda: len(dlg._scans) == 2, timeout=5000)
+
+    good, broken = (dlg.listFiles.item(i) for i in range(2))
+    assert "2 ch" in good.text() and not good.font().strikeOut()
+    assert "excluded" in broken.text() and broken.font().strikeOut()
+    dlg.done(0)
+    assert dlg._scanners == []
+
+
+def test_dialog_scans_only_compressed_files_in_background(qtbot, tmp_path, monkeypatch):
+    from dialogs import load_mat_dialog
+
+    monkeypatch.setattr(load_mat_dialog, "ProtocolFilters", lambda: ProtocolFilters(tmp_path))
+    dlg = load_mat_dialog.LoadMat()
+    qtbot.addWidget(dlg)
+    plain, packed = str(tmp_path / "plain.mat"), str(tmp_path / "packed.mat")
+    write_full_qtm_mat(plain, False)
+    write_full_qtm_mat(packed, True)
+    release = threading.Event()
+    scan = load_mat_dialog.scan_mat
+    monkeypatch.setattr(load_mat_dialog, "scan_mat",
+                        lambda p: (p == packed and release.wait(5), scan(p))[1])
+    dlg.paths = [plain, packed]
+    dlg._add_items(dlg.paths, 12)
+
+    # The uncompressed file is done synchronously, the compressed one shows progress
+    assert list(dlg._scans) == [plain] and len(dlg._scanners) == 1
+    assert "4 ch" in dlg.listFiles.item(0).text()
+    assert "scanning" in dlg.listFiles.item(1).text()
+    release.set()
+    qtbot.waitUntil(lambda: packed in dlg._scans, timeout=5000)
+    assert "4 ch" in dlg.listFiles.item(1).text()
+    dlg.done(0)
@@ -22,7 +22,10 @@ import numpy as np
 import pytest
 # from utilities.plot_controller import PlotController
 from plot_controller import PlotController
+from plotting.backends import BACKENDS, controller_class
+from processors.processors import Processor
 
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QWidget
 
 
@@ -31,28 +34,111 @@ from PyQt5.QtWidgets import QWidget
 # ---------------------------------------------------------------------------
 # Helper: create a minimal PlotController with dummy EMG data
 # ---------------------------------------------------------------------------
-def make_plot_controller(qtbot, nrows=3, npts=1000):
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    """The tests taking this fixture run against each plotting backend."""
+    return request.param
+
+
+def make_plot_controller(qtbot, nrows=3, npts=1000, backend="matplotlib"):
     container = QWidget()
     qtbot.addWidget(container)
-    plot_ctrl = PlotController(container=container)
+    plot_ctrl = controller_class(backend)(container=container)
+    plot_ctrl.container = container         # keep the canvas' parent alive
     data = np.random.randn(nrows, npts)
     labels = [f"EMG {i+1}" for i in range(nrows)]
     plot_ctrl.plot_mat_arrays(data, labels)
     return plot_ctrl
 
 
+# ---------------------------------------------------------------------------
+# Helpers: what a backend drew (matplotlib Axes or pyqtgraph PlotItem)
+# ---------------------------------------------------------------------------
+def is_pg(ax):
+    return hasattr(ax, "vb")
+
+
+def border_width(ax):
+    if is_pg(ax):
+        return ax.vb.border.widthF()
+    return next(iter(ax.spines.values())).get_linewidth()
+
+
+def patch_axes(plot_ctrl, patch):
+    """Axes (of plot_ctrl) a span patch is drawn in, None once removed."""
+    if hasattr(patch, "getViewBox"):
+        vb = patch.getViewBox() if patch.scene() is not None else None
+        return next((ax for ax in plot_ctrl.axes if ax.vb is vb), None)
+    return patch.axes
+
+
+def text_of(item):
+    return item.textItem.toPlainText() if hasattr(item, "textItem") else item.get_text()
+
+
+def ylim(ax):
+    if is_pg(ax):
+        ax.vb.prepareForPaint()         # apply the pending auto-range, as a repaint would
+        return tuple(ax.vb.viewRange()[1])
+    return ax.get_ylim()
+
+
+class PgMouseEvent:
+    """Left-button drag event as pyqtgraph's ViewBox receives it."""
+
+    def __init__(self, down, pos, start=False, finish=False):
+        self._down, self._pos = down, pos
+        self._start, self._finish = start, finish
+
+    def button(self):
+        return Qt.LeftButton
+
+    def modifiers(self):
+        return Qt.NoModifier
+
+    def isStart(self):
+        return self._start
+
+    def isFinish(self):
+        return self._finish
+
+    def buttonDownScenePos(self):
+        return self._down
+
+    def scenePos(self):
+        return self._pos
+
+    def accept(self):
+        pass
+
+
+def drag(plot_ctrl, ax, x0, x1):
+    """Left-drag over ``ax`` from data x ``x0`` to ``x1`` through the backend's mouse handling."""
+    if is_pg(ax):
+        from PyQt5.QtCore import QPointF
+        down, up = (ax.vb.mapViewToScene(QPointF(x, 0.0)) for x in (x0, x1))
+        ax.vb.mouseDragEvent(PgMouseEvent(down, down, start=True))
+        ax.vb.mouseDragEvent(PgMouseEvent(down, up, finish=True))
+        return
+    from matplotlib.backend_bases import MouseButton
+    for name, x in (("button_press_event", x0), ("button_release_event", x1)):
+        event = type("E", (), {"button": MouseButton.LEFT, "inaxes": ax, "xdata": x,
+                               "ydata": 0, "guiEvent": None})()
+        plot_ctrl.canvas.callbacks.process(name, event)
+
+
 # ---------------------------------------------------------------------------
 # TEST 1: Only 3 selections allowed per row
 # ---------------------------------------------------------------------------
-def test_only_three_selections_allowed(qtbot):
-    plot_ctrl = make_plot_controller(qtbot)
+def test_only_three_selections_allowed(qtbot, backend):
+    plot_ctrl = make_plot_controller(qtbot, backend=backend)
     row = 0
 
     # Manually simulate 4 drag events
     for i in range(4):
         lo, hi = 10 * i, 10 * i + 5
         if len(plot_ctrl._selections[row]) < 3:
-            patch = plot_ctrl.axes[row].axvspan(lo, hi, color="orange", alpha=0.3)
+            patch = plot_ctrl._span_patch(row, lo, hi)
             plot_ctrl._selections[row].append((lo, hi))
             plot_ctrl._patches[row].append(patch)
         else:
@@ -66,14 +152,14 @@ def test_only_three_selections_allowed(qtbot):
 # ---------------------------------------------------------------------------
 # TEST 2: Clear-all removes all spans
 # ---------------------------------------------------------------------------
-def test_clear_all_removes_all_spans(qtbot):
-    plot_ctrl = make_plot_controller(qtbot)
+def test_clear_all_removes_all_spans(qtbot, backend):
+    plot_ctrl = make_plot_controller(qtbot, backend=backend)
     row = 0
 
     # Add 3 dummy spans
     for i in range(3):
         lo, hi = 20 * i, 20 * i + 5
-        patch = plot_ctrl.axes[row].axvspan(lo, hi, color="orange", alpha=0.3)
+        patch = plot_ctrl._span_patch(row, lo, hi)
         plot_ctrl._patches[row].append(patch)
         plot_ctrl._selections[row].append((lo, hi))
 
@@ -88,14 +174,14 @@ def test_clear_all_removes_all_spans(qtbot):
 # ---------------------------------------------------------------------------
 # TEST 3: Shift-click deletion reduces span count
 # ---------------------------------------------------------------------------
-def test_shift_click_deletes_span(qtbot):
-    plot_ctrl = make_plot_controller(qtbot)
+def test_shift_click_deletes_span(qtbot, backend):
+    plot_ctrl = make_plot_controller(qtbot, backend=backend)
     row = 0
 
     # Add 3 dummy spans
     for i in range(3):
         lo, hi = 10 * i, 10 * i + 5
-        patch = plot_ctrl.axes[row].axvspan(lo, hi, color="orange", alpha=0.3)
+        patch = plot_ctrl._span_patch(row, lo, hi)
         plot_ctrl._patches[row].append(patch)
         plot_ctrl._selections[row].append((lo, hi))
 
@@ -104,7 +190,7 @@ def test_shift_click_deletes_span(qtbot):
     # Simulate deletion
     target_idx = 1
     patch_to_remove = plot_ctrl._patches[row][target_idx]
-    patch_to_remove.remove()
+    plot_ctrl._blit.remove(patch_to_remove)
     plot_ctrl._patches[row].pop(target_idx)
     plot_ctrl._selections[row].pop(target_idx)
 
@@ -115,8 +201,8 @@ def test_shift_click_deletes_span(qtbot):
 # ---------------------------------------------------------------------------
 # TEST 4: Radio button click bolds the correct row
 # ---------------------------------------------------------------------------
-def test_row_click_bolds_correct_row(qtbot):
-    plot_ctrl = make_plot_controller(qtbot)
+def test_row_click_bolds_correct_row(qtbot, backend):
+    plot_ctrl = make_plot_controller(qtbot, backend=backend)
     row_to_select = 1
 
     plot_ctrl._on_row_clicked(row_to_select)
@@ -124,29 +210,29 @@ def test_row_click_bolds_correct_row(qtbot):
 
     # Verify bolding visually by line width
     for i, ax in enumerate(plot_ctrl.axes):
-        lw = next(iter(ax.spines.values())).get_linewidth()
+        lw = border_width(ax)
         if i == row_to_select:
             assert lw > 1.5, "Selected row should be bold"
         else:
             assert lw < 1.5, "Unselected rows should not be bold"
             
             
-def test_spans_only_on_active_row(qtbot):
+def test_spans_only_on_active_row(qtbot, backend):
     """
     Ensure that orange spans can only be drawn on the active row.
     Clicking or dragging in other rows must do nothing.
     """
-    from matplotlib.backend_bases import MouseButton
-
     # --- Setup ---
     container = QWidget()
     qtbot.addWidget(container)
-    plot_ctrl = PlotController(container=container)
+    plot_ctrl = controller_class(backend)(container=container)
 
     nrows, npts = 3, 1000
     data = np.random.randn(nrows, npts)
     labels = [f"EMG {i+1}" for i in range(nrows)]
     plot_ctrl.plot_mat_arrays(data, labels)
+    container.resize(800, 600)
+    container.show()
 
     # Activate first row (default 0)
     plot_ctrl._active_row = 0
@@ -154,52 +240,536 @@ def test_spans_only_on_active_row(qtbot):
     other_ax = plot_ctrl.axes[1]
 
     # --- Simulate selection in ACTIVE row ---
-    press_event = type("E", (), {
-        "button": MouseButton.LEFT,
-        "inaxes": active_ax,
-        "xdata": 100.0,
-        "ydata": 0,
-        "guiEvent": None,
-    })()
-    release_event = type("E", (), {
-        "button": MouseButton.LEFT,
-        "inaxes": active_ax,
-        "xdata": 300.0,
-        "ydata": 0,
-        "guiEvent": None,
-    })()
-
     plot_ctrl._click_x = None
     plot_ctrl._attach_mouse_handlers()  # ensure handlers exist
-
-    # ✅ emit synthetic events properly
-    plot_ctrl.canvas.callbacks.process("button_press_event", press_event)
-    plot_ctrl.canvas.callbacks.process("button_release_event", release_event)
+    drag(plot_ctrl, active_ax, 100.0, 300.0)
 
     # Verify a span was created in active row
     assert len(plot_ctrl._selections[0]) == 1
     assert len(plot_ctrl._patches[0]) == 1
 
     # --- Try to create span in NON-ACTIVE row ---
-    press_event_other = type("E", (), {
-        "button": MouseButton.LEFT,
-        "inaxes": other_ax,
-        "xdata": 150.0,
-        "ydata": 0,
-        "guiEvent": None,
-    })()
-    release_event_other = type("E", (), {
-        "button": MouseButton.LEFT,
-        "inaxes": other_ax,
-        "xdata": 350.0,
-        "ydata": 0,
-        "guiEvent": None,
-    })()
-
-    # ✅ use same public dispatch API
-    plot_ctrl.canvas.callbacks.process("button_press_event", press_event_other)
-    plot_ctrl.canvas.callbacks.process("button_release_event", release_event_other)
+    drag(plot_ctrl, other_ax, 150.0, 350.0)
 
     # --- Verify that NO span was added in other rows ---
     assert len(plot_ctrl._selections[1]) == 0, "No spans should be drawn on non-active rows"
     assert len(plot_ctrl._patches[1]) == 0, "No patches should exist on non-active rows"
+
+
+# ---------------------------------------------------------------------------
+# TEST: live MVC readout while dragging
+# ---------------------------------------------------------------------------
+def test_live_mvc_matches_whole_signal_envelope(qtbot, backend):
+    plot_ctrl = make_plot_controller(qtbot, nrows=2, npts=4000, backend=backend)
+    env = Processor().mvc_envelope(plot_ctrl._data[1])
+
+    assert plot_ctrl.live_mvc(1, 100.4, 900.2) == pytest.approx(np.max(env[100:901]))
+    assert np.isnan(plot_ctrl.live_mvc(1, 50, 50))
+
+
+def test_live_mvc_readout_is_throttled(qtbot, backend):
+    plot_ctrl = make_plot_controller(qtbot, nrows=2, npts=4000, backend=backend)
+    ax = plot_ctrl.axes[0]
+    plot_ctrl._start_live_mvc(ax)
+    assert plot_ctrl._live_text is not None
+
+    plot_ctrl._schedule_live_mvc(0, 100, 500)        # first move updates at once
+    first = text_of(plot_ctrl._live_text)
+    assert first.startswith("MVC: ")
+
+    plot_ctrl._schedule_live_mvc(0, 2000, 3900)      # within the interval: deferred
+    assert text_of(plot_ctrl._live_text) == first
+    assert plot_ctrl._live_timer.isActive()
+    qtbot.waitUntil(lambda: text_of(plot_ctrl._live_text) != first, timeout=1000)
+
+    plot_ctrl._stop_live_mvc()
+    assert plot_ctrl._live_text is None
+
+
+# ---------------------------------------------------------------------------
+# TEST: automatic best-window selection fills every row
+# ---------------------------------------------------------------------------
+def test_auto_select_windows_populates_all_rows(qtbot, backend):
+    plot_ctrl = make_plot_controller(qtbot, nrows=8, npts=6000, backend=backend)
+    selections = plot_ctrl.auto_select_windows(fs=1500, window_ms=500)
+
+    assert sorted(selections) == list(range(8))
+    for row, spans in selections.items():
+        assert len(spans) == 3
+        assert all(hi - lo == 750 for lo, hi in spans)
+        assert plot_ctrl._selections[row] == spans
+        expected_patches = 3 if row < len(plot_ctrl.axes) else 0
+        assert len(plot_ctrl._patches[row]) == expected_patches
+
+
+# ---------------------------------------------------------------------------
+# TEST: the MVC slots of the main window use the recording's sampling rate
+# ---------------------------------------------------------------------------
+@pytest.fixture(scope="module")
+def main_module():
+    pytest.importorskip("psutil")      # main imports the telemetry monitor
+    hook = sys.excepthook
+    import main
+    sys.excepthook = hook
+    return main
+
+
+def run_slot(qtbot, main_module, slot, plot_ctrl):
+    from types import SimpleNamespace
+    from PyQt5.QtWidgets import QPlainTextEdit, QTabWidget
+    tabs = QTabWidget()
+    qtbot.addWidget(tabs)
+    tab = QWidget()
+    tab.plot_ctrl = plot_ctrl
+    tabs.addTab(tab, "rec.mat")
+    window = SimpleNamespace(tw_plotting=tabs, ledt_output=QPlainTextEdit(),
+                             _is_license_valid=lambda recheck=False: True)
+    getattr(main_module.ApplicationWindow, slot)(window)
+    return window.ledt_output.toPlainText()
+
+
+@pytest.mark.parametrize("frequency", [1000.0, 2148.1481, None])
+def test_auto_mvc_slot_windows_follow_sample_rate(qtbot, main_module, frequency):
+    from config.defaults import AUTO_MVC_WINDOW_MS, DEFAULT_SEMG_FREQUENCY
+    container = QWidget()
+    qtbot.addWidget(container)
+    plot_ctrl = PlotController(container=container)
+    plot_ctrl.plot_mat_arrays(np.random.randn(3, 8000), ["A", "B", "C"], frequency=frequency)
+    fs = frequency or DEFAULT_SEMG_FREQUENCY
+    assert plot_ctrl.sample_rate == fs
+
+    out = run_slot(qtbot, main_module, "on_auto_mvc", plot_ctrl)
+    assert "[error]" not in out
+    widths = {hi - lo for spans in plot_ctrl._selections.values() for lo, hi in spans}
+    assert widths == {round(fs * AUTO_MVC_WINDOW_MS / 1000)}
+
+
+def test_burst_slot_uses_sample_rate(qtbot, main_module, monkeypatch):
+    seen = []
+    monkeypatch.setattr(main_module.Processor, "energy_bursts",
+                        lambda self, x, fs, **kw: seen.append(fs) or (np.array([], int), np.array([], int)))
+    container = QWidget()
+    qtbot.addWidget(container)
+    plot_ctrl = PlotController(container=container)
+    plot_ctrl.plot_mat_arrays(np.random.randn(2, 3000), ["A", "B"], frequency=1000.0)
+    run_slot(qtbot, main_module, "on_burst_detection", plot_ctrl)
+    assert seen == [1000.0]
+
+
+def test_mvc_xml_rows_are_file_channels(qtbot, main_module, monkeypatch, tmp_path):
+    import xml.etree.ElementTree as ET
+    xml = str(tmp_path / "mvc.xml")
+    monkeypatch.setattr(main_module.QFileDialog, "getSaveFileName", lambda *a, **k: (xml, ""))
+    monkeypatch.setattr(main_module.QFileDialog, "getOpenFileName", lambda *a, **k: (xml, ""))
+    data, labels = np.random.randn(5, 2000), list("ABCDE")
+
+    def tab_of(channels):
+        rows = list(range(5)) if channels is None else channels
+        container = QWidget()
+        qtbot.addWidget(container)
+        plot_ctrl = PlotController(container=container)
+        plot_ctrl.container = container
+        plot_ctrl.plot_mat_arrays(data[rows], [labels[c] for c in rows], channels=channels)
+        return plot_ctrl
+
+    # Filtered to file channels 1 and 3: row 1 is channel 3 ("D")
+    src = tab_of([1, 3])
+    src._set_active_row(1)
+    src._add_span(1, 100, 300)
+    run_slot(qtbot, main_module, "export_mvc_xml", src)
+    entry = ET.parse(xml).getroot().find("File")
+    assert (entry.findtext("Row"), entry.findtext("Label")) == ("3", "D")
+
+    # Unfiltered: the spans land on channel 3 itself
+    full = tab_of(None)
+    run_slot(qtbot, main_module, "import_mvc_xml", full)
+    assert {r: v for r, v in full._selections.items() if v} == {3: [(100.0, 300.0)]}
+
+    # Channel 3 filtered out: nothing is placed, and the import says so
+    other = tab_of([0, 1])
+    out = run_slot(qtbot, main_module, "import_mvc_xml", other)
+    assert "[warn]" in out and all(v == [] for v in other._selections.values())
+    assert other.row_of_channel(1) == 1 and full.row_of_channel(7) is None
+
+
+# ---------------------------------------------------------------------------
+# TEST: lines are decimated to the axes width and exact when zoomed in
+# ---------------------------------------------------------------------------
+def test_lines_are_level_of_detail(qtbot):
+    plot_ctrl = make_plot_controller(qtbot, nrows=2, npts=500_000)
+    ax = plot_ctrl.axes[0]
+    line = ax.get_lines()[0]
+    width = ax.get_window_extent().width
+    assert len(line.get_xdata()) <= 2 * width + 8
+
+    ax.set_xlim(1000, 1100)
+    x = np.asarray(line.get_xdata())
+    np.testing.assert_array_equal(line.get_ydata(), plot_ctrl._data[0, x.astype(int)])
+    assert x[0] <= 1000 and x[-1] >= 1100
+
+
+# ---------------------------------------------------------------------------
+# TEST: span edits and row switches blit instead of redrawing the figure
+# ---------------------------------------------------------------------------
+def test_interaction_uses_blit_layer(qtbot):
+    container = QWidget()               # keep the canvas' parent alive
+    qtbot.addWidget(container)
+    plot_ctrl = PlotController(container=container)
+    plot_ctrl.plot_mat_arrays(np.random.randn(3, 5000), ["A", "B", "C"])
+    plot_ctrl.canvas.resize(800, 600)
+    plot_ctrl.canvas.draw()
+
+    draws = []
+    plot_ctrl.canvas.mpl_connect("draw_event", lambda e: draws.append(e))
+    full = []
+    orig = plot_ctrl.canvas.draw_idle
+    plot_ctrl.canvas.draw_idle = lambda *a, **k: (full.append(1), orig(*a, **k))
+
+    patch = plot_ctrl._span_patch(0, 100, 400)
+    plot_ctrl._patches[0].append(patch)
+    plot_ctrl._selections[0].append((100, 400))
+    assert patch.get_animated()
+    plot_ctrl._blit.update(plot_ctrl.axes[0])
+
+    plot_ctrl._on_row_clicked(1)
+    assert plot_ctrl._selections[0] == [] and patch.axes is None
+    assert plot_ctrl.axes[1].lines[0].get_linewidth() == 2.2
+
+    assert full == [] and draws == []
+
+
+# ---------------------------------------------------------------------------
+# TEST: lazy tabs keep only N live canvases and survive eviction
+# ---------------------------------------------------------------------------
+def test_lazy_tabs_lru_keeps_state(qtbot, backend):
+    from plotting.tab_cache import CanvasLRU
+
+    tabs, ctrls = [], []
+    for k in range(4):
+        tab = QWidget()
+        qtbot.addWidget(tab)
+        pc = controller_class(backend)(container=tab, lazy=True)
+        pc.set_data(np.random.randn(3, 2000), ["A", "B", "C"], source_path=f"f{k}.mat")
+        assert not pc.is_live and pc._selections == {0: [], 1: [], 2: []}
+        tabs.append(tab); ctrls.append(pc)
+
+    lru = CanvasLRU(capacity=2)
+    lru.activate(ctrls[0], tabs[0])
+    assert ctrls[0].is_live and len(ctrls[0].axes) == 3
+
+    pc = ctrls[0]
+    pc._set_active_row(2)
+    pc._selections[2].append((100, 300))
+    pc._patches[2].append(pc._span_patch(2, 100, 300))
+    pc._mvc_result = 1.5
+
+    lru.activate(ctrls[1], tabs[1])
+    lru.activate(ctrls[2], tabs[2])
+    assert [c.is_live for c in ctrls] == [False, True, True, False]
+    assert pc.canvas is None and pc.axes == []
+    assert pc._selections[2] == [(100, 300)] and pc._mvc_result == 1.5
+    assert pc.span_mvcs(2, [(100, 300)]).shape == (1,)
+
+    lru.activate(ctrls[0], tabs[0])
+    assert [c.is_live for c in ctrls] == [True, False, True, False]
+    assert pc._active_row == 2 and pc._selections[2] == [(100, 300)]
+    assert len(pc._patches[2]) == 1 and patch_axes(pc, pc._patches[2][0]) is pc.axes[2]
+    assert tabs[0].layout().count() == (1 if pc.toolbar is None else 2)
+
+
+# ---------------------------------------------------------------------------
+# TEST: refreshing with same-shape data reuses axes, lines and overlays
+# ---------------------------------------------------------------------------
+def test_replot_same_shape_reuses_artists(qtbot):
+    container = QWidget()
+    qtbot.addWidget(container)
+    plot_ctrl = PlotController(container=container)
+    labels = ["A", "B", "C"]
+    plot_ctrl.plot_mat_arrays(np.random.randn(3, 4000), labels)
+    axes = list(plot_ctrl.axes)
+    lines = [ax.lines[0] for ax in axes]
+    overlays = list(plot_ctrl._overlay_items)
+    plot_ctrl._selections[0].append((10, 50))
+    plot_ctrl._patches[0].append(plot_ctrl._span_patch(0, 10, 50))
+    stale = plot_ctrl._patches[0][0]
+
+    new = 100.0 + np.random.randn(3, 4000)
+    plot_ctrl.plot_mat_arrays(new, labels)
+    assert plot_ctrl.axes == axes
+    assert [ax.lines[0] for ax in plot_ctrl.axes] == lines
+    assert plot_ctrl._overlay_items == overlays
+    assert plot_ctrl._selections[0] == [] and stale.axes is None
+    assert plot_ctrl.axes[1].get_ylim()[0] > 90
+
+    plot_ctrl.plot_mat_arrays(new, ["X", "Y", "Z"])
+    assert plot_ctrl.axes == axes
+    assert [itm["label"].text() for itm in plot_ctrl._overlay_items] == ["X", "Y", "Z"]
+
+    plot_ctrl.plot_mat_arrays(np.random.randn(2, 4000), ["X", "Y"])
+    assert len(plot_ctrl.axes) == 2 and plot_ctrl.axes[0] is not axes[0]
+
+
+# ---------------------------------------------------------------------------
+# TEST: overlay widgets are pooled and placed on resize, not on draw
+# ---------------------------------------------------------------------------
+def test_overlay_widgets_are_pooled(qtbot, backend):
+    container = QWidget()
+    qtbot.addWidget(container)
+    plot_ctrl = controller_class(backend)(container=container)
+    plot_ctrl.plot_mat_arrays(np.random.randn(4, 1000), list("ABCD"))
+    widgets = [itm["widget_top"] for itm in plot_ctrl._overlay_items]
+    assert len(widgets) == 4
+
+    plot_ctrl.plot_mat_arrays(np.random.randn(2, 1000), list("EF"))
+    items = plot_ctrl._overlay_items
+    assert [itm["widget_top"] for itm in items] == widgets[:2]
+    assert [itm["label"].text() for itm in items] == ["E", "F"]
+    assert widgets[2].isHidden() and widgets[3].isHidden()
+
+    plot_ctrl.plot_mat_arrays(np.random.randn(4, 1000), list("ABCD"))
+    assert [itm["widget_top"] for itm in plot_ctrl._overlay_items] == widgets
+
+    container.show()
+    before = widgets[0].geometry()
+    plot_ctrl.canvas.resize(plot_ctrl.canvas.width() + 200, plot_ctrl.canvas.height())
+    qtbot.waitUntil(lambda: widgets[0].geometry() != before, timeout=1000)
+
+
+# ---------------------------------------------------------------------------
+# TEST: channels beyond max_rows are scrolled through a fixed bank of axes
+# ---------------------------------------------------------------------------
+def test_channel_bank_scrolls_without_new_axes(qtbot, backend):
+    container = QWidget()
+    qtbot.addWidget(container)
+    plot_ctrl = controller_class(backend)(container=container)
+    data = np.arange(16)[:, None] * 100.0 + np.random.randn(16, 2000)
+    labels = [f"CH{i}" for i in range(16)]
+    plot_ctrl.plot_mat_arrays(data, labels)
+    axes = list(plot_ctrl.axes)
+    assert len(axes) == 6 and len(plot_ctrl._selections) == 16
+    assert not plot_ctrl._scrollbar.isHidden()
+    assert plot_ctrl._scrollbar.maximum() == 10
+
+    plot_ctrl._selections[12] = [(100, 300)]
+    plot_ctrl.scroll_to(10)
+    assert plot_ctrl.axes == axes
+    assert list(plot_ctrl.visible_rows()) == list(range(10, 16))
+    assert [itm["label"].text() for itm in plot_ctrl._overlay_items] == labels[10:]
+    assert plot_ctrl.axes_for(12) is axes[2] and plot_ctrl.axes_for(0) is None
+    assert len(plot_ctrl._patches[12]) == 1 and patch_axes(plot_ctrl, plot_ctrl._patches[12][0]) is axes[2]
+    assert ylim(axes[0])[0] > 900
+
+    # Scrolling away keeps the selection but drops its patch
+    plot_ctrl.scroll_to(0)
+    assert plot_ctrl._selections[12] == [(100, 300)] and plot_ctrl._patches[12] == []
+
+    # Radio ids are slots: clicking slot 1 at offset 10 activates channel 11
+    plot_ctrl.scroll_to(99)
+    assert plot_ctrl._row_offset == 10
+    plot_ctrl._on_row_clicked(1)
+    assert plot_ctrl._active_row == 11
+    plot_ctrl._set_active_row(3)
+    assert plot_ctrl.axes_for(3) is not None
+
+
+def test_channel_pyramids_are_cached_and_prefetched(qtbot):
+    container = QWidget()
+    qtbot.addWidget(container)
+    plot_ctrl = PlotController(container=container)
+    plot_ctrl.plot_mat_arrays(np.random.randn(10, 2000), None)
+    assert set(plot_ctrl._pyramids) == set(range(6))
+
+    while plot_ctrl._prefetch_timer.isActive():
+        plot_ctrl._prefetch_step()
+    assert set(plot_ctrl._pyramids) == set(range(10))
+    pyr = plot_ctrl._pyramids[7]
+    plot_ctrl.scroll_to(4)
+    assert plot_ctrl._lod_lines[3].pyramid is pyr
+
+
+def test_prefetch_stops_once_the_canvas_is_destroyed(qtbot):
+    from PyQt5 import sip
+    container = QWidget()
+    plot_ctrl = PlotController(container=container)
+    plot_ctrl.plot_mat_arrays(np.random.randn(10, 2000), None)
+    assert plot_ctrl._prefetch_timer.isActive()
+
+    sip.delete(container)               # the tab was closed under the controller
+    plot_ctrl._prefetch_step()
+    assert not plot_ctrl._prefetch_timer.isActive()
+
+
+def test_reimport_releases_the_old_tabs(qtbot, main_module):
+    import weakref
+    from types import SimpleNamespace
+    from PyQt5.QtWidgets import QTabWidget
+    from plotting.tab_cache import CanvasLRU
+    app = main_module.ApplicationWindow
+    tabs = QTabWidget()
+    qtbot.addWidget(tabs)
+    window = SimpleNamespace(tw_plotting=tabs, _canvas_lru=CanvasLRU(), _replace_tabs=False,
+                             _update_tab_memory=lambda index: None)
+    window._dispose_tab = lambda widget: app._dispose_tab(window, widget)
+
+    def import_files(n):
+        app.on_mats_import_started(window)
+        for k in range(n):
+            app.on_mat_imported(window, {"path": f"f{k}.mat", "data": np.random.randn(10, 2000),
+                                         "labels": None, "frequency": 1000.0})
+        return [tabs.widget(i).plot_ctrl for i in range(tabs.count())]
+
+    old = import_files(2)
+    window._canvas_lru.activate(old[0], tabs.widget(0))
+    assert old[0].is_live and old[0]._prefetch_timer.isActive()
+    refs = [weakref.ref(pc) for pc in old]
+    del old
+
+    new = import_files(1)
+    assert tabs.count() == 1 and len(window._canvas_lru) == 0
+
+    # Once the old tab widgets are deleted nothing keeps their controllers alive
+    import gc
+    from PyQt5.QtCore import QCoreApplication, QEvent
+
+    def freed():
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+        gc.collect()
+        return all(r() is None for r in refs)
+    qtbot.waitUntil(freed, timeout=2000)
+    assert new[0]._data is not None
+
+
+# ---------------------------------------------------------------------------
+# TEST: rows are contiguous views of the channel store, memory is tracked
+# ---------------------------------------------------------------------------
+def test_rows_are_views_of_channel_store(qtbot):
+    container = QWidget()
+    qtbot.addWidget(container)
+    plot_ctrl = PlotController(container=container)
+    data = np.asfortranarray(np.random.randn(4, 3000))
+    plot_ctrl.plot_mat_arrays(data, None)
+
+    store = plot_ctrl._data
+    assert store[2, :].flags.c_contiguous
+    assert np.shares_memory(store[2, :], store.channel(2))
+    assert plot_ctrl._pyramids[2].y.base is not None      # no copy for the pyramid
+    np.testing.assert_array_equal(np.asarray(store), data)
+    assert plot_ctrl.memory_usage() == data.nbytes + sum(p.nbytes for p in plot_ctrl._pyramids.values())
+
+
+# ---------------------------------------------------------------------------
+# TEST: off-thread mode composites worker frames instead of drawing lines
+# ---------------------------------------------------------------------------
+def test_offthread_render_composites_frames(qtbot, monkeypatch):
+    import plot_controller
+    from plotting.offscreen import CompositingCanvas
+    monkeypatch.setattr(plot_controller, "OFFTHREAD_RENDER", "thread")
+    container = QWidget()
+    qtbot.addWidget(container)
+    plot_ctrl = PlotController(container=container)
+    plot_ctrl.plot_mat_arrays(np.random.randn(3, 4000), list("ABC"))
+    canvas = plot_ctrl.canvas
+    assert isinstance(canvas, CompositingCanvas)
+    assert not any(ax.lines[0].get_visible() for ax in plot_ctrl.axes)
+
+    canvas.draw()
+    qtbot.waitUntil(lambda: canvas.frame is not None, timeout=5000)
+    assert (canvas.frame.width(), canvas.frame.height()) == canvas.get_width_height(physical=True)
+
+    version = plot_ctrl._frames.version
+    plot_ctrl._set_active_row(1)
+    assert plot_ctrl._frames.version > version
+
+
+def test_offthread_frame_stays_under_spans(qtbot, monkeypatch):
+    import plot_controller
+    monkeypatch.setattr(plot_controller, "OFFTHREAD_RENDER", "thread")
+    container = QWidget()
+    qtbot.addWidget(container)
+    container.resize(600, 400)
+    plot_ctrl = PlotController(container=container)
+    plot_ctrl.plot_mat_arrays(np.random.randn(2, 4000), list("AB"))
+    plot_ctrl._selections[0].append((0, 3999))
+    plot_ctrl._patches[0].append(plot_ctrl._span_patch(0, 0, 3999))
+    canvas = plot_ctrl.canvas
+    canvas.draw()
+    qtbot.waitUntil(lambda: canvas._frame_rgba is not None
+                    and canvas._frame_rgba.shape == canvas._buffer().shape, timeout=5000)
+    qtbot.wait(50)
+
+    buf, frame = canvas._buffer(), canvas._frame_rgba
+    line = frame[..., 3] == 255
+    h = buf.shape[0]
+    for ax, spanned in zip(plot_ctrl.axes, (True, False)):
+        l, b, r, t = ax.bbox.extents
+        inside = np.zeros_like(line)
+        inside[h - int(t) + 3:h - int(b) - 3, int(l) + 3:int(r) - 3] = True
+        px = line & inside
+        assert px.any()
+        # Waveform pixels are in the buffer, tinted only where a span lies over them
+        differs = np.any(buf[px][:, :3] != frame[px][:, :3], axis=1)
+        assert differs.all() if spanned else not differs.any()
+
+
+# ---------------------------------------------------------------------------
+# TEST: span / row semantics are the same on every plotting backend
+# ---------------------------------------------------------------------------
+from config.defaults import BEST_OF
+
+
+def make_backend_controller(qtbot, backend, nrows=3, npts=1000):
+    container = QWidget()
+    qtbot.addWidget(container)
+    plot_ctrl = controller_class(backend)(container=container)
+    plot_ctrl.plot_mat_arrays(np.random.randn(nrows, npts), [f"EMG {i+1}" for i in range(nrows)])
+    return container, plot_ctrl
+
+
+def test_backend_span_semantics(qtbot, backend):
+    container, plot_ctrl = make_backend_controller(qtbot, backend)
+    for i in range(BEST_OF + 1):
+        plot_ctrl._add_span(0, 100 * i, 100 * i + 50)
+    assert len(plot_ctrl._selections[0]) == BEST_OF
+    assert len(plot_ctrl._patches[0]) == BEST_OF
+
+    assert plot_ctrl._delete_span_at(0, 120.0, 1.0)
+    assert plot_ctrl._selections[0] == [(0, 50), (200, 250)]
+    assert len(plot_ctrl._patches[0]) == 2
+    assert not plot_ctrl._delete_span_at(0, 500.0, 1.0)
+
+    # Activating another row clears the previous one
+    plot_ctrl._on_row_clicked(1)
+    assert plot_ctrl._active_row == 1
+    assert plot_ctrl._selections[0] == [] and plot_ctrl._patches[0] == []
+    assert plot_ctrl._row_group.checkedId() == 1
+
+    plot_ctrl._add_span(1, 10, 20)
+    plot_ctrl.clear_all_selections()
+    assert all(v == [] for v in plot_ctrl._selections.values())
+    assert plot_ctrl._active_row is None
+
+
+def test_backend_channel_bank(qtbot, backend):
+    container, plot_ctrl = make_backend_controller(qtbot, backend, nrows=9)
+    axes = list(plot_ctrl.axes)
+    assert len(axes) == 6
+    plot_ctrl._selections[8] = [(10, 40)]
+    plot_ctrl.scroll_to(3)
+    assert plot_ctrl.axes == axes and plot_ctrl.axes_for(8) is axes[5]
+    assert len(plot_ctrl._patches[8]) == 1
+
+    plot_ctrl.release()
+    assert not plot_ctrl.is_live
+    plot_ctrl.materialize(container)
+    assert plot_ctrl._selections[8] == [(10, 40)] and len(plot_ctrl._patches[8]) == 1
+
+
+# ---------------------------------------------------------------------------
+# TEST: every configurable backend is importable (no silent fallback)
+# ---------------------------------------------------------------------------
+def test_backends_resolve_to_their_controllers():
+    from plotting.pg_backend import PgPlotController
+    assert controller_class("matplotlib") is PlotController
+    assert controller_class("pyqtgraph") is PgPlotController
+    with pytest.raises(ValueError):
+        controller_class("vispy")
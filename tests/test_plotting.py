@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the plotting helpers (level-of-detail decimation,
+off-thread frame rendering).
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+
+from plotting.lod import MinMaxPyramid
+from plotting.offscreen import FrameRenderer, rasterize_layers
+
+
+# ---------------------------------------------------------------------------
+# Min/max pyramid
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize("n", [1, 5, 4096, 100_003])
+def test_pyramid_levels_keep_extremes(n):
+    rng = np.random.default_rng(n)
+    y = rng.standard_normal(n)
+    p = MinMaxPyramid(y)
+    for bucket, mins, maxs in p.levels:
+        assert mins.size == -(-n // bucket)
+        assert mins.min() == y.min() and maxs.max() == y.max()
+        np.testing.assert_array_equal(mins[0], y[:bucket].min())
+        np.testing.assert_array_equal(maxs[-1], y[(mins.size - 1) * bucket:].max())
+
+
+def test_view_is_exact_when_zoomed_in():
+    y = np.sin(np.arange(10_000) / 50.0)
+    p = MinMaxPyramid(y)
+    x, v = p.view(2000, 2600, pixels=800)
+    assert x[0] <= 2000 and x[-1] >= 2600
+    np.testing.assert_array_equal(v, y[x.astype(int)])
+    np.testing.assert_array_equal(np.diff(x), 1.0)
+
+
+def test_view_point_count_is_bounded_by_pixels():
+    rng = np.random.default_rng(1)
+    y = rng.standard_normal(2_000_000)
+    y[123_456] = 50.0
+    y[1_500_000] = -50.0
+    p = MinMaxPyramid(y)
+    for x0, x1 in [(0, y.size - 1), (10_000, 900_000), (123_000, 124_000)]:
+        x, v = p.view(x0, x1, pixels=1000)
+        assert x.size <= 2 * 1000 + 8
+        seg = y[x0:x1 + 1]
+        assert v.max() == seg.max() and v.min() == seg.min()
+
+
+def test_view_keeps_nan_gaps():
+    y = np.arange(100_000, dtype=float)
+    y[40_000:60_000] = np.nan
+    y[70_000] = np.nan
+    x, v = MinMaxPyramid(y).view(0, y.size - 1, pixels=200)
+    assert np.isnan(v[(x > 42_000) & (x < 58_000)]).all()
+    assert not np.isnan(v[x > 65_000]).any()
+
+
+# ---------------------------------------------------------------------------
+# Off-thread frames
+# ---------------------------------------------------------------------------
+def _layer(y, lw=1.0):
+    return {"bbox": (10, 10, 180, 80), "xlim": (0, y.size - 1), "ylim": (-1.5, 1.5),
+            "x": np.arange(y.size, dtype=float), "y": y, "lw": lw, "color": "C0"}
+
+
+def test_rasterize_layers_is_transparent_outside_lines():
+    rgba = rasterize_layers(200, 100, [_layer(np.zeros(50))], dpi=100)
+    assert rgba.shape == (100, 200, 4)
+    assert rgba[:5, :, 3].max() == 0            # above the axes box
+    assert rgba[45:55, 50, 3].max() > 0         # the y=0 line mid-height
+
+
+def test_frame_renderer_delivers_only_newest(qtbot):
+    renderer = FrameRenderer("thread")
+    frames = []
+    renderer.frameReady.connect(frames.append)
+    y = np.sin(np.linspace(0, 20, 5000))
+    renderer.submit(200, 100, [_layer(y)], 100)
+    renderer.submit(200, 100, [_layer(y, lw=3.0)], 100)
+    last = renderer.submit(300, 100, [_layer(y)], 100)
+    assert last == renderer.version == 3
+    qtbot.waitUntil(lambda: len(frames) >= 1, timeout=5000)
+    qtbot.wait(200)
+    assert len(frames) == 1 and frames[0].width() == 300
+
+    renderer.submit(200, 100, [_layer(y)], 100)
+    renderer.cancel()
+    qtbot.wait(300)
+    assert len(frames) == 1
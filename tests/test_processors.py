@@ -0,0 +1,502 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the numeric kernels behind processors.processors.Processor
+
+Every fast path is checked against the original per-sample reference
+implementation it replaced.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+
+from scipy.signal import butter, filtfilt, sosfiltfilt
+
+from config.defaults import DEFAULT_SEMG_FREQUENCY, FLOAT32_RTOL
+from processors import bursts, filterbank, hampel, precision, sliding
+from processors.envelope_index import EnvelopeIndex, RangeMax
+from processors.processors import Processor
+
+
+# ---------------------------------------------------------------------------
+# Reference implementations (verbatim from the original Processor)
+# ---------------------------------------------------------------------------
+def ref_hampel_filter(x, win_samples=51, k=3.0):
+    x = np.asarray(x, float); n = x.size
+    w = int(win_samples) | 1; half = w // 2
+    y = x.copy()
+    for i in range(n):
+        lo = max(0, i - half); hi = min(n, i + half + 1)
+        seg = x[lo:hi]; med = np.median(seg)
+        mad = np.median(np.abs(seg - med)) + 1e-12
+        if abs(x[i] - med) > k * 1.4826 * mad:
+            y[i] = med
+    return y
+
+
+def ref_moving_rms_matlab(interval, halfwindow):
+    n = len(interval)
+    rms_signal = np.zeros(n)
+    for i in range(n):
+        small_index = max(0, i - halfwindow)
+        big_index   = min(n, i + halfwindow)
+        window_samples = interval[small_index:big_index]
+        rms_signal[i] = np.sqrt(np.sum(window_samples**2)/len(window_samples))
+    return rms_signal
+
+
+def ref_energy_detection(in_audio, min_silence=0.080, min_sound=0.200, fs=44100):
+    x = np.asarray(in_audio).astype(float).ravel()
+    energy = np.abs(x) ** 2
+    min_silence_samples = max(1, int(round(min_silence * fs)))
+    min_sound_samples   = max(1, int(round(min_sound * fs)))
+    b = np.ones(min_silence_samples, dtype=float) / min_silence_samples
+    moving_ave = np.convolve(energy, b, mode="same")
+    moving_ave /= moving_ave.max() + 1e-12
+    energy_vector = (moving_ave >= 0.010).astype(int)
+    cum = 0
+    for i in range(len(energy_vector)):
+        if energy_vector[i]:
+            cum += 1
+        else:
+            if 0 < cum < min_sound_samples:
+                energy_vector[i - cum:i] = 0
+            cum = 0
+    if 0 < cum < min_sound_samples:
+        energy_vector[-cum:] = 0
+    bursts = []
+    i = 0
+    n = len(energy_vector)
+    while i < n:
+        if energy_vector[i]:
+            start = i
+            while i < n and energy_vector[i]:
+                i += 1
+            end = i
+            bursts.append((start, end))
+        i += 1
+    if len(bursts) > 3:
+        energies = [energy[s:e].sum() for s, e in bursts]
+        top3_idx = np.argsort(energies)[-3:]
+        top3_bursts = [bursts[i] for i in sorted(top3_idx)]
+        energy_vector[:] = 0
+        for s, e in top3_bursts:
+            energy_vector[s:e] = 1
+    out_audio = x * energy_vector
+    return energy_vector, out_audio
+
+
+def ref_mvc_matlab(in_vec, winsize=3):
+    x = np.asarray(in_vec, dtype=float)
+    x = x[~np.isnan(x)]
+    if x.size == 0:
+        return np.nan, x
+    x = x - np.mean(x)
+    signal_corrected = x.copy()
+    signal_corrected[signal_corrected > 9800] = 0.0
+    b, a = butter(N=4, Wn=[10.0, 500.0], btype="band", fs=DEFAULT_SEMG_FREQUENCY)
+    padlen = 3 * max(len(a), len(b))
+    if signal_corrected.size <= padlen:
+        signal_bp = signal_corrected
+    else:
+        signal_bp = filtfilt(b, a, signal_corrected)
+    movingrms = ref_moving_rms_matlab(np.abs(signal_bp), winsize)
+    MVC = np.nanmax(movingrms) if movingrms.size else np.nan
+    return MVC, movingrms
+
+
+def burst_signal(fs=1500, seed=0):
+    """Quiet baseline with contractions of varying length and strength."""
+    rng = np.random.default_rng(seed)
+    x = 0.01 * rng.standard_normal(fs * 12)
+    for t0, dur, amp in [(0.5, 1.0, 3.0), (2.5, 0.05, 6.0), (3.0, 1.2, 5.0),
+                         (5.0, 0.8, 1.5), (7.0, 1.5, 4.0), (10.0, 1.0, 2.0), (11.6, 0.4, 3.5)]:
+        s = int(t0 * fs); e = min(x.size, s + int(dur * fs))
+        x[s:e] += amp * rng.standard_normal(e - s)
+    return x
+
+
+def spiky_signal(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal(n)
+    if n == 0:
+        return x
+    spikes = rng.choice(n, size=max(1, n // 50), replace=False)
+    x[spikes] += rng.choice([-1, 1], size=spikes.size) * 25.0
+    return x
+
+
+# ---------------------------------------------------------------------------
+# Hampel filter
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize("n, win", [(0, 5), (1, 5), (4, 9), (9, 9), (200, 7), (3000, 75), (1000, 50)])
+def test_hampel_matches_reference(n, win):
+    x = spiky_signal(n)
+    np.testing.assert_array_equal(hampel.hampel_filter(x, win), ref_hampel_filter(x, win))
+
+
+def test_hampel_chunk_boundaries(monkeypatch):
+    monkeypatch.setattr(hampel, "CHUNK", 64)
+    x = spiky_signal(1000, seed=3)
+    np.testing.assert_array_equal(hampel.hampel_filter(x, 11), ref_hampel_filter(x, 11))
+
+
+def test_hampel_2d_matches_rows():
+    X = np.vstack([spiky_signal(800, seed=s) for s in range(4)])
+    Y = hampel.hampel_filter_2d(X, 21, k=2.5)
+    for r in range(X.shape[0]):
+        np.testing.assert_array_equal(Y[r], ref_hampel_filter(X[r], 21, k=2.5))
+
+    # Fortran-ordered input and samples on axis 0
+    Yt = hampel.hampel_filter_2d(np.asfortranarray(X).T, 21, k=2.5, axis=0)
+    np.testing.assert_array_equal(Yt.T, Y)
+
+
+def test_processor_hampel_delegates():
+    x = spiky_signal(500, seed=7)
+    np.testing.assert_array_equal(Processor.hampel_filter(x, 15), ref_hampel_filter(x, 15))
+
+
+def test_hampel_nan_semantics():
+    x = spiky_signal(400, seed=11)
+    x[[0, 37, 200, 399]] = np.nan
+    np.testing.assert_array_equal(hampel.hampel_filter(x, 9), ref_hampel_filter(x, 9))
+
+
+# ---------------------------------------------------------------------------
+# Prefix-sum sliding windows
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize("n, w", [(1, 1), (5, 1), (100, 7), (100, 8), (3, 10), (4, 9), (2000, 120)])
+def test_moving_mean_matches_convolve_same(n, w):
+    x = spiky_signal(n, seed=n) ** 2
+    expected = np.convolve(x, np.ones(w) / w, mode="same")
+    got = sliding.moving_mean(x, w)
+    assert got.shape == expected.shape
+    np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_moving_rms_matches_reference():
+    x = np.abs(spiky_signal(3000, seed=2))
+    expected = np.sqrt(np.convolve(x**2, np.ones(75) / 75, mode="same"))
+    np.testing.assert_allclose(Processor.moving_rms(x, 75), expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("n, h", [(1, 3), (10, 3), (500, 3), (500, 1), (50, 100)])
+def test_moving_rms_matlab_matches_reference(n, h):
+    x = np.abs(spiky_signal(n, seed=h))
+    got = Processor().moving_rms_matlab(x, h)
+    np.testing.assert_allclose(got, ref_moving_rms_matlab(x, h), rtol=1e-9, atol=1e-12)
+
+
+def test_moving_windows_confine_nan():
+    x = np.abs(spiky_signal(400, seed=5))
+    x[[0, 150, 151, 399]] = np.nan
+    x[300] = np.inf
+    expected = np.convolve(x**2, np.ones(25) / 25, mode="same")
+    with np.errstate(invalid="ignore"):
+        expected = np.sqrt(expected)
+    got = Processor.moving_rms(x, 25)
+    np.testing.assert_array_equal(np.isnan(got), np.isnan(expected))
+    np.testing.assert_array_equal(np.isinf(got), np.isinf(expected))
+    ok = np.isfinite(expected)
+    assert ok.sum() > 200
+    np.testing.assert_allclose(got[ok], expected[ok], rtol=1e-9)
+
+    X = np.vstack([x, -x])
+    got = sliding.moving_rms_matlab(X, 3, axis=1)
+    for r in range(2):
+        ref = ref_moving_rms_matlab(X[r], 3)
+        np.testing.assert_array_equal(np.isnan(got[r]), np.isnan(ref))
+        np.testing.assert_allclose(got[r][np.isfinite(ref)], ref[np.isfinite(ref)], rtol=1e-9)
+
+
+def test_sliding_batched_axis():
+    X = np.vstack([np.abs(spiky_signal(600, seed=s)) for s in range(3)])
+    R = sliding.moving_rms_matlab(X, 3, axis=1)
+    Rt = sliding.moving_rms_matlab(X.T, 3, axis=0)
+    M = sliding.moving_mean(X, 25)
+    for r in range(X.shape[0]):
+        np.testing.assert_allclose(R[r], ref_moving_rms_matlab(X[r], 3), rtol=1e-9)
+        np.testing.assert_allclose(M[r], np.convolve(X[r], np.ones(25) / 25, mode="same"), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(Rt.T, R)
+
+
+# ---------------------------------------------------------------------------
+# Burst intervals
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize("mask", [[], [0, 0], [1], [1, 1, 0, 1], [0, 1, 1, 0, 0, 1, 1, 1]])
+def test_runs(mask):
+    starts, ends = bursts.runs(np.array(mask))
+    expected = []
+    i = 0
+    while i < len(mask):
+        if mask[i]:
+            j = i
+            while j < len(mask) and mask[j]:
+                j += 1
+            expected.append((i, j)); i = j
+        else:
+            i += 1
+    assert list(zip(starts.tolist(), ends.tolist())) == expected
+
+
+def test_run_sums_and_top_k():
+    values = np.arange(10.0)
+    starts, ends = np.array([0, 3, 8]), np.array([2, 6, 10])
+    np.testing.assert_allclose(bursts.run_sums(values, starts, ends), [1.0, 12.0, 17.0])
+    s, e = bursts.top_k(starts, ends, [1.0, 12.0, 17.0], 2)
+    assert s.tolist() == [3, 8] and e.tolist() == [6, 10]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_energy_detection_matches_reference(seed):
+    x = burst_signal(seed=seed)
+    mask, out = Processor().energy_detection(x, fs=1500)
+    ref_mask, ref_out = ref_energy_detection(x, fs=1500)
+    np.testing.assert_array_equal(mask, ref_mask)
+    np.testing.assert_array_equal(out, ref_out)
+
+    starts, ends = Processor().energy_bursts(x, fs=1500)
+    assert len(starts) == 3
+    assert bursts.intervals_to_mask(starts, ends, x.size).tolist() == ref_mask.tolist()
+
+
+def test_energy_bursts_validates_durations():
+    with pytest.raises(ValueError):
+        bursts.energy_bursts(np.ones(10), 1500, min_silence=0.2, min_sound=0.1)
+
+
+# ---------------------------------------------------------------------------
+# Cached SOS filter bank
+# ---------------------------------------------------------------------------
+def test_sosfiltfilt_matches_scipy():
+    x = 100.0 * spiky_signal(3000, seed=4)
+    sos, zi = filterbank.bandpass_sos(1500, 20, 450, order=4)
+    np.testing.assert_allclose(filterbank.sosfiltfilt(sos, zi, x), sosfiltfilt(sos, x), rtol=1e-12, atol=1e-9)
+
+    X = np.vstack([x, -x, 0.5 * x])
+    np.testing.assert_allclose(filterbank.bandpass(X.T, 1500, 20, 450, axis=0).T,
+                               sosfiltfilt(sos, X, axis=-1), rtol=1e-12, atol=1e-9)
+
+
+def test_bandpass_matches_ba_filtfilt():
+    x = 100.0 * spiky_signal(3000, seed=5)
+    b, a = butter(4, [20, 450], btype="band", fs=1500)
+    np.testing.assert_allclose(Processor.bandpass(x, 1500), filtfilt(b, a, x), rtol=1e-6, atol=1e-6)
+
+
+def test_design_cache_hits():
+    filterbank.cache_clear()
+    for _ in range(5):
+        sos, _ = filterbank.bandpass_sos(1500, 10, 500, order=4)
+    assert filterbank.bandpass_sos(1500.0, 10.0, 500.0, order=4.0)[0] is sos
+    info = Processor.filter_cache_info()
+    assert info.misses == 1 and info.hits == 5
+    assert filterbank.padlen(sos) == 27
+
+
+@pytest.mark.parametrize("n", [0, 10, 27, 28, 200, 3000])
+def test_mvc_matlab_matches_reference(n):
+    x = 300.0 * spiky_signal(n, seed=n)
+    mvc, env = Processor().mvc_matlab(x)
+    ref_mvc, ref_env = ref_mvc_matlab(x)
+    np.testing.assert_allclose(env, ref_env, rtol=1e-6, atol=1e-6)
+    if n:
+        assert mvc == pytest.approx(ref_mvc, rel=1e-7)
+
+
+# ---------------------------------------------------------------------------
+# Batched MVC
+# ---------------------------------------------------------------------------
+def test_mvc_batch_matches_per_span():
+    rng = np.random.default_rng(9)
+    data = 300.0 * rng.standard_normal((4, 5000))
+    data[2, 100:140] = np.nan
+    spans = [(0, 0, 1500), (1, 200, 1700), (2, 50, 1550), (3, 10, 20),
+             (0, 4000, 4000), (1, 4990, 6000), (3, 1000.7, 2500.2)]
+    mvc, envs = Processor().mvc_matlab_batch(data, spans)
+    assert mvc.shape == (len(spans),) and len(envs) == len(spans)
+    for (row, lo, hi), m, env in zip(spans, mvc, envs):
+        ref_mvc, ref_env = ref_mvc_matlab(data[row, int(lo):int(hi)])
+        np.testing.assert_allclose(env, ref_env, rtol=1e-6, atol=1e-6)
+        if np.isnan(ref_mvc):
+            assert np.isnan(m)
+        else:
+            assert m == pytest.approx(ref_mvc, rel=1e-7)
+
+
+# ---------------------------------------------------------------------------
+# Streaming clean_semg
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize("block_size", [700, 4096, 50000])
+def test_clean_semg_stream_matches_one_shot(block_size):
+    rng = np.random.default_rng(12)
+    x = 300.0 * rng.standard_normal(40000)
+    x[5000:5040] += 5000.0
+    proc = Processor()
+    ref = proc.clean_semg(x, 1500)
+    blocks = list(proc.clean_semg_stream(x, 1500, block_size=block_size))
+    assert max(b.size for b in blocks) <= block_size + 2000
+    out = np.concatenate(blocks)
+    assert out.shape == ref.shape
+    np.testing.assert_allclose(out, ref, rtol=0, atol=1e-9 * np.abs(ref).max())
+
+
+def test_clean_semg_stream_iterable_with_nans():
+    rng = np.random.default_rng(13)
+    x = 300.0 * rng.standard_normal(12000)
+    x[[10, 3000, 7777]] = np.nan
+    proc = Processor()
+    ref = proc.clean_semg(x, 1500)
+    out = np.concatenate(list(proc.clean_semg_stream(np.array_split(x, 17), 1500)))
+    np.testing.assert_allclose(out, ref, rtol=0, atol=1e-9 * np.abs(ref).max())
+
+
+def test_clean_semg_stream_short_signal():
+    x = 300.0 * np.random.default_rng(14).standard_normal(60)
+    proc = Processor()
+    out = np.concatenate(list(proc.clean_semg_stream([x[:30], x[30:]], 1500)))
+    np.testing.assert_array_equal(out, proc.clean_semg(x, 1500))
+    assert list(proc.clean_semg_stream([], 1500)) == []
+
+
+# ---------------------------------------------------------------------------
+# Whole-signal envelope + range-max index
+# ---------------------------------------------------------------------------
+def test_range_max_matches_brute_force():
+    rng = np.random.default_rng(21)
+    v = rng.standard_normal(1000)
+    v[[5, 400, 401]] = np.nan
+    rm = RangeMax(v, block=16)
+    for lo, hi in [(0, 1000), (0, 1), (3, 7), (15, 17), (16, 32), (10, 500), (399, 402),
+                   (999, 1000), (-5, 3), (990, 2000), (5, 6), (7, 7), (600, 300)]:
+        seg = v[max(0, lo):max(0, hi)]
+        expected = np.nan if seg.size == 0 or np.isnan(seg).all() else np.nanmax(seg)
+        got = rm.query(lo, hi)
+        assert (np.isnan(got) and np.isnan(expected)) or got == expected, (lo, hi)
+
+
+def test_envelope_index_lookups():
+    rng = np.random.default_rng(22)
+    data = 300.0 * rng.standard_normal((3, 6000))
+    data[1, 50:60] = np.nan
+    proc = Processor()
+    env = proc.mvc_envelope(data)
+    assert env.shape == data.shape and np.isnan(env[1, 50:60]).all()
+    np.testing.assert_allclose(env[2], proc.mvc_envelope(data[2]))
+
+    index = proc.build_envelope_index(data)
+    spans = [(0, 100, 1600), (1, 0, 3000), (2, 5990, 7000), (2, 10, 10)]
+    got = index.mvc_batch(spans)
+    for (row, lo, hi), m in zip(spans, got):
+        seg = env[row, lo:hi]
+        if seg.size:
+            assert m == np.nanmax(seg)
+        else:
+            assert np.isnan(m)
+
+    # Away from the span borders the whole-signal and per-segment envelopes agree.
+    ref_mvc, ref_env = ref_mvc_matlab(data[0, 1000:4000])
+    np.testing.assert_allclose(env[0, 1500:3500], ref_env[500:2500], rtol=1e-3)
+
+
+# ---------------------------------------------------------------------------
+# Automatic best-window search
+# ---------------------------------------------------------------------------
+def ref_best_windows(v, w, k):
+    v = np.nan_to_num(np.asarray(v, float))
+    means = np.array([v[s:s + w].mean() for s in range(v.size - w + 1)])
+    picked = []
+    for _ in range(k):
+        ok = [s for s in range(means.size) if all(abs(s - p) >= w for p in picked)]
+        if not ok:
+            break
+        picked.append(max(ok, key=lambda s: (means[s], -s)))
+    return sorted(picked)
+
+
+@pytest.mark.parametrize("n,w,k", [(500, 40, 3), (100, 40, 3), (39, 40, 3), (200, 1, 5), (80, 40, 2)])
+def test_best_windows_matches_greedy_reference(n, w, k):
+    rng = np.random.default_rng(n + w)
+    V = rng.random((3, n))
+    if n > 10:
+        V[1, 3:7] = np.nan
+    got = bursts.best_windows(V, w, k)
+    assert got.shape == (3, k)
+    for row, starts in zip(V, got):
+        ref = ref_best_windows(row, w, k)
+        assert starts[:len(ref)].tolist() == ref
+        assert (starts[len(ref):] == -1).all()
+    np.testing.assert_array_equal(bursts.best_windows(V[0], w, k), got[0])
+
+
+def test_auto_mvc_windows_finds_contractions():
+    fs = 1500
+    rng = np.random.default_rng(9)
+    data = 5.0 * rng.standard_normal((2, 20 * fs))
+    for row, centres in enumerate([(3, 9, 15), (17, 2, 11)]):
+        for c in centres:
+            data[row, c * fs:c * fs + fs // 2] *= 40.0 + c
+    spans = Processor().auto_mvc_windows(data, fs, window_ms=500, count=3)
+    assert len(spans) == 2
+    for row, centres in enumerate([(3, 9, 15), (17, 2, 11)]):
+        assert len(spans[row]) == 3
+        for (lo, hi), c in zip(spans[row], sorted(centres)):
+            assert hi - lo == 750
+            assert abs(lo - c * fs) <= 10
+
+
+# ---------------------------------------------------------------------------
+# float32 pipeline
+# ---------------------------------------------------------------------------
+def adc_recording(seed, n=15000, fs=DEFAULT_SEMG_FREQUENCY):
+    """16-bit ADC-like sEMG: noise under a contraction envelope plus drift."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / fs
+    env = 0.2 + 3.0 * np.exp(-((t - 5.0) / 1.5) ** 2)
+    return np.round(rng.standard_normal(n) * env * 800 + 50 * np.sin(np.pi * t)).astype(np.int16)
+
+
+@pytest.fixture
+def float32_mode(monkeypatch):
+    monkeypatch.setattr(precision, "WORK_DTYPE", np.dtype(np.float32))
+
+
+def test_float32_kernels_stay_float32(float32_mode):
+    x = adc_recording(0, n=4000).astype(np.float32)
+    sos, zi = filterbank.bandpass_sos(DEFAULT_SEMG_FREQUENCY, 10.0, 500.0)
+    assert filterbank.sosfiltfilt(sos, zi, x).dtype == np.float32
+    assert sliding.moving_rms(x, 75).dtype == np.float32
+    assert sliding.moving_rms_matlab(np.abs(x), 3).dtype == np.float32
+    assert hampel.hampel_filter(x).dtype == np.float32
+    assert hampel.hampel_filter_2d(np.stack([x, x])).dtype == np.float32
+    # ... and float64 is untouched
+    assert sliding.moving_rms(x.astype(float), 75).dtype == np.float64
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_float32_mvc_within_documented_tolerance(float32_mode, seed):
+    x = adc_recording(seed)
+    p = Processor()
+    mvc64, env64 = ref_mvc_matlab(x.astype(np.float64))
+    mvc32, env32 = p._mvc_block(x.astype(np.float32)[None, :])
+    assert env32.dtype == np.float32
+    assert abs(mvc32[0] - mvc64) <= FLOAT32_RTOL * abs(mvc64)
+    assert np.max(np.abs(env32[0] - env64)) <= FLOAT32_RTOL * np.max(env64)
+
+
+def test_float32_input_is_promoted_when_flag_is_off(monkeypatch):
+    monkeypatch.setattr(precision, "WORK_DTYPE", np.dtype(np.float64))
+    x32 = adc_recording(1, n=4000).astype(np.float32)
+    x64 = x32.astype(np.float64)
+    sos, zi = filterbank.bandpass_sos(DEFAULT_SEMG_FREQUENCY, 10.0, 500.0)
+    for kernel in (lambda x: filterbank.sosfiltfilt(sos, zi, x),
+                   lambda x: sliding.moving_rms(x, 75),
+                   lambda x: sliding.moving_rms_matlab(np.abs(x), 3),
+                   hampel.hampel_filter,
+                   lambda x: hampel.hampel_filter_2d(np.stack([x, x]))):
+        got, expected = kernel(x32), kernel(x64)
+        assert got.dtype == np.float64
+        np.testing.assert_array_equal(got, expected)
@@ -25,6 +25,7 @@ class UIInitializer:
 
         # Menus
         mw.file_menu = mw.menuBar().addMenu("&File")
+        mw.tools_menu = mw.menuBar().addMenu("&Tools")
         mw.help_menu = mw.menuBar().addMenu("&Help")
         mw.menuBar().setStyleSheet("font-size: 10pt; font-family: 'Helvetica';")
 
@@ -33,6 +34,8 @@ class UIInitializer:
         mw.importXMLmot_action = QAction("&Import XML file")
         mw.exportXMLmot_action = QAction("&Export XML file")
         mw.exitAction = QAction("&Exit")
+        mw.autoMVC_action = QAction("&Auto-select MVC windows")
+        mw.matCache_action = QAction("Import &cache...")
         
         mw.aboutAction = QAction("&About")
         mw.indexAction = QAction("&Documentation")
@@ -45,6 +48,10 @@ class UIInitializer:
         mw.file_menu.addSeparator()
         mw.file_menu.addAction(mw.exitAction)
         
+        mw.tools_menu.addAction(mw.autoMVC_action)
+        mw.tools_menu.addSeparator()
+        mw.tools_menu.addAction(mw.matCache_action)
+
         mw.help_menu.addAction(mw.aboutAction)
         mw.help_menu.addSeparator()
         mw.help_menu.addAction(mw.licenseInfoAction)
@@ -54,11 +61,14 @@ class UIInitializer:
         mw.importXMLmot_action.setShortcut(QKeySequence("Ctrl+X"))
         mw.exportXMLmot_action.setShortcut(QKeySequence("Ctrl+E"))
         mw.exitAction.setShortcut(QKeySequence("Ctrl+Q"))
+        mw.autoMVC_action.setShortcut(QKeySequence("Ctrl+M"))
 
         mw.load_MAT_action.triggered.connect(mw.load_mat_files)
         mw.importXMLmot_action.triggered.connect(mw.import_mvc_xml)
         mw.exportXMLmot_action.triggered.connect(mw.export_mvc_xml)
         mw.exitAction.triggered.connect(mw.close)
+        mw.autoMVC_action.triggered.connect(mw.on_auto_mvc)
+        mw.matCache_action.triggered.connect(mw.show_mat_cache)
         
         mw.aboutAction.triggered.connect(mw.launch_about)
         mw.licenseInfoAction.triggered.connect(mw.show_license_info)